@@ -0,0 +1,174 @@
+"""Per-call overhead of the public CueSdk methods.
+
+Runs every benchmark against the simulated backend and prints JSON results
+(calls/s and allocations per call), optionally comparing them with the
+results of a previous run. The ``*_array`` variants are only measured when
+NumPy is installed.
+
+    $ python benchmarks/bench_api.py --output results.json
+    $ python benchmarks/bench_api.py --compare results.json
+"""
+import argparse
+import ctypes
+import sys
+
+from harness import DEVICE_ID, compare, connected_sdk, measure, write_results
+
+from cuesdk import (CorsairAccessLevel, CorsairDataType, CorsairDeviceFilter,
+                    CorsairDevicePropertyId, CorsairDeviceType, CorsairError,
+                    CorsairEvent, CorsairKeyEventConfiguration,
+                    CorsairLedColor, CorsairMacroKeyId, CorsairProperty,
+                    CorsairPropertyFlag, LedFrame)
+from cuesdk.native import (CORSAIR_DEVICE_LEDCOUNT_MAX, CorsairEvent as
+                           CorsairEventNative, CorsairKeyEvent as
+                           CorsairKeyEventNative)
+
+LED_COUNTS = (1, 16, 64, 128, 256, CORSAIR_DEVICE_LEDCOUNT_MAX)
+
+
+def led_benchmarks(led_count):
+    sdk, backend = connected_sdk(led_count)
+    positions, _ = sdk.get_led_positions(DEVICE_ID)
+    colors = [CorsairLedColor(p.id, 255, 0, 0, 255) for p in positions]
+    frame = LedFrame.from_positions(positions)
+    frame.fill(255, 0, 0)
+
+    yield 'set_led_colors', lambda: sdk.set_led_colors(DEVICE_ID, colors)
+    yield ('set_led_colors_buffer',
+           lambda: sdk.set_led_colors_buffer(DEVICE_ID, colors))
+    yield ('set_led_colors_buffer[LedFrame]',
+           lambda: sdk.set_led_colors_buffer(DEVICE_ID, frame))
+    yield 'get_led_colors', lambda: sdk.get_led_colors(DEVICE_ID, colors)
+    yield 'get_led_positions', lambda: sdk.get_led_positions(DEVICE_ID)
+    yield ('get_led_spatial_index',
+           lambda: sdk.get_led_spatial_index(DEVICE_ID))
+    yield 'create_led_frame', lambda: sdk.create_led_frame(DEVICE_ID)
+    yield ('submit_led_colors',
+           lambda: sdk.submit_led_colors({DEVICE_ID: frame}))
+
+    try:
+        import numpy as np
+    except ImportError:
+        return
+    ids = np.array([p.id for p in positions], dtype=np.uint32)
+    rgba = np.full((len(ids), 4), 255, dtype=np.uint8)
+    yield ('set_led_colors_array',
+           lambda: sdk.set_led_colors_array(DEVICE_ID, ids, rgba))
+    yield ('set_led_colors_buffer_array',
+           lambda: sdk.set_led_colors_buffer_array(DEVICE_ID, ids, rgba))
+    yield ('get_led_colors_array',
+           lambda: sdk.get_led_colors_array(DEVICE_ID, ids))
+
+
+def on_event(evt):
+    pass
+
+
+def on_state_changed(evt):
+    pass
+
+
+def call_benchmarks():
+    sdk, backend = connected_sdk(CORSAIR_DEVICE_LEDCOUNT_MAX)
+    backend.devices[DEVICE_ID].set_property(
+        CorsairDevicePropertyId.CDPI_BatteryLevel,
+        CorsairDataType.CT_Int32, 100)
+    backend.devices[DEVICE_ID].set_property(
+        CorsairDevicePropertyId.CDPI_MicEnabled,
+        CorsairDataType.CT_Boolean,
+        True,
+        flags=CorsairPropertyFlag.CPF_CanRead
+        | CorsairPropertyFlag.CPF_CanWrite)
+    battery = (DEVICE_ID, CorsairDevicePropertyId.CDPI_BatteryLevel, 0)
+    mic = (DEVICE_ID, CorsairDevicePropertyId.CDPI_MicEnabled, 0)
+    mic_on = CorsairProperty(CorsairDataType.CT_Boolean, True)
+    device_filter = CorsairDeviceFilter(
+        device_type_mask=CorsairDeviceType.CDT_All)
+    key_config = CorsairKeyEventConfiguration(CorsairMacroKeyId.CMKI_1, False)
+
+    key_event = CorsairKeyEventNative(deviceId=DEVICE_ID.encode(),
+                                      keyId=1,
+                                      isPressed=True)
+    event = CorsairEventNative(id=2)
+    event.keyEvent = ctypes.pointer(key_event)
+
+    yield 'get_session_details', sdk.get_session_details
+    yield 'get_devices', lambda: sdk.get_devices(device_filter)
+    yield 'get_device_info', lambda: sdk.get_device_info(DEVICE_ID)
+    yield ('configure_key_event',
+           lambda: sdk.configure_key_event(DEVICE_ID, key_config))
+    yield ('get_device_property_info',
+           lambda: sdk.get_device_property_info(
+               DEVICE_ID, CorsairDevicePropertyId.CDPI_BatteryLevel))
+    yield ('read_device_property',
+           lambda: sdk.read_device_property(
+               DEVICE_ID, CorsairDevicePropertyId.CDPI_BatteryLevel))
+    yield ('read_device_properties',
+           lambda: sdk.read_device_properties([battery]))
+    yield ('write_device_property',
+           lambda: sdk.write_device_property(*mic, mic_on))
+    yield ('write_device_properties',
+           lambda: sdk.write_device_properties([mic + (mic_on, )]))
+    yield ('request_control',
+           lambda: sdk.request_control(DEVICE_ID, CorsairAccessLevel.
+                                       CAL_ExclusiveLightingControl))
+    yield 'release_control', lambda: sdk.release_control(DEVICE_ID)
+    yield 'set_layer_priority', lambda: sdk.set_layer_priority(128)
+    yield ('get_led_luid_for_key_name',
+           lambda: sdk.get_led_luid_for_key_name(DEVICE_ID, 'A'))
+    yield ('set_led_colors_flush_buffer_async',
+           lambda: sdk.set_led_colors_flush_buffer_async(None))
+    yield ('subscribe_for_events+unsubscribe',
+           lambda: (sdk.subscribe_for_events(on_event),
+                    sdk.unsubscribe_from_events()))
+    yield ('invalidate_topology_cache',
+           lambda: (sdk.invalidate_topology_cache(DEVICE_ID),
+                    sdk.get_led_positions(DEVICE_ID)))
+    yield 'connect+disconnect', lambda: (sdk.connect(on_state_changed),
+                                         sdk.disconnect())
+    yield 'CorsairEvent.create', lambda: CorsairEvent.create(event)
+    yield 'CorsairError', lambda: CorsairError(0)
+
+
+def run(min_time):
+    results = []
+    for name, fn in call_benchmarks():
+        results.append({'name': name, **measure(fn, min_time)})
+        print("%-40s %12.0f calls/s" % (name, results[-1]['calls_per_sec']),
+              file=sys.stderr)
+    for led_count in LED_COUNTS:
+        for name, fn in led_benchmarks(led_count):
+            results.append({
+                'name': name,
+                'leds': led_count,
+                **measure(fn, min_time)
+            })
+            print("%-40s %12.0f calls/s  leds=%d" %
+                  (name, results[-1]['calls_per_sec'], led_count),
+                  file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', help="write JSON results to this file")
+    parser.add_argument('--compare',
+                        help="JSON results of a previous run to compare with")
+    parser.add_argument('--threshold',
+                        type=float,
+                        default=0.2,
+                        help="relative slowdown reported as a regression")
+    parser.add_argument('--min-time',
+                        type=float,
+                        default=0.2,
+                        help="minimum measured time per benchmark, seconds")
+    args = parser.parse_args()
+
+    results = run(args.min_time)
+    write_results(results, args.output)
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
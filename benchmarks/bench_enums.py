@@ -0,0 +1,53 @@
+"""Cost of building and comparing enumeration values.
+
+    $ python benchmarks/bench_enums.py --output enums.json
+"""
+import argparse
+import ctypes
+import sys
+
+from harness import DEVICE_ID, measure, write_results
+
+from cuesdk import (CorsairError, CorsairEvent, CorsairEventId,
+                    CorsairMacroKeyId)
+from cuesdk.native import (CorsairEvent as CorsairEventNative, CorsairKeyEvent
+                           as CorsairKeyEventNative)
+
+
+def benchmarks():
+    success = CorsairError(CorsairError.CE_Success)
+    key_event = CorsairKeyEventNative(deviceId=DEVICE_ID.encode(),
+                                      keyId=1,
+                                      isPressed=True)
+    event = CorsairEventNative(id=2)
+    event.keyEvent = ctypes.pointer(key_event)
+
+    yield 'CorsairError(int)', lambda: CorsairError(0)
+    yield 'CorsairMacroKeyId(int)', lambda: CorsairMacroKeyId(12)
+    yield 'CorsairError == int', lambda: success == 0
+    yield ('CorsairError == member',
+           lambda: success == CorsairError.CE_Success)
+    yield ('CorsairEventId == member',
+           lambda: CorsairEventId(2) == CorsairEventId.CEI_KeyEvent)
+    yield 'str(CorsairError)', lambda: str(success)
+    yield 'CorsairEvent.create', lambda: CorsairEvent.create(event)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', help="write JSON results to this file")
+    parser.add_argument('--min-time', type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = []
+    for name, fn in benchmarks():
+        results.append({'name': name, **measure(fn, args.min_time)})
+        print("%-32s %12.0f calls/s %6d peak bytes" %
+              (name, results[-1]['calls_per_sec'],
+               results[-1]['peak_bytes_per_call']),
+              file=sys.stderr)
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Startup cost of importing cuesdk in a fresh interpreter.
+
+Each scenario runs in a new ``python`` process; the figure is the time spent
+in the statement itself (interpreter start-up is excluded). ``eager`` imports
+every submodule, which is what ``import cuesdk`` used to do.
+
+    $ python benchmarks/bench_import.py --output import.json
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+from harness import write_results
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+SCENARIOS = [
+    ('import cuesdk', 'import cuesdk'),
+    ('from cuesdk import CueSdk', 'from cuesdk import CueSdk'),
+    ('from cuesdk import CorsairLedId_Keyboard',
+     'from cuesdk import CorsairLedId_Keyboard'),
+    ('eager (all submodules)', 'from cuesdk import *'),
+    ('CueSdk(backend=...)', 'from cuesdk import CueSdk, SimulatedBackend\n'
+     'CueSdk(backend=SimulatedBackend([]))'),
+]
+
+TEMPLATE = """\
+import time
+t = time.perf_counter()
+%s
+print(time.perf_counter() - t)
+"""
+
+
+def run_once(statement):
+    env = dict(os.environ, PYTHONPATH=SRC)
+    out = subprocess.check_output(
+        [sys.executable, '-c', TEMPLATE % statement], env=env)
+    return float(out.decode().strip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', help="write JSON results to this file")
+    parser.add_argument('--runs', type=int, default=15)
+    args = parser.parse_args()
+
+    # warm the bytecode cache so every run measures the same thing
+    run_once('from cuesdk import *')
+
+    results = []
+    for name, statement in SCENARIOS:
+        times = [run_once(statement) for _ in range(args.runs)]
+        results.append({
+            'name': name,
+            'min_ms': min(times) * 1e3,
+            'median_ms': statistics.median(times) * 1e3,
+        })
+        print("%-42s %8.2f ms min %8.2f ms median" %
+              (name, results[-1]['min_ms'], results[-1]['median_ms']),
+              file=sys.stderr)
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Key-state tracking and press-to-handler latency.
+
+Measures the cost of the key-state queries and of dispatching one raw key
+event through ``CueSdk``'s event callback into a chord handler, and the
+press-to-handler latency of key events delivered by the simulated backend's
+event thread.
+
+    $ python benchmarks/bench_keys.py --output keys.json
+"""
+import argparse
+import ctypes
+import statistics
+import sys
+import threading
+import time
+
+from harness import DEVICE_ID, connected_sdk, measure, write_results
+
+from cuesdk import CorsairMacroKeyId, KeyChordMatcher
+from cuesdk.native import (CorsairEvent as CorsairEventNative, CorsairKeyEvent
+                           as CorsairKeyEventNative)
+
+CHORD = (CorsairMacroKeyId.CMKI_1, CorsairMacroKeyId.CMKI_2)
+
+
+def key_event(key_id, is_pressed):
+    payload = CorsairKeyEventNative(deviceId=DEVICE_ID.encode(),
+                                    keyId=int(key_id),
+                                    isPressed=is_pressed)
+    event = CorsairEventNative(id=2)
+    event.keyEvent = ctypes.pointer(payload)
+    return event, payload
+
+
+def benchmarks():
+    sdk, backend = connected_sdk(16)
+    matcher = KeyChordMatcher()
+    matcher.add_chord(CHORD, lambda device_id: None)
+    matcher.add_sequence((3, 4, 5), lambda device_id: None)
+    sdk.key_states.add_matcher(matcher)
+    sdk.subscribe_for_events(lambda evt: None)
+
+    hold, _ = key_event(CHORD[0], True)
+    press, press_payload = key_event(CHORD[1], True)
+    release, release_payload = key_event(CHORD[1], False)
+    sdk.event_handler(None, ctypes.pointer(hold))
+    states = sdk.key_states
+
+    def update():
+        states.update(press_payload)
+        states.update(release_payload)
+
+    def dispatch():
+        sdk.event_handler(None, ctypes.pointer(press))
+        sdk.event_handler(None, ctypes.pointer(release))
+
+    yield 'is_pressed', lambda: states.is_pressed(DEVICE_ID, CHORD[0])
+    yield 'pressed', lambda: states.pressed(DEVICE_ID)
+    # a press of a key that is already down is ignored, so release it too
+    yield 'update(raw press+release)', update
+    yield 'dispatch press+release', dispatch
+
+
+def latencies(count):
+    sdk, backend = connected_sdk(16)
+    matcher = KeyChordMatcher()
+    done = threading.Event()
+    received = []
+
+    def on_chord(device_id):
+        received.append(time.perf_counter())
+        done.set()
+
+    matcher.add_chord(CHORD, on_chord)
+    sdk.key_states.add_matcher(matcher)
+    sdk.subscribe_for_events(lambda evt: None)
+    backend.simulate_key_event(DEVICE_ID, CHORD[0], True)
+
+    samples = []
+    for _ in range(count):
+        done.clear()
+        start = time.perf_counter()
+        backend.simulate_key_event(DEVICE_ID, CHORD[1], True)
+        done.wait(1)
+        samples.append(received[-1] - start)
+        backend.simulate_key_event(DEVICE_ID, CHORD[1], False)
+        backend.wait_idle(1)
+    samples.sort()
+    return {
+        'name': 'press-to-handler latency (simulated event thread)',
+        'median_usec': statistics.median(samples) * 1e6,
+        'p99_usec': samples[int(len(samples) * 0.99) - 1] * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', help="write JSON results to this file")
+    parser.add_argument('--min-time', type=float, default=0.2)
+    parser.add_argument('--presses', type=int, default=500)
+    args = parser.parse_args()
+
+    results = []
+    for name, fn in benchmarks():
+        results.append({'name': name, **measure(fn, args.min_time)})
+        print("%-32s %8.2f usec/call" % (name, results[-1]['usec_per_call']),
+              file=sys.stderr)
+    results.append(latencies(args.presses))
+    print("%-32s %8.2f usec median %8.2f usec p99" %
+          ('press-to-handler', results[-1]['median_usec'],
+           results[-1]['p99_usec']),
+          file=sys.stderr)
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
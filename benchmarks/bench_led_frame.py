@@ -0,0 +1,55 @@
+"""Compares per-call packing of LED colors with an in-place LedFrame.
+
+Only the Python side is measured (no native call is made), so the
+benchmark runs on any platform:
+
+    $ python benchmarks/bench_led_frame.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from cuesdk.api import to_native_led_colors  # noqa: E402
+from cuesdk.frame import LedFrame  # noqa: E402
+from cuesdk.structs import CorsairLedColor  # noqa: E402
+
+LED_COUNTS = (16, 128, 512)
+FRAMES = 1000
+
+
+def bench_led_colors(n):
+    colors = [CorsairLedColor(i, 0, 0, 0, 255) for i in range(n)]
+
+    def frame():
+        for led in colors:
+            led.r = (led.r + 1) & 0xff
+        to_native_led_colors(colors)
+
+    return frame
+
+
+def bench_led_frame(n):
+    frame = LedFrame(range(n))
+    rgba = bytearray(n * 4)
+
+    def frame_fn():
+        rgba[0::4] = bytes(((rgba[0] + 1) & 0xff, )) * n
+        frame.set_rgba_bytes(rgba)
+        to_native_led_colors(frame)
+
+    return frame_fn
+
+
+def main():
+    print(f"{'leds':>6} {'list[CorsairLedColor]':>24} {'LedFrame':>12}")
+    for n in LED_COUNTS:
+        t_list = timeit.timeit(bench_led_colors(n), number=FRAMES)
+        t_frame = timeit.timeit(bench_led_frame(n), number=FRAMES)
+        print(f"{n:>6} {FRAMES / t_list:>18.0f} fps "
+              f"{FRAMES / t_frame:>8.0f} fps")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Scaling of multi-device frame submission with the device count.
+
+Compares writing every device buffer in turn on one thread with
+``CueSdk.submit_led_colors``, which writes them from a thread pool. The
+simulated backend blocks for ``--write-latency`` seconds per buffer write
+without holding the GIL, standing in for the native IPC round trip.
+
+    $ python benchmarks/bench_parallel.py --output parallel.json
+"""
+import argparse
+import sys
+
+from harness import connected_sdk, measure, write_results
+
+from cuesdk import LedFrame
+
+DEVICE_COUNTS = (1, 2, 4, 8, 16)
+
+
+def benchmarks(device_count, led_count, write_latency):
+    sdk, backend = connected_sdk(
+        led_count,
+        device_count,
+        backend_options={'write_latency': write_latency})
+    frames = {}
+    for device_id in backend.devices:
+        positions, _ = sdk.get_led_positions(device_id)
+        frames[device_id] = LedFrame.from_positions(positions)
+        frames[device_id].fill(255, 0, 0)
+
+    def sequential():
+        for device_id, frame in frames.items():
+            sdk.set_led_colors_buffer(device_id, frame)
+        sdk.set_led_colors_flush_buffer_async(None)
+
+    yield 'sequential', sequential
+    yield 'submit_led_colors', lambda: sdk.submit_led_colors(frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', help="write JSON results to this file")
+    parser.add_argument('--min-time', type=float, default=0.2)
+    parser.add_argument('--leds', type=int, default=128)
+    parser.add_argument('--write-latency', type=float, default=0.0005)
+    args = parser.parse_args()
+
+    results = []
+    for device_count in DEVICE_COUNTS:
+        for name, fn in benchmarks(device_count, args.leds,
+                                   args.write_latency):
+            r = measure(fn, args.min_time)
+            results.append({'name': name, 'devices': device_count, **r})
+            print("%-20s devices=%-3d %10.1f frames/s" %
+                  (name, device_count, r['calls_per_sec']),
+                  file=sys.stderr)
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Property reads: decode cost and native memory release.
+
+Reads every property data type repeatedly from the simulated backend and
+fails if any native property allocation is left unfreed or if Python
+memory keeps growing across reads:
+
+    $ python benchmarks/bench_properties.py --output properties.json
+"""
+import argparse
+import sys
+import tracemalloc
+
+from harness import DEVICE_ID, connected_sdk, measure, write_results
+
+from cuesdk import CorsairDataType, CorsairDevicePropertyId
+
+ARRAY_SIZES = (1, 16, 256, 1024)
+READS = 200
+
+PROPERTIES = (
+    (CorsairDataType.CT_Boolean, True),
+    (CorsairDataType.CT_Int32, 42),
+    (CorsairDataType.CT_Float64, 0.5),
+    (CorsairDataType.CT_String, 'simulated'),
+)
+
+ARRAYS = (
+    (CorsairDataType.CT_Boolean_Array, lambda n: [i % 2 == 0
+                                                  for i in range(n)]),
+    (CorsairDataType.CT_Int32_Array, lambda n: list(range(n))),
+    (CorsairDataType.CT_Float64_Array, lambda n: [i / 2 for i in range(n)]),
+    (CorsairDataType.CT_String_Array, lambda n: ['s%d' % i
+                                                 for i in range(n)]),
+)
+
+
+def benchmarks():
+    sdk, backend = connected_sdk(1)
+    device = backend.devices[DEVICE_ID]
+    prop = CorsairDevicePropertyId.CDPI_PropertyArray
+    index = 0
+    for data_type, value in PROPERTIES:
+        device.set_property(prop, data_type, value, index)
+        yield (str(data_type), None, sdk, backend, prop, index)
+        index += 1
+    for data_type, make in ARRAYS:
+        for n in ARRAY_SIZES:
+            device.set_property(prop, data_type, make(n), index)
+            yield (str(data_type), n, sdk, backend, prop, index)
+            index += 1
+
+
+def check_leaks(sdk, backend, prop, index):
+    sdk.read_device_property(DEVICE_ID, prop, index)
+    tracemalloc.start()
+    try:
+        sdk.read_device_property(DEVICE_ID, prop, index)
+        before, _ = tracemalloc.get_traced_memory()
+        for _ in range(READS):
+            sdk.read_device_property(DEVICE_ID, prop, index)
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return backend.live_properties, max(after - before, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', help="write JSON results to this file")
+    parser.add_argument('--min-time', type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = []
+    failures = 0
+    for name, size, sdk, backend, prop, index in benchmarks():
+        res = measure(lambda: sdk.read_device_property(DEVICE_ID, prop, index),
+                      args.min_time)
+        live, growth = check_leaks(sdk, backend, prop, index)
+        res.update(name=name,
+                   items=size,
+                   unfreed_properties=live,
+                   memory_growth_bytes=growth)
+        results.append(res)
+        # a few hundred bytes of interpreter-level noise are expected
+        leaked = live or growth > 1024
+        failures += bool(leaked)
+        print("%-36s items=%-5s %10.0f reads/s %s" %
+              (name, size, res['calls_per_sec'], 'LEAK' if leaked else ''),
+              file=sys.stderr)
+    write_results(results, args.output)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Time to restore a session after the connection to iCUE is lost.
+
+Sets up control, layer priority, key event configuration and a committed
+frame plus a partial update on every simulated device, then repeatedly drops
+the connection and measures how long ``CueSdk``'s reconnect supervisor takes
+from the loss notification until all of it has been replayed; ``restored``
+says whether every device came back with exactly the colors it had. The
+reconnect backoff is ``--initial-delay`` and the simulated connect takes
+``--connect-latency``.
+
+    $ python benchmarks/bench_reconnect.py --output reconnect.json
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from harness import connected_sdk, write_results
+
+from cuesdk import (CorsairAccessLevel, CorsairKeyEventConfiguration,
+                    CorsairLedColor, CorsairMacroKeyId, CorsairSessionState)
+
+DEVICE_COUNTS = (1, 4, 16)
+
+
+def restore_times(device_count, led_count, runs, initial_delay,
+                  connect_latency):
+    sdk, backend = connected_sdk(
+        led_count,
+        device_count,
+        backend_options={'connect_latency': connect_latency})
+    supervisor = sdk.enable_auto_reconnect(initial_delay=initial_delay,
+                                           jitter=0)
+    sdk.set_layer_priority(128)
+    for device_id in backend.devices:
+        sdk.request_control(device_id,
+                            CorsairAccessLevel.CAL_ExclusiveLightingControl)
+        sdk.configure_key_event(
+            device_id,
+            CorsairKeyEventConfiguration(CorsairMacroKeyId.CMKI_1, True))
+        frame, _ = sdk.create_led_frame(device_id)
+        frame.fill(255, 128, 0)
+        sdk.set_led_colors_buffer(device_id, frame)
+    sdk.set_led_colors_flush_buffer_async(None)
+    # partial updates on top of the frames, as DeltaEncoder sends them
+    for device_id in backend.devices:
+        first = sdk.get_led_positions(device_id)[0][0].id
+        sdk.set_led_colors_buffer(device_id,
+                                  [CorsairLedColor(first, 0, 64, 255, 255)])
+    sdk.set_led_colors_flush_buffer_async(None)
+    backend.wait_idle(1)
+    expected = {d: dict(colors) for d, colors in backend.led_colors.items()}
+
+    samples = []
+    restored = True
+    for _ in range(runs):
+        backend.simulate_state(CorsairSessionState.CSS_ConnectionLost)
+        deadline = time.monotonic() + 5
+        while not supervisor.restoring and time.monotonic() < deadline:
+            time.sleep(0.0005)
+        while supervisor.restoring and time.monotonic() < deadline:
+            time.sleep(0.0005)
+        backend.wait_idle(1)
+        samples.append(supervisor.time_to_restore)
+        restored = restored and backend.led_colors == expected
+    sdk.disconnect()
+    return samples, restored
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', help="write JSON results to this file")
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--leds', type=int, default=128)
+    parser.add_argument('--initial-delay', type=float, default=0.0)
+    parser.add_argument('--connect-latency', type=float, default=0.005)
+    args = parser.parse_args()
+
+    results = []
+    for device_count in DEVICE_COUNTS:
+        samples, restored = restore_times(device_count, args.leds, args.runs,
+                                          args.initial_delay,
+                                          args.connect_latency)
+        results.append({
+            'name': 'time_to_restore',
+            'devices': device_count,
+            'median_ms': statistics.median(samples) * 1e3,
+            'max_ms': max(samples) * 1e3,
+            'restored': restored,
+        })
+        print("devices=%-3d %8.2f ms median %8.2f ms max restored=%s" %
+              (device_count, results[-1]['median_ms'], results[-1]['max_ms'],
+               restored),
+              file=sys.stderr)
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Cost of recording SDK traffic and throughput of replaying it.
+
+Measures a buffered multi-device frame (one ``set_led_colors_buffer`` per
+device and a flush) without and with a ``Recorder``, then replays the
+recorded log against a fresh simulated backend as fast as possible and at
+the original speed.
+
+    $ python benchmarks/bench_replay.py --output replay.json
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+from harness import connected_sdk, measure, write_results
+
+from cuesdk import LedFrame, Recorder, Recording, Replayer, SimulatedBackend
+
+
+def frame_writer(sdk, backend):
+    frames = {}
+    for device_id in backend.devices:
+        positions, _ = sdk.get_led_positions(device_id)
+        frames[device_id] = LedFrame.from_positions(positions)
+        frames[device_id].fill(255, 0, 0)
+
+    def write_frame():
+        for device_id, frame in frames.items():
+            sdk.set_led_colors_buffer(device_id, frame)
+        sdk.set_led_colors_flush_buffer_async(None)
+
+    return write_frame
+
+
+def replay(path, backend, speed):
+    with Recording(path) as recording:
+        replayer = Replayer(recording, backend, speed)
+        stats = replayer.run()
+        backend.wait_idle(1)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', help="write JSON results to this file")
+    parser.add_argument('--min-time', type=float, default=0.2)
+    parser.add_argument('--leds', type=int, default=128)
+    parser.add_argument('--devices', type=int, default=4)
+    parser.add_argument('--frames', type=int, default=300)
+    args = parser.parse_args()
+
+    results = []
+    sdk, backend = connected_sdk(args.leds, args.devices)
+    r = measure(frame_writer(sdk, backend), args.min_time)
+    results.append({'name': 'frame', 'leds': args.leds, **r})
+    print("%-24s %10.2f usec/frame" % ('frame', r['usec_per_call']),
+          file=sys.stderr)
+
+    fd, path = tempfile.mkstemp(suffix='.cuerec')
+    os.close(fd)
+    os.unlink(path)
+    try:
+        with Recorder(path) as recorder:
+            sdk, backend = connected_sdk(args.leds,
+                                         args.devices,
+                                         recorder=recorder)
+            write_frame = frame_writer(sdk, backend)
+            r = measure(write_frame, args.min_time)
+            results.append({
+                'name': 'frame (recorded)',
+                'leds': args.leds,
+                **r
+            })
+            print("%-24s %10.2f usec/frame" %
+                  ('frame (recorded)', r['usec_per_call']),
+                  file=sys.stderr)
+        os.unlink(path)
+
+        # a log of --frames frames to replay
+        with Recorder(path) as recorder:
+            sdk, backend = connected_sdk(args.leds,
+                                         args.devices,
+                                         recorder=recorder)
+            write_frame = frame_writer(sdk, backend)
+            for _ in range(args.frames):
+                write_frame()
+            backend.wait_idle(1)
+            sdk.disconnect()
+        size = os.path.getsize(path)
+
+        for name, speed in (('replay (as fast as possible)', None),
+                            ('replay (original speed)', 1.0)):
+            stats = replay(path, SimulatedBackend(backend.devices.values()),
+                           speed)
+            rate = stats['calls'] / stats['elapsed_seconds']
+            results.append({'name': name, 'log_bytes': size, **stats})
+            results[-1]['calls_per_sec'] = rate
+            print("%-30s %10.0f calls/s %8.3f s for %.3f s recorded, "
+                  "%d mismatches" %
+                  (name, rate, stats['elapsed_seconds'],
+                   stats['recorded_seconds'], stats['mismatches']),
+                  file=sys.stderr)
+    finally:
+        if os.path.exists(path):
+            os.unlink(path)
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
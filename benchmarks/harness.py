@@ -0,0 +1,107 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks run against ``SimulatedBackend`` so they work on any platform
+without iCUE or the SDK library.
+"""
+import json
+import os
+import platform
+import sys
+import threading
+import time
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from cuesdk import (CueSdk, CorsairDeviceType, CorsairSessionState,  # noqa
+                    SimulatedBackend, SimulatedDevice)
+from cuesdk.version import __version__  # noqa: E402
+
+DEVICE_ID = 'bench-device'
+
+
+def connected_sdk(led_count, device_count=1, backend_options=None, **kwargs):
+    devices = [
+        SimulatedDevice('%s-%d' % (DEVICE_ID, i) if i else DEVICE_ID,
+                        CorsairDeviceType.CDT_Keyboard,
+                        led_count=led_count) for i in range(device_count)
+    ]
+    backend = SimulatedBackend(devices, **(backend_options or {}))
+    sdk = CueSdk(backend=backend, **kwargs)
+    connected = threading.Event()
+
+    def on_state_changed(evt):
+        if evt.state == CorsairSessionState.CSS_Connected:
+            connected.set()
+
+    sdk.connect(on_state_changed)
+    if not connected.wait(5):
+        raise RuntimeError("Simulated session did not connect")
+    return sdk, backend
+
+
+def measure(fn, min_time=0.2):
+    """Returns calls/s and per-call allocation figures for ``fn``."""
+    timer = timeit.Timer(fn)
+    number = 1
+    while timer.timeit(number) < min_time / 10:
+        number *= 2
+    best = min(timer.repeat(repeat=5, number=number))
+
+    tracemalloc.start()
+    try:
+        fn()
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        fn()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'calls_per_sec': number / best,
+        'usec_per_call': best / number * 1e6,
+        'peak_bytes_per_call': max(peak - base, 0),
+        'retained_bytes_per_call': max(current - base, 0),
+    }
+
+
+def environment():
+    return {
+        'cuesdk': __version__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'system': platform.system(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+    }
+
+
+def write_results(results, path=None):
+    doc = {'environment': environment(), 'results': results}
+    text = json.dumps(doc, indent=2, sort_keys=True)
+    if path:
+        with open(path, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+def compare(results, baseline_path, threshold=0.2):
+    """Prints benchmarks that got slower than ``threshold`` vs a baseline."""
+    with open(baseline_path) as f:
+        baseline = {(r['name'], r.get('leds')): r
+                    for r in json.load(f)['results']}
+    regressions = 0
+    for r in results:
+        old = baseline.get((r['name'], r.get('leds')))
+        if old is None:
+            continue
+        ratio = r['calls_per_sec'] / old['calls_per_sec']
+        if ratio < 1 - threshold:
+            regressions += 1
+            print("REGRESSION %-40s leds=%-4s %.2fx" %
+                  (r['name'], r.get('leds'), ratio),
+                  file=sys.stderr)
+    return regressions
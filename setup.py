@@ -46,6 +46,7 @@ setup(name="cuesdk",
       long_description=open('README.md').read(),
       long_description_content_type='text/markdown',
       install_requires=[],
+      extras_require={'numpy': ['numpy']},
       python_requires='>=3.9',
       classifiers=[
           'Development Status :: 5 - Production/Stable',
@@ -1,3 +1,57 @@
-from .enums import *
-from .structs import *
-from .api import *
+import importlib
+
+# Public names are resolved on first access (PEP 562), so importing the
+# package only loads the modules a program actually uses.
+_EXPORTS = {
+    'enums': ('CorsairError', 'CorsairSessionState', 'CorsairDeviceType',
+              'CorsairEventId', 'CorsairDevicePropertyId', 'CorsairDataType',
+              'CorsairPropertyFlag', 'CorsairPhysicalLayout',
+              'CorsairLogicalLayout', 'CorsairChannelDeviceType',
+              'CorsairAccessLevel', 'CorsairLedGroup',
+              'CorsairLedId_Keyboard', 'CorsairMacroKeyId'),
+    'structs': ('CorsairVersion', 'CorsairSessionDetails',
+                'CorsairSessionStateChanged', 'CorsairDeviceInfo',
+                'CorsairLedPosition', 'CorsairDeviceFilter',
+                'CorsairDeviceConnectionStatusChangedEvent',
+                'CorsairKeyEvent', 'CorsairEvent', 'CorsairLedColor',
+                'CorsairKeyEventConfiguration', 'CorsairProperty'),
+    'frame': ('LedFrame', ),
+    'spatial': ('LedSpatialIndex', ),
+    'properties': ('PropertyEncoder', ),
+    'instrumentation': ('Instrumentation', 'InstrumentedApi',
+                        'LATENCY_BUCKETS'),
+    'recording': ('Recorder', 'RecordingApi', 'Record', 'Recording',
+                  'Replayer'),
+    'canvas': ('DevicePlacement', 'LedCanvas'),
+    'palette': ('Palette', 'gamma_table', 'brightness_table'),
+    'animation': ('Timeline', 'Animation', 'AnimationPlayer'),
+    'arrays': ('led_color_dtype', ),
+    'scheduler': ('RenderScheduler', ),
+    'delta': ('DeltaEncoder', ),
+    'events': ('EventQueue', ),
+    'keys': ('KeyStateTracker', 'KeyChordMatcher'),
+    'supervisor': ('SessionRecord', 'ReconnectSupervisor'),
+    'simulator': ('SimulatedDevice', 'SimulatedBackend'),
+    'api': ('CueSdk', ),
+    'aio': ('AsyncCueSdk', ),
+}
+
+_LAZY = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return importlib.import_module('.' + name, __name__)
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError("module %r has no attribute %r" %
+                             (__name__, name))
+    value = getattr(importlib.import_module('.' + module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,203 @@
+import asyncio
+import functools
+from typing import AsyncIterator, Callable, Optional
+
+from .api import CueSdk
+from .enums import CorsairError, CorsairSessionState
+from .structs import CorsairEvent, CorsairSessionStateChanged
+
+__all__ = ['AsyncCueSdk']
+
+_FAILED_STATES = (CorsairSessionState.CSS_Timeout,
+                  CorsairSessionState.CSS_ConnectionRefused)
+
+
+def _blocking(name):
+
+    async def method(self, *args, **kwargs):
+        return await self._run(getattr(self._sdk, name), *args, **kwargs)
+
+    method.__name__ = name
+    method.__qualname__ = 'AsyncCueSdk.' + name
+    return method
+
+
+def _resolve(fut, result):
+    if not fut.done():
+        fut.set_result(result)
+
+
+class AsyncCueSdk(object):
+    """asyncio facade over ``CueSdk``.
+
+    Blocking native calls run in ``executor`` (the loop's default executor
+    if not given) and callbacks delivered on iCUE's thread are marshalled
+    back to the event loop with ``call_soon_threadsafe``. Events that do not
+    fit into a bounded event queue are counted in ``dropped_events``.
+    """
+
+    def __init__(self,
+                 sdk: Optional[CueSdk] = None,
+                 executor=None,
+                 **kwargs) -> None:
+        self._sdk = sdk if sdk is not None else CueSdk(**kwargs)
+        self._executor = executor
+        self._loop = None
+        self._state = CorsairSessionState(CorsairSessionState.CSS_Invalid)
+        self._state_waiters = []
+        self._on_state_changed = None
+        self._events = None
+        self.dropped_events = 0
+
+    @property
+    def sdk(self) -> CueSdk:
+        return self._sdk
+
+    @property
+    def state(self) -> CorsairSessionState:
+        return self._state
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, type, value, traceback):
+        await self.unsubscribe_from_events()
+        await self.disconnect()
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(fn, *args, **kwargs))
+
+    def _call_soon(self, fn, *args) -> None:
+        try:
+            self._loop.call_soon_threadsafe(fn, *args)
+        except RuntimeError:
+            # the loop has been closed, nobody is waiting anymore
+            pass
+
+    async def connect(
+        self,
+        on_state_changed: Optional[Callable[[CorsairSessionStateChanged],
+                                            None]] = None
+    ) -> CorsairError:
+        self._loop = asyncio.get_running_loop()
+        self._on_state_changed = on_state_changed
+
+        def handler(evt):
+            self._call_soon(self._session_state_changed, evt)
+
+        connected = self._loop.create_future()
+        self._state_waiters.append(connected)
+        err = await self._run(self._sdk.connect, handler)
+        if err != CorsairError.CE_Success:
+            self._state_waiters.remove(connected)
+            return err
+        return await connected
+
+    def _session_state_changed(self, evt: CorsairSessionStateChanged):
+        self._state = evt.state
+        if evt.state == CorsairSessionState.CSS_Connected:
+            result = CorsairError(CorsairError.CE_Success)
+        elif evt.state in _FAILED_STATES:
+            result = CorsairError(CorsairError.CE_NotConnected)
+        else:
+            result = None
+
+        if result is not None:
+            waiters, self._state_waiters = self._state_waiters, []
+            for fut in waiters:
+                _resolve(fut, result)
+
+        if self._on_state_changed is not None:
+            self._on_state_changed(evt)
+
+    async def disconnect(self) -> CorsairError:
+        err = await self._run(self._sdk.disconnect)
+        waiters, self._state_waiters = self._state_waiters, []
+        for fut in waiters:
+            _resolve(fut, CorsairError(CorsairError.CE_NotConnected))
+        return err
+
+    async def subscribe_for_events(self, maxsize: int = 0) -> CorsairError:
+        self._loop = asyncio.get_running_loop()
+        events = asyncio.Queue(maxsize)
+
+        def handler(evt):
+            self._call_soon(self._put_event, events, evt)
+
+        err = await self._run(self._sdk.subscribe_for_events, handler)
+        if err == CorsairError.CE_Success:
+            self._events = events
+        return err
+
+    def _put_event(self, events, evt) -> None:
+        try:
+            events.put_nowait(evt)
+        except asyncio.QueueFull:
+            self.dropped_events += 1
+
+    async def unsubscribe_from_events(self) -> CorsairError:
+        events, self._events = self._events, None
+        if events is None:
+            return CorsairError(CorsairError.CE_Success)
+        err = await self._run(self._sdk.unsubscribe_from_events)
+        # the end marker must get in even if the consumer fell behind; the
+        # oldest unread events make room for it
+        while True:
+            try:
+                events.put_nowait(None)
+                break
+            except asyncio.QueueFull:
+                events.get_nowait()
+                self.dropped_events += 1
+        return err
+
+    async def events(self) -> AsyncIterator[CorsairEvent]:
+        events = self._events
+        if events is None:
+            err = await self.subscribe_for_events()
+            if err != CorsairError.CE_Success:
+                return
+            events = self._events
+        while True:
+            evt = await events.get()
+            if evt is None:
+                return
+            yield evt
+
+    async def flush(self) -> CorsairError:
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+
+        def callback(err):
+            try:
+                loop.call_soon_threadsafe(_resolve, done, err)
+            except RuntimeError:
+                pass
+
+        err = await self._run(self._sdk.set_led_colors_flush_buffer_async,
+                              callback)
+        if err != CorsairError.CE_Success:
+            return err
+        return await done
+
+    get_session_details = _blocking('get_session_details')
+    get_devices = _blocking('get_devices')
+    get_device_info = _blocking('get_device_info')
+    get_led_positions = _blocking('get_led_positions')
+    create_led_frame = _blocking('create_led_frame')
+    configure_key_event = _blocking('configure_key_event')
+    get_device_property_info = _blocking('get_device_property_info')
+    read_device_property = _blocking('read_device_property')
+    write_device_property = _blocking('write_device_property')
+    request_control = _blocking('request_control')
+    release_control = _blocking('release_control')
+    set_layer_priority = _blocking('set_layer_priority')
+    get_led_luid_for_key_name = _blocking('get_led_luid_for_key_name')
+    set_led_colors = _blocking('set_led_colors')
+    set_led_colors_buffer = _blocking('set_led_colors_buffer')
+    set_led_colors_array = _blocking('set_led_colors_array')
+    set_led_colors_buffer_array = _blocking('set_led_colors_buffer_array')
+    get_led_colors = _blocking('get_led_colors')
+    get_led_colors_array = _blocking('get_led_colors_array')
@@ -0,0 +1,257 @@
+import hashlib
+import mmap
+import os
+import struct
+import time
+from array import array
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .enums import CorsairError
+from .frame import _LED_COLOR_SIZE, _R_OFFSET
+from .native import CorsairLedColor as CorsairLedColorNative
+from .palette import _to_rgba
+
+__all__ = ['Timeline', 'Animation', 'AnimationPlayer']
+
+# magic, version, fps, frame count, led count, loop, timeline digest
+_HEADER = struct.Struct('<4sIdII?20s')
+_MAGIC = b'CUEA'
+_VERSION = 1
+# frame tables start on a page boundary so they can be mapped as-is
+_TABLE_OFFSET = mmap.ALLOCATIONGRANULARITY
+
+
+class Timeline(object):
+    """Keyframed colors for single LEDs or zones (groups of LEDs).
+
+    Each track holds ``(time, color)`` keyframes; colors are interpolated
+    linearly between keyframes and held before the first and after the last
+    one. ``compile`` samples the timeline at ``fps`` into an ``Animation``;
+    a timeline that does not loop gets one more frame, sampled at
+    ``duration``, so it ends on its last keyframe.
+    """
+
+    def __init__(self,
+                 duration: float,
+                 fps: float = 60.0,
+                 loop: bool = False,
+                 background=(0, 0, 0, 0)) -> None:
+        if duration <= 0 or fps <= 0:
+            raise ValueError("duration and fps must be positive")
+        self.duration = duration
+        self.fps = fps
+        self.loop = loop
+        self.background = _to_rgba(background)
+        self._tracks: List[Tuple[Tuple[int, ...], Tuple]] = []
+
+    def add(self, leds: Union[int, Iterable[int]],
+            keyframes: Iterable[Tuple[float, object]]) -> None:
+        leds = (int(leds), ) if isinstance(leds, int) else tuple(
+            int(led_id) for led_id in leds)
+        keyframes = tuple(
+            sorted((float(t), _to_rgba(c)) for t, c in keyframes))
+        if not keyframes:
+            raise ValueError("A track needs at least one keyframe")
+        self._tracks.append((leds, keyframes))
+
+    @property
+    def frame_count(self) -> int:
+        frames = max(int(round(self.duration * self.fps)), 1)
+        return frames if self.loop else frames + 1
+
+    def digest(self, led_ids: Sequence[int]) -> bytes:
+        spec = (_VERSION, self.duration, self.fps, self.loop,
+                self.background, tuple(led_ids), tuple(self._tracks))
+        return hashlib.sha1(repr(spec).encode()).digest()
+
+    def _sample(self, keyframes) -> List[bytes]:
+        """Per-channel values of one track for every frame."""
+        frames = self.frame_count
+        channels = [bytearray(frames) for _ in range(4)]
+        last = frames - 1
+        k = 0
+        for f in range(frames):
+            t = self.duration if f == last and not self.loop else f / self.fps
+            while k < len(keyframes) - 1 and keyframes[k + 1][0] <= t:
+                k += 1
+            t0, c0 = keyframes[k]
+            if k == len(keyframes) - 1 or t <= t0:
+                color = c0
+            else:
+                t1, c1 = keyframes[k + 1]
+                a = (t - t0) / (t1 - t0)
+                color = [round(x + (y - x) * a) for x, y in zip(c0, c1)]
+            for c in range(4):
+                channels[c][f] = color[c]
+        return channels
+
+    def _render(self, table, led_ids: Sequence[int]) -> None:
+        n = len(led_ids)
+        frames = self.frame_count
+        stride = n * _LED_COLOR_SIZE
+        view = memoryview(table).cast('B')
+        view.cast('I')[0::2] = array('I', led_ids) * frames
+        for c in range(4):
+            view[_R_OFFSET + c::_LED_COLOR_SIZE] = bytes(
+                (self.background[c], )) * (n * frames)
+
+        index = {led_id: i for i, led_id in enumerate(led_ids)}
+        for leds, keyframes in self._tracks:
+            channels = self._sample(keyframes)
+            for led_id in leds:
+                i = index.get(led_id)
+                if i is None:
+                    continue
+                base = i * _LED_COLOR_SIZE + _R_OFFSET
+                for c in range(4):
+                    view[base + c::stride] = channels[c]
+
+    def compile(self,
+                led_ids: Sequence[int],
+                cache_path: Optional[str] = None) -> 'Animation':
+        """Samples every frame into packed ``CorsairLedColor`` arrays.
+
+        With ``cache_path`` the frames are stored in that file and mapped
+        into memory; a file written for the same timeline and LEDs is
+        reused instead of being sampled again.
+        """
+        led_ids = [int(led_id) for led_id in led_ids]
+        size = self.frame_count * len(led_ids) * _LED_COLOR_SIZE
+        if cache_path is None:
+            table = bytearray(size)
+            self._render(table, led_ids)
+            return Animation(table, len(led_ids), self.frame_count, self.fps,
+                             self.loop)
+
+        digest = self.digest(led_ids)
+        header = _HEADER.pack(_MAGIC, _VERSION, self.fps, self.frame_count,
+                              len(led_ids), self.loop, digest)
+        mapped = _map_cache(cache_path, header, _TABLE_OFFSET + size)
+        if mapped is None:
+            with open(cache_path, 'wb') as f:
+                f.truncate(_TABLE_OFFSET + size)
+            with open(cache_path, 'r+b') as f:
+                mapped = mmap.mmap(f.fileno(), 0)
+            self._render(memoryview(mapped)[_TABLE_OFFSET:], led_ids)
+            mapped[:len(header)] = header
+            mapped.flush()
+        return Animation(mapped, len(led_ids), self.frame_count, self.fps,
+                         self.loop, _TABLE_OFFSET)
+
+
+def _map_cache(path: str, header: bytes, size: int):
+    try:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size != size:
+                return None
+            if f.read(len(header)) != header:
+                return None
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    except OSError:
+        return None
+
+
+class Animation(object):
+    """Precomputed animation frames.
+
+    ``frame(i)`` is a native ``CorsairLedColor`` array that can be passed
+    directly to ``CueSdk.set_led_colors_buffer``; ``index_at`` maps elapsed
+    time to a frame index, so a late caller skips frames instead of falling
+    behind.
+    """
+
+    def __init__(self,
+                 table,
+                 led_count: int,
+                 frame_count: int,
+                 fps: float,
+                 loop: bool = False,
+                 offset: int = 0) -> None:
+        self.fps = fps
+        self.loop = loop
+        self.led_count = led_count
+        self._table = table
+        frame_type = CorsairLedColorNative * led_count
+        stride = led_count * _LED_COLOR_SIZE
+        self._frames = [
+            frame_type.from_buffer(table, offset + f * stride)
+            for f in range(frame_count)
+        ]
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    @property
+    def duration(self) -> float:
+        return len(self._frames) / self.fps
+
+    def frame(self, index: int):
+        return self._frames[index]
+
+    def index_at(self, elapsed: float) -> int:
+        """Frame shown ``elapsed`` seconds after the start, or -1 once a
+        non-looping animation has ended."""
+        index = int(max(elapsed, 0.0) * self.fps)
+        if self.loop:
+            return index % len(self._frames)
+        return index if index < len(self._frames) else -1
+
+    def close(self) -> None:
+        self._frames = []
+        if isinstance(self._table, mmap.mmap):
+            self._table.close()
+
+
+class AnimationPlayer(object):
+    """Plays an ``Animation`` on one device, driven by ``tick``.
+
+    Every tick submits the frame for the current time (if it changed since
+    the last tick) followed by a flush; ``skipped`` counts frames that were
+    never shown because ticks came too slowly.
+    """
+
+    def __init__(self,
+                 sdk,
+                 device_id: str,
+                 animation: Animation,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self._sdk = sdk
+        self._device_id = device_id
+        self._animation = animation
+        self._clock = clock
+        self._start = None
+        self._last = -1
+        self.played = 0
+        self.skipped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._start is not None
+
+    def start(self) -> None:
+        self._start = self._clock()
+        self._last = -1
+
+    def stop(self) -> None:
+        self._start = None
+
+    def tick(self) -> CorsairError:
+        if self._start is None:
+            return CorsairError(CorsairError.CE_Success)
+        animation = self._animation
+        index = animation.index_at(self._clock() - self._start)
+        if index < 0:
+            self.stop()
+            return CorsairError(CorsairError.CE_Success)
+        if index == self._last:
+            return CorsairError(CorsairError.CE_Success)
+
+        if self._last >= 0:
+            self.skipped += (index - self._last - 1) % len(animation)
+        self._last = index
+        err = self._sdk.set_led_colors_buffer(self._device_id,
+                                              animation.frame(index))
+        if err == CorsairError.CE_Success:
+            err = self._sdk.set_led_colors_flush_buffer_async(None)
+            self.played += 1
+        return err
@@ -1,18 +1,29 @@
+import itertools
 import os
-import platform
-from ctypes import (c_int32, c_uint32, c_void_p, byref, sizeof,
-                    create_string_buffer)
-from typing import (Any, Collection, Sequence, Optional, Callable)
+import sys
+import threading
+import time
+from ctypes import Array, c_int32, c_uint32, c_void_p, byref, sizeof
+from typing import (TYPE_CHECKING, Any, Collection, Dict, Iterable, Mapping,
+                    Sequence, Optional, Callable, Tuple, Union)
 
 from .enums import (CorsairAccessLevel, CorsairDataType, CorsairError,
-                    CorsairDevicePropertyId)
-from .structs import (CorsairDeviceFilter, CorsairEvent, CorsairProperty,
+                    CorsairDevicePropertyId, CorsairEventId,
+                    CorsairPropertyFlag, CorsairSessionState)
+from .structs import (bytes_to_str_or_default, CorsairDeviceFilter,
+                      CorsairEvent, CorsairProperty,
                       CorsairKeyEventConfiguration, CorsairLedPosition,
                       CorsairLedColor, CorsairDeviceInfo,
                       CorsairSessionDetails, CorsairSessionStateChanged)
+from .cache import (DeviceIdCache, TopologyCache, PropertyCache,
+                    PROPERTY_TTLS, DEFAULT_PROPERTY_TTL)
+from .frame import LedFrame
+from .properties import PropertyEncoder
+from .arrays import (to_native_led_colors_array, to_native_led_ids_array,
+                     native_led_colors_to_rgba)
 from .native import (
     CorsairNativeApi, CorsairSessionStateChangedHandler, CorsairEventHandler,
-    CorsairAsyncCallback, CORSAIR_STRING_SIZE_M, CORSAIR_DEVICE_COUNT_MAX,
+    CorsairAsyncCallback, CORSAIR_DEVICE_COUNT_MAX,
     CORSAIR_DEVICE_LEDCOUNT_MAX, CORSAIR_LAYER_PRIORITY_MAX,
     CorsairSessionDetails as CorsairSessionDetailsNative, CorsairDeviceInfo as
     CorsairDeviceInfoNative, CorsairDeviceFilter as CorsairDeviceFilterNative,
@@ -21,9 +32,17 @@ from .native import (
     CorsairProperty as CorsairPropertyNative, CorsairLedColor as
     CorsairLedColorNative)
 
-__all__ = ['CueSdk']
+if TYPE_CHECKING:
+    # optional features are imported where they are first used, so that
+    # `import cuesdk` stays cheap for programs that do not use them
+    from concurrent.futures import Executor
+    from .events import EventQueue
+    from .keys import KeyStateTracker
+    from .supervisor import ReconnectSupervisor
+    from .instrumentation import Instrumentation
+    from .recording import Recorder
 
-napi: CorsairNativeApi
+__all__ = ['CueSdk']
 
 
 def get_library_path(lib_name):
@@ -40,34 +59,86 @@ def get_library_path_mac():
     return get_library_path(lib_name)
 
 
-def str_to_char_array(s: str, sz: int):
-    return create_string_buffer(s.encode('utf-8'), sz)
+def to_native_led_colors(led_colors):
+    if isinstance(led_colors, LedFrame):
+        return (len(led_colors), led_colors.data)
+    if isinstance(led_colors, Array) and \
+            led_colors._type_ is CorsairLedColorNative:
+        return (len(led_colors), led_colors)
 
-
-def to_native_id(device_id):
-    if not device_id:
-        return None
-    return str_to_char_array(device_id, CORSAIR_STRING_SIZE_M)
+    sz = len(led_colors)
+    data = (CorsairLedColorNative * sz)()
+    for i, led in enumerate(led_colors):
+        data[i] = CorsairLedColorNative(id=int(led.id),
+                                        r=led.r,
+                                        g=led.g,
+                                        b=led.b,
+                                        a=led.a)
+    return (sz, data)
 
 
 class CueSdk(object):
-
-    def __init__(self, sdk_path: Optional[str] = None) -> None:
-        global napi
-        if sdk_path is None:
-            system = platform.system()
-            if system == "Windows":
-                sdk_path = get_library_path_windows()
-            elif system == "Darwin":
-                sdk_path = get_library_path_mac()
-        napi = CorsairNativeApi(sdk_path)
+    """Session with iCUE owning its own native API binding.
+
+    Methods may be called from any thread. LED color writes for one device
+    are serialized by a per-device lock, so different devices can be written
+    concurrently (the native call releases the GIL); session-wide calls
+    (connect, disconnect, event subscription, layer priority and flushes)
+    are serialized by a session lock. ``submit_led_colors`` uses this to
+    send the buffers of many devices from a thread pool.
+    """
+
+    def __init__(self,
+                 sdk_path: Optional[str] = None,
+                 cache_topology: bool = False,
+                 backend: Any = None,
+                 instrumentation: Optional['Instrumentation'] = None,
+                 recorder: Optional['Recorder'] = None) -> None:
+        if backend is None:
+            if sdk_path is None:
+                if sys.platform == "win32":
+                    sdk_path = get_library_path_windows()
+                elif sys.platform == "darwin":
+                    sdk_path = get_library_path_mac()
+            backend = CorsairNativeApi(sdk_path)
+        if recorder is not None:
+            from .recording import RecordingApi
+            backend = RecordingApi(backend, recorder)
+        if instrumentation is not None:
+            from .instrumentation import InstrumentedApi
+            backend = InstrumentedApi(backend, instrumentation)
+        self._napi = backend
+        self._instrumentation = instrumentation
         self._protocol_details = None
+        self._ids = DeviceIdCache()
+        self._topology = TopologyCache() if cache_topology else None
+        self._event_queue = None
+        self._properties = PropertyCache()
+        self._key_states = None
+        self._session_lock = threading.RLock()
+        self._device_locks = {}
+        self._executor = None
+        self._flush_trampoline = CorsairAsyncCallback(self._on_flush_completed)
+        self._flush_tokens = itertools.count(1)
+        self._pending_flushes = {}
+        self._record = None
+        self._supervisor = None
+        self.session_state_changed_event_handler = None
+        self.event_handler = None
 
     def __enter__(self):
         return self
 
     def __exit__(self, type, value, traceback):
-        pass
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def _device_lock(self, device_id: str):
+        lock = self._device_locks.get(device_id)
+        if lock is None:
+            lock = self._device_locks.setdefault(device_id, threading.Lock())
+        return lock
 
     def connect(
         self, on_state_changed: Callable[[CorsairSessionStateChanged], None]
@@ -79,23 +150,170 @@ class CueSdk(object):
 
         def raw_handler(ctx, e):
             evt = CorsairSessionStateChanged.create(e.contents)
+            self._on_session_state_changed(evt)
             on_state_changed(evt)
 
-        self.session_state_changed_event_handler = CorsairSessionStateChangedHandler(
-            raw_handler)
-
-        return CorsairError(
-            napi.CorsairConnect(self.session_state_changed_event_handler,
-                                None))
+        with self._session_lock:
+            handler = CorsairSessionStateChangedHandler(raw_handler)
+            self.session_state_changed_event_handler = handler
+            return CorsairError(self._napi.CorsairConnect(handler, None))
 
     def disconnect(self) -> CorsairError:
-        self.session_state_changed_event_handler = None
-        return CorsairError(napi.CorsairDisconnect())
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+        with self._session_lock:
+            self.session_state_changed_event_handler = None
+            self.event_handler = None
+            err = CorsairError(self._napi.CorsairDisconnect())
+            self._clear_session_caches()
+            queue, self._event_queue = self._event_queue, None
+        if queue is not None:
+            queue.stop()
+        # iCUE does not complete flushes of a closed session
+        self._fail_pending_flushes()
+        return err
+
+    def invalidate_topology_cache(self, device_id: Optional[str] = None):
+        if self._topology is None:
+            return
+        if device_id:
+            self._topology.invalidate(device_id)
+        else:
+            self._topology.clear()
+
+    def _clear_session_caches(self):
+        self._ids.clear()
+        self._properties.clear()
+        if self._key_states is not None:
+            self._key_states.clear()
+        self.invalidate_topology_cache()
+
+    def _on_session_state_changed(self, evt: CorsairSessionStateChanged):
+        if evt.state != CorsairSessionState.CSS_Connected:
+            self._clear_session_caches()
+        lost = evt.state in (CorsairSessionState.CSS_ConnectionLost,
+                             CorsairSessionState.CSS_Timeout)
+        if lost:
+            # flushes of the lost session are never completed
+            self._fail_pending_flushes()
+
+        supervisor = self._supervisor
+        if supervisor is None:
+            return
+        if evt.state == CorsairSessionState.CSS_Connected:
+            if supervisor.restoring:
+                # not from the native callback thread, which must return first
+                threading.Thread(target=self._restore_session,
+                                 name='cuesdk-restore',
+                                 daemon=True).start()
+        elif lost or (supervisor.restoring and evt.state not in (
+                CorsairSessionState.CSS_Connecting,
+                CorsairSessionState.CSS_Closed)):
+            # a reconnect attempt ending in any other state (e.g.
+            # CSS_ConnectionRefused) failed too; CSS_Closed follows the
+            # CorsairDisconnect that precedes each attempt
+            supervisor.on_lost()
+
+    def enable_auto_reconnect(self,
+                              initial_delay: float = 0.05,
+                              max_delay: float = 5.0,
+                              jitter: float = 0.5) -> 'ReconnectSupervisor':
+        """Reconnects after ``CSS_ConnectionLost`` / ``CSS_Timeout``.
+
+        From now on control requests, the layer priority, key event
+        configurations and the last committed LED colors of each device are
+        recorded, and replayed in one pass once the session is connected
+        again. Call before ``connect`` so the whole session is recorded.
+        """
+        with self._session_lock:
+            if self._supervisor is None:
+                from .supervisor import ReconnectSupervisor, SessionRecord
+                self._record = SessionRecord()
+                self._supervisor = ReconnectSupervisor(
+                    self._reconnect, initial_delay, max_delay, jitter)
+            return self._supervisor
+
+    @property
+    def supervisor(self) -> Optional['ReconnectSupervisor']:
+        return self._supervisor
+
+    def _reconnect(self) -> None:
+        with self._session_lock:
+            handler = self.session_state_changed_event_handler
+            if handler is None:
+                # disconnected by the user in the meantime
+                return
+            self._napi.CorsairDisconnect()
+            err = CorsairError(self._napi.CorsairConnect(handler, None))
+        if err != CorsairError.CE_Success:
+            self._supervisor.on_lost()
+
+    def _restore_session(self) -> None:
+        record = self._record
+        napi = self._napi
+        ids = self._ids
+        errors = []
+        with self._session_lock:
+            if self.event_handler is not None:
+                errors.append(
+                    napi.CorsairSubscribeForEvents(self.event_handler, None))
+            for device_id, level in list(record.access_levels.items()):
+                errors.append(
+                    napi.CorsairRequestControl(ids.get(device_id), level))
+            if record.layer_priority is not None:
+                errors.append(
+                    napi.CorsairSetLayerPriority(record.layer_priority))
+            for (device_id, _), configuration in list(
+                    record.key_events.items()):
+                cfg = CorsairKeyEventConfigurationNative()
+                cfg.keyId = configuration.key_id
+                cfg.isIntercepted = configuration.is_intercepted
+                errors.append(
+                    napi.CorsairConfigureKeyEvent(ids.get(device_id), cfg))
+            for device_id, colors in list(record.frames.items()):
+                with self._device_lock(device_id):
+                    data = colors.data
+                    errors.append(
+                        napi.CorsairSetLedColorsBuffer(
+                            ids.get(device_id), len(data), data))
+            if record.frames:
+                errors.append(
+                    napi.CorsairSetLedColorsFlushBufferAsync(None, None))
+        for err in errors:
+            if err != CorsairError.CE_Success:
+                self._supervisor.on_restore_failed(CorsairError(err))
+                return
+        self._supervisor.on_restored()
+
+    def _on_native_event(self, nevt):
+        if nevt.id == CorsairEventId.CEI_KeyEvent:
+            self._key_states.update(nevt.keyEvent[0])
+        elif nevt.id == CorsairEventId.CEI_DeviceConnectionStatusChangedEvent:
+            device_id = bytes_to_str_or_default(
+                nevt.deviceConnectionStatusChangedEvent[0].deviceId)
+            self._ids.invalidate(device_id)
+            self._properties.invalidate(device_id)
+            if self._key_states is not None:
+                self._key_states.clear(device_id)
+            self.invalidate_topology_cache(device_id)
+
+    @property
+    def key_states(self) -> 'KeyStateTracker':
+        """Pressed macro keys, kept current while subscribed for events."""
+        return self._ensure_key_states()
+
+    def _ensure_key_states(self) -> 'KeyStateTracker':
+        if self._key_states is None:
+            from .keys import KeyStateTracker
+            with self._session_lock:
+                if self._key_states is None:
+                    self._key_states = KeyStateTracker()
+        return self._key_states
 
     def get_session_details(self):
         res = None
         nobj = CorsairSessionDetailsNative()
-        err = CorsairError(napi.CorsairGetSessionDetails(nobj))
+        err = CorsairError(self._napi.CorsairGetSessionDetails(nobj))
         if err == CorsairError.CE_Success:
             res = CorsairSessionDetails.create(nobj)
         return (res, err)
@@ -107,16 +325,25 @@ class CueSdk(object):
         df = CorsairDeviceFilterNative(
             deviceTypeMask=device_filter.device_type_mask)
 
+        topology = self._topology
+        if topology is not None:
+            cached = topology.devices.get(df.deviceTypeMask)
+            if cached is not None:
+                return (list(cached), CorsairError(CorsairError.CE_Success))
+
         infos = (CorsairDeviceInfoNative * CORSAIR_DEVICE_COUNT_MAX)()
         cnt = c_int32()
         err = CorsairError(
-            napi.CorsairGetDevices(df, CORSAIR_DEVICE_COUNT_MAX, infos,
-                                   byref(cnt)))
+            self._napi.CorsairGetDevices(df, CORSAIR_DEVICE_COUNT_MAX, infos,
+                                         byref(cnt)))
 
         if err == CorsairError.CE_Success:
-            return ([
+            devices = [
                 CorsairDeviceInfo.create(infos[i]) for i in range(cnt.value)
-            ], err)
+            ]
+            if topology is not None:
+                topology.set_devices(df.deviceTypeMask, devices)
+            return (devices, err)
 
         return (None, err)
 
@@ -124,47 +351,116 @@ class CueSdk(object):
         if not device_id:
             return (None, CorsairError(CorsairError.CE_InvalidArguments))
 
+        topology = self._topology
+        if topology is not None:
+            cached = topology.device_infos.get(device_id)
+            if cached is not None:
+                return (cached, CorsairError(CorsairError.CE_Success))
+
         nobj = CorsairDeviceInfoNative()
         err = CorsairError(
-            napi.CorsairGetDeviceInfo(to_native_id(device_id), nobj))
+            self._napi.CorsairGetDeviceInfo(self._ids.get(device_id), nobj))
         if err == CorsairError.CE_Success:
-            return (CorsairDeviceInfo.create(nobj), err)
+            info = CorsairDeviceInfo.create(nobj)
+            if topology is not None:
+                topology.device_infos[device_id] = info
+            return (info, err)
         return (None, err)
 
     def get_led_positions(self, device_id: str):
         if not device_id:
             return (None, CorsairError(CorsairError.CE_InvalidArguments))
 
+        topology = self._topology
+        if topology is not None:
+            cached = topology.led_positions.get(device_id)
+            if cached is not None:
+                return (list(cached), CorsairError(CorsairError.CE_Success))
+
         leds = (CorsairLedPositionNative * CORSAIR_DEVICE_LEDCOUNT_MAX)()
         cnt = c_int32()
         err = CorsairError(
-            napi.CorsairGetLedPositions(to_native_id(device_id),
-                                        CORSAIR_DEVICE_LEDCOUNT_MAX, leds,
-                                        byref(cnt)))
+            self._napi.CorsairGetLedPositions(self._ids.get(device_id),
+                                              CORSAIR_DEVICE_LEDCOUNT_MAX,
+                                              leds, byref(cnt)))
 
         if err == CorsairError.CE_Success:
-            return ([
+            positions = [
                 CorsairLedPosition.create(leds[i]) for i in range(cnt.value)
-            ], err)
+            ]
+            if topology is not None:
+                topology.led_positions[device_id] = tuple(positions)
+            return (positions, err)
 
         return (None, err)
 
+    def get_led_spatial_index(self, device_id: str):
+        topology = self._topology
+        if topology is not None:
+            cached = topology.spatial_indexes.get(device_id)
+            if cached is not None:
+                return (cached, CorsairError(CorsairError.CE_Success))
+
+        positions, err = self.get_led_positions(device_id)
+        if err != CorsairError.CE_Success:
+            return (None, err)
+        from .spatial import LedSpatialIndex
+        index = LedSpatialIndex(positions)
+        if topology is not None:
+            topology.spatial_indexes[device_id] = index
+        return (index, err)
+
     def subscribe_for_events(
-            self, on_event: Callable[[CorsairEvent], None]) -> CorsairError:
+        self, on_event: Union[Callable[[CorsairEvent], None], 'EventQueue']
+    ) -> CorsairError:
         if on_event is None:
             return CorsairError(CorsairError.CE_InvalidArguments)
 
-        def raw_handler(ctx, e):
-            evt = CorsairEvent.create(e.contents)
-            on_event(evt)
-
-        self.event_handler = CorsairEventHandler(raw_handler)
-        return CorsairError(
-            napi.CorsairSubscribeForEvents(self.event_handler, None))
+        from .events import EventQueue
+        # key state is tracked from the first event on
+        self._ensure_key_states()
+        if isinstance(on_event, EventQueue):
+            queue = on_event
+
+            def raw_handler(ctx, e):
+                nevt = e.contents
+                self._on_native_event(nevt)
+                queue.push(nevt)
+        else:
+            queue = None
+
+            def raw_handler(ctx, e):
+                nevt = e.contents
+                self._on_native_event(nevt)
+                on_event(CorsairEvent.create(nevt))
+
+        with self._session_lock:
+            handler = CorsairEventHandler(raw_handler)
+            err = CorsairError(
+                self._napi.CorsairSubscribeForEvents(handler, None))
+            if err != CorsairError.CE_Success:
+                return err
+            self.event_handler = handler
+            # subscribing again with the running queue keeps it running
+            stale = self._event_queue
+            if stale is queue:
+                stale = None
+            if queue is not None:
+                queue.start()
+            self._event_queue = queue
+        # handlers on its workers may be waiting for the session lock
+        if stale is not None:
+            stale.stop()
+        return err
 
     def unsubscribe_from_events(self) -> CorsairError:
-        self.event_handler = None
-        return CorsairError(napi.CorsairUnsubscribeFromEvents())
+        with self._session_lock:
+            self.event_handler = None
+            err = CorsairError(self._napi.CorsairUnsubscribeFromEvents())
+            queue, self._event_queue = self._event_queue, None
+        if queue is not None:
+            queue.stop()
+        return err
 
     def configure_key_event(
             self, device_id: str,
@@ -175,8 +471,11 @@ class CueSdk(object):
         cfg = CorsairKeyEventConfigurationNative()
         cfg.keyId = configuration.key_id
         cfg.isIntercepted = configuration.is_intercepted
-        return CorsairError(
-            napi.CorsairConfigureKeyEvent(to_native_id(device_id), cfg))
+        err = CorsairError(
+            self._napi.CorsairConfigureKeyEvent(self._ids.get(device_id), cfg))
+        if self._record is not None and err == CorsairError.CE_Success:
+            self._record.configure_key_event(device_id, configuration)
+        return err
 
     def get_device_property_info(self,
                                  device_id: str,
@@ -188,13 +487,16 @@ class CueSdk(object):
         dt = c_uint32()
         flags = c_uint32()
         err = CorsairError(
-            napi.CorsairGetDevicePropertyInfo(to_native_id(device_id),
-                                              property_id, index, byref(dt),
-                                              byref(flags)))
+            self._napi.CorsairGetDevicePropertyInfo(self._ids.get(device_id),
+                                                    property_id, index,
+                                                    byref(dt), byref(flags)))
 
         res = None
         if err == CorsairError.CE_Success:
-            res = {'data_type': CorsairDataType(dt.value), 'flags': flags.value}
+            res = {
+                'data_type': CorsairDataType(dt.value),
+                'flags': flags.value
+            }
 
         return (res, err)
 
@@ -207,42 +509,124 @@ class CueSdk(object):
 
         nobj = CorsairPropertyNative()
         err = CorsairError(
-            napi.CorsairReadDeviceProperty(to_native_id(device_id),
-                                           property_id, index, nobj))
+            self._napi.CorsairReadDeviceProperty(self._ids.get(device_id),
+                                                 property_id, index, nobj))
 
         if err == CorsairError.CE_Success:
-            return (CorsairProperty.create(nobj), err)
+            try:
+                return (CorsairProperty.create(nobj), err)
+            finally:
+                self._napi.CorsairFreeProperty(nobj)
 
         return (None, err)
 
+    def read_device_properties(
+        self,
+        requests: Iterable[Tuple[str, CorsairDevicePropertyId, int]],
+        ttls: Optional[Mapping[CorsairDevicePropertyId, float]] = None
+    ) -> Dict[Tuple[str, CorsairDevicePropertyId, int],
+              Tuple[Optional[CorsairProperty], CorsairError]]:
+        cache = self._properties
+        now = time.monotonic()
+        results = {}
+        for key in requests:
+            if key in results:
+                continue
+            device_id, property_id, index = key
+            info = cache.infos.get(key)
+            if info is None:
+                info = self.get_device_property_info(device_id, property_id,
+                                                     index)
+                if info[1] == CorsairError.CE_Success:
+                    cache.infos[key] = info
+            res, err = info
+            if err != CorsairError.CE_Success:
+                results[key] = (None, err)
+                continue
+            if not res['flags'] & CorsairPropertyFlag.CPF_CanRead:
+                results[key] = (None,
+                                CorsairError(CorsairError.CE_NotAllowed))
+                continue
+
+            ttl = PROPERTY_TTLS.get(property_id, DEFAULT_PROPERTY_TTL)
+            if ttls is not None:
+                ttl = ttls.get(property_id, ttl)
+            prop = cache.get_value(key, ttl, now)
+            if prop is not None:
+                results[key] = (prop, CorsairError(CorsairError.CE_Success))
+                continue
+
+            prop, err = self.read_device_property(device_id, property_id,
+                                                  index)
+            if err == CorsairError.CE_Success:
+                cache.set_value(key, prop, now)
+            results[key] = (prop, err)
+        return results
+
     def write_device_property(self, device_id: str,
                               property_id: CorsairDevicePropertyId, index: int,
                               prop: Any) -> CorsairError:
+        return self._write_device_property(PropertyEncoder(), device_id,
+                                           property_id, index, prop)
+
+    def write_device_properties(
+        self, writes: Iterable[Tuple[str, CorsairDevicePropertyId, int, Any]]
+    ) -> Sequence[CorsairError]:
+        encoder = PropertyEncoder()
+        return [
+            self._write_device_property(encoder, device_id, property_id,
+                                        index, prop)
+            for device_id, property_id, index, prop in writes
+        ]
+
+    def _write_device_property(self, encoder: PropertyEncoder, device_id: str,
+                               property_id: CorsairDevicePropertyId,
+                               index: int, prop: Any) -> CorsairError:
         if not device_id or not property_id or index < 0 or not prop:
             return CorsairError(CorsairError.CE_InvalidArguments)
 
-        nobj = CorsairPropertyNative()
-        nobj.type = prop.type
-        nobj.value = prop.value  # TODO: convert value to native object
+        try:
+            nobj = encoder.encode(prop.type, prop.value)
+        except (TypeError, ValueError, KeyError):
+            return CorsairError(CorsairError.CE_InvalidArguments)
 
-        return CorsairError(
-            napi.CorsairWriteDeviceProperty(to_native_id(device_id),
-                                            property_id, index, nobj))
+        err = CorsairError(
+            self._napi.CorsairWriteDeviceProperty(self._ids.get(device_id),
+                                                  property_id, index, nobj))
+        if err == CorsairError.CE_Success:
+            self._properties.values.pop((device_id, property_id, index), None)
+        return err
 
     def request_control(self, device_id: str,
                         access_level: CorsairAccessLevel) -> CorsairError:
-        return CorsairError(
-            napi.CorsairRequestControl(to_native_id(device_id), access_level))
+        with self._device_lock(device_id):
+            err = CorsairError(
+                self._napi.CorsairRequestControl(self._ids.get(device_id),
+                                                 access_level))
+            if self._record is not None and err == CorsairError.CE_Success:
+                self._record.access_levels[device_id] = access_level
+        return err
 
     def release_control(self, device_id: Optional[str]) -> CorsairError:
-        return CorsairError(napi.CorsairReleaseControl(
-            to_native_id(device_id)))
+        # without a device id control is released for every device
+        lock = self._device_lock(device_id) if device_id else \
+            self._session_lock
+        with lock:
+            err = CorsairError(
+                self._napi.CorsairReleaseControl(self._ids.get(device_id)))
+            if self._record is not None and err == CorsairError.CE_Success:
+                self._record.release_control(device_id)
+        return err
 
     def set_layer_priority(self, priority: int) -> CorsairError:
         if not 0 <= priority <= CORSAIR_LAYER_PRIORITY_MAX:
             return CorsairError(CorsairError.CE_InvalidArguments)
 
-        return CorsairError(napi.CorsairSetLayerPriority(priority))
+        with self._session_lock:
+            err = CorsairError(self._napi.CorsairSetLayerPriority(priority))
+            if self._record is not None and err == CorsairError.CE_Success:
+                self._record.layer_priority = priority
+        return err
 
     def get_led_luid_for_key_name(self, device_id: str, key_name: str):
         if not device_id or not isinstance(key_name, str):
@@ -253,61 +637,166 @@ class CueSdk(object):
             return (None, CorsairError(CorsairError.CE_InvalidArguments))
         luid = c_uint32()
         err = CorsairError(
-            napi.CorsairGetLedLuidForKeyName(to_native_id(device_id), encoded,
-                                             byref(luid)))
+            self._napi.CorsairGetLedLuidForKeyName(self._ids.get(device_id),
+                                                   encoded, byref(luid)))
         if (err == CorsairError.CE_Success):
             return (int(luid.value), err)
         return (None, err)
 
+    def create_led_frame(self, device_id: str):
+        positions, err = self.get_led_positions(device_id)
+        if err == CorsairError.CE_Success:
+            return (LedFrame.from_positions(positions), err)
+        return (None, err)
+
     def set_led_colors(
             self, device_id: str,
-            led_colors: Collection[CorsairLedColor]) -> CorsairError:
+            led_colors: Union[Collection[CorsairLedColor], LedFrame]
+    ) -> CorsairError:
         if not device_id:
             return CorsairError(CorsairError.CE_InvalidArguments)
 
-        sz = len(led_colors)
-        data = (CorsairLedColorNative * sz)()
-        for i, led in enumerate(led_colors):
-            data[i] = CorsairLedColorNative(id=int(led.id),
-                                            r=led.r,
-                                            g=led.g,
-                                            b=led.b,
-                                            a=led.a)
-        return CorsairError(
-            napi.CorsairSetLedColors(to_native_id(device_id), sz, data))
+        sz, data = to_native_led_colors(led_colors)
+        return self._write_led_colors(False, device_id, sz, data)
 
     def set_led_colors_buffer(
             self, device_id: str,
-            led_colors: Collection[CorsairLedColor]) -> CorsairError:
+            led_colors: Union[Collection[CorsairLedColor], LedFrame]
+    ) -> CorsairError:
         if not device_id:
             return CorsairError(CorsairError.CE_InvalidArguments)
 
-        sz = len(led_colors)
-        data = (CorsairLedColorNative * sz)()
-        for i, led in enumerate(led_colors):
-            data[i] = CorsairLedColorNative(id=int(led.id),
-                                            r=led.r,
-                                            g=led.g,
-                                            b=led.b,
-                                            a=led.a)
-        return CorsairError(napi.CorsairSetLedColorsBuffer(
-            to_native_id(device_id), sz, data))
+        sz, data = to_native_led_colors(led_colors)
+        return self._write_led_colors(True, device_id, sz, data)
+
+    def submit_led_colors(
+        self,
+        frames: Mapping[str, Union[Collection[CorsairLedColor], LedFrame]],
+        callback: Optional[Callable[[CorsairError], None]] = None,
+        executor: Optional['Executor'] = None
+    ) -> Tuple[Dict[str, CorsairError], CorsairError]:
+        """Buffers the colors of many devices concurrently, then flushes.
+
+        Packing and ``set_led_colors_buffer`` run on ``executor`` (by default
+        a pool owned by this instance), one task per device. The flush is
+        skipped if any device failed; the returned error is then the first
+        device error.
+        """
+        if len(frames) > 1:
+            if executor is None:
+                executor = self._submit_executor()
+            futures = [(device_id,
+                        executor.submit(self.set_led_colors_buffer, device_id,
+                                        led_colors))
+                       for device_id, led_colors in frames.items()]
+            results = {device_id: f.result() for device_id, f in futures}
+        else:
+            results = {
+                device_id: self.set_led_colors_buffer(device_id, led_colors)
+                for device_id, led_colors in frames.items()
+            }
+        for err in results.values():
+            if err != CorsairError.CE_Success:
+                return (results, err)
+        return (results, self.set_led_colors_flush_buffer_async(callback))
+
+    def _submit_executor(self) -> 'Executor':
+        with self._session_lock:
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._executor = ThreadPoolExecutor(
+                    max_workers=min(32, CORSAIR_DEVICE_COUNT_MAX),
+                    thread_name_prefix='cuesdk-submit')
+            return self._executor
+
+    def _write_led_colors(self, buffered: bool, device_id: str, sz: int,
+                          data) -> CorsairError:
+        fn = (self._napi.CorsairSetLedColorsBuffer
+              if buffered else self._napi.CorsairSetLedColors)
+        nid = self._ids.get(device_id)
+        with self._device_lock(device_id):
+            err = CorsairError(fn(nid, sz, data))
+            record = self._record
+            if record is not None and err == CorsairError.CE_Success:
+                record.write_led_colors(device_id, sz, data, buffered)
+        return err
+
+    def set_led_colors_array(self, device_id: str, ids,
+                             rgba) -> CorsairError:
+        if not device_id:
+            return CorsairError(CorsairError.CE_InvalidArguments)
 
-    def set_led_colors_flush_buffer_async(
-            self,
-            callback: Optional[Callable[[CorsairError], None]]) -> CorsairError:
-        if not callback:
-            return CorsairError(
-                napi.CorsairSetLedColorsFlushBufferAsync(None, None))
+        sz, data = to_native_led_colors_array(ids, rgba)
+        if data is None:
+            return CorsairError(CorsairError.CE_InvalidArguments)
+        return self._write_led_colors(False, device_id, sz, data)
 
-        def raw_handler(ctx, e):
-            err = CorsairError(e)
-            callback(err)
+    def set_led_colors_buffer_array(self, device_id: str, ids,
+                                    rgba) -> CorsairError:
+        if not device_id:
+            return CorsairError(CorsairError.CE_InvalidArguments)
 
-        async_callback = CorsairAsyncCallback(raw_handler)
+        sz, data = to_native_led_colors_array(ids, rgba)
+        if data is None:
+            return CorsairError(CorsairError.CE_InvalidArguments)
+        return self._write_led_colors(True, device_id, sz, data)
 
-        return CorsairError(
-            napi.CorsairSetLedColorsFlushBufferAsync(async_callback, None))
+    def set_led_colors_flush_buffer_async(
+        self, callback: Optional[Callable[[CorsairError], None]]
+    ) -> CorsairError:
+        if self._instrumentation is not None:
+            callback = self._instrumentation.time_flush(callback)
+
+        # the completion is found again through the token passed as context
+        token = next(self._flush_tokens)
+        self._pending_flushes[token] = (callback, time.monotonic())
+        with self._session_lock:
+            err = CorsairError(
+                self._napi.CorsairSetLedColorsFlushBufferAsync(
+                    self._flush_trampoline, token))
+            if self._record is not None and err == CorsairError.CE_Success:
+                self._record.flushed()
+        if err != CorsairError.CE_Success:
+            self._pending_flushes.pop(token, None)
+        return err
+
+    @property
+    def flushes_in_flight(self) -> int:
+        """Number of flushes submitted but not completed yet."""
+        return len(self._pending_flushes)
+
+    @property
+    def oldest_flush_age(self) -> Optional[float]:
+        """Seconds since the oldest flush still in flight was submitted."""
+        try:
+            # tokens are inserted in submission order
+            _, started = next(iter(self._pending_flushes.values()))
+        except (StopIteration, RuntimeError):
+            # none in flight, or completed while looking
+            return None
+        return time.monotonic() - started
+
+    def _fail_pending_flushes(self) -> None:
+        callbacks = []
+        pending = self._pending_flushes
+        while pending:
+            try:
+                callbacks.append(pending.popitem()[1][0])
+            except KeyError:
+                # completed concurrently
+                break
+        err = CorsairError(CorsairError.CE_NotConnected)
+        for callback in callbacks:
+            if callback:
+                callback(err)
+
+    def _on_flush_completed(self, ctx, e):
+        try:
+            callback, _ = self._pending_flushes.pop(ctx)
+        except KeyError:
+            return
+        if callback:
+            callback(CorsairError(e))
 
     def get_led_colors(self, device_id: str,
                        led_colors: Sequence[CorsairLedColor]):
@@ -319,9 +808,23 @@ class CueSdk(object):
         for i in range(sz):
             data[i].id = int(led_colors[i].id)
         err = CorsairError(
-            napi.CorsairGetLedColors(to_native_id(device_id), sz, data))
+            self._napi.CorsairGetLedColors(self._ids.get(device_id), sz, data))
         if err == CorsairError.CE_Success:
             return (list([CorsairLedColor.create(data[i])
                           for i in range(sz)]), err)
 
         return (None, err)
+
+    def get_led_colors_array(self, device_id: str, ids):
+        if not device_id:
+            return (None, CorsairError(CorsairError.CE_InvalidArguments))
+
+        sz, data = to_native_led_ids_array(ids)
+        if data is None:
+            return (None, CorsairError(CorsairError.CE_InvalidArguments))
+        err = CorsairError(
+            self._napi.CorsairGetLedColors(self._ids.get(device_id), sz, data))
+        if err == CorsairError.CE_Success:
+            return (native_led_colors_to_rgba(data), err)
+
+        return (None, err)
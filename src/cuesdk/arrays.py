@@ -0,0 +1,78 @@
+from ctypes import sizeof
+
+from .native import CorsairLedColor as CorsairLedColorNative
+
+__all__ = ['led_color_dtype']
+
+_dtype = None
+
+
+def import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("NumPy is required for array-based LED colors; "
+                          "install it with `pip install cuesdk[numpy]`"
+                          ) from None
+    return numpy
+
+
+def led_color_dtype():
+    global _dtype
+    if _dtype is None:
+        np = import_numpy()
+        _dtype = np.dtype({
+            'names': ['id', 'rgba'],
+            'formats': ['=u4', ('u1', (4, ))],
+            'offsets': [
+                CorsairLedColorNative.id.offset,
+                CorsairLedColorNative.r.offset
+            ],
+            'itemsize': sizeof(CorsairLedColorNative)
+        })
+    return _dtype
+
+
+def as_structured_array(data):
+    np = import_numpy()
+    return np.frombuffer(data, dtype=led_color_dtype())
+
+
+def is_valid_led_color_arrays(ids, rgba):
+    return (ids.ndim == 1 and rgba.ndim == 2 and rgba.shape[1] in (3, 4)
+            and len(ids) == len(rgba))
+
+
+def to_native_led_colors_array(ids, rgba):
+    np = import_numpy()
+    ids = np.asarray(ids)
+    rgba = np.asarray(rgba)
+    if not is_valid_led_color_arrays(ids, rgba):
+        return (0, None)
+
+    sz = len(ids)
+    data = (CorsairLedColorNative * sz)()
+    view = as_structured_array(data)
+    view['id'] = ids
+    if rgba.shape[1] == 4:
+        view['rgba'] = rgba
+    else:
+        view['rgba'][:, :3] = rgba
+        view['rgba'][:, 3] = 255
+    return (sz, data)
+
+
+def to_native_led_ids_array(ids):
+    np = import_numpy()
+    ids = np.asarray(ids)
+    if ids.ndim != 1:
+        return (0, None)
+
+    sz = len(ids)
+    data = (CorsairLedColorNative * sz)()
+    as_structured_array(data)['id'] = ids
+    return (sz, data)
+
+
+def native_led_colors_to_rgba(data):
+    return as_structured_array(data)['rgba'].copy()
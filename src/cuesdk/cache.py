@@ -0,0 +1,116 @@
+import math
+import threading
+from ctypes import create_string_buffer
+from typing import Optional
+
+from .enums import CorsairDevicePropertyId
+from .native import CORSAIR_STRING_SIZE_M, CORSAIR_DEVICE_COUNT_MAX
+
+__all__ = [
+    'DeviceIdCache', 'TopologyCache', 'PropertyCache', 'PROPERTY_TTLS',
+    'DEFAULT_PROPERTY_TTL'
+]
+
+
+class DeviceIdCache(object):
+    """Bounded cache of encoded native ``CorsairDeviceId`` buffers."""
+
+    def __init__(self, maxsize: int = CORSAIR_DEVICE_COUNT_MAX) -> None:
+        self._maxsize = maxsize
+        self._ids = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def get(self, device_id: Optional[str]):
+        if not device_id:
+            return None
+        nid = self._ids.get(device_id)
+        if nid is None:
+            with self._lock:
+                nid = self._ids.get(device_id)
+                if nid is None:
+                    if len(self._ids) >= self._maxsize:
+                        self._ids.pop(next(iter(self._ids), None), None)
+                    nid = create_string_buffer(device_id.encode('utf-8'),
+                                               CORSAIR_STRING_SIZE_M)
+                    self._ids[device_id] = nid
+        return nid
+
+    def invalidate(self, device_id: str) -> None:
+        self._ids.pop(device_id, None)
+
+    def clear(self) -> None:
+        self._ids.clear()
+
+
+class TopologyCache(object):
+    """Memoized device lists, device info and LED positions."""
+
+    def __init__(self) -> None:
+        self.devices = {}
+        self.device_infos = {}
+        self.led_positions = {}
+        self.spatial_indexes = {}
+
+    def set_devices(self, device_type_mask: int, devices) -> None:
+        self.devices[device_type_mask] = tuple(devices)
+        for d in devices:
+            self.device_infos[d.device_id] = d
+
+    def invalidate(self, device_id: str) -> None:
+        self.devices.clear()
+        self.device_infos.pop(device_id, None)
+        self.led_positions.pop(device_id, None)
+        self.spatial_indexes.pop(device_id, None)
+
+    def clear(self) -> None:
+        self.devices.clear()
+        self.device_infos.clear()
+        self.led_positions.clear()
+        self.spatial_indexes.clear()
+
+
+# seconds a property value read through CueSdk.read_device_properties stays
+# fresh; properties that cannot change while a session is up never expire
+DEFAULT_PROPERTY_TTL = 1.0
+PROPERTY_TTLS = {
+    CorsairDevicePropertyId.CDPI_PropertyArray: math.inf,
+    CorsairDevicePropertyId.CDPI_PhysicalLayout: math.inf,
+    CorsairDevicePropertyId.CDPI_LogicalLayout: math.inf,
+    CorsairDevicePropertyId.CDPI_MacroKeyArray: math.inf,
+    CorsairDevicePropertyId.CDPI_BatteryLevel: 30.0,
+    CorsairDevicePropertyId.CDPI_ChannelLedCount: 5.0,
+    CorsairDevicePropertyId.CDPI_ChannelDeviceCount: 5.0,
+    CorsairDevicePropertyId.CDPI_ChannelDeviceLedCountArray: 5.0,
+    CorsairDevicePropertyId.CDPI_ChannelDeviceTypeArray: 5.0,
+}
+
+
+class PropertyCache(object):
+    """Property info table and timestamped property values."""
+
+    def __init__(self) -> None:
+        self.infos = {}
+        self.values = {}
+
+    def get_value(self, key, ttl: float, now: float):
+        entry = self.values.get(key)
+        if entry is not None and now - entry[0] < ttl:
+            return entry[1]
+        return None
+
+    def set_value(self, key, value, now: float) -> None:
+        self.values[key] = (now, value)
+
+    def invalidate(self, device_id: str) -> None:
+        # runs on iCUE's event thread while callers may be inserting; list()
+        # copies the keys in one step, iterating the dict itself could fail
+        for table in (self.infos, self.values):
+            for key in [k for k in list(table) if k[0] == device_id]:
+                table.pop(key, None)
+
+    def clear(self) -> None:
+        self.infos.clear()
+        self.values.clear()
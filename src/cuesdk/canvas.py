@@ -0,0 +1,140 @@
+import math
+from array import array
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional
+
+from .enums import CorsairError
+from .frame import LedFrame
+from .structs import CorsairLedPosition
+
+__all__ = ['DevicePlacement', 'LedCanvas']
+
+
+@dataclass(frozen=True)
+class DevicePlacement():
+    """Maps device LED coordinates (``cx``/``cy``) onto canvas pixels.
+
+    LED coordinates are scaled, rotated (degrees, counterclockwise, around
+    the device origin) and then offset.
+    """
+    x: float = 0.0
+    y: float = 0.0
+    scale_x: float = 1.0
+    scale_y: float = 1.0
+    rotation: float = 0.0
+
+    def apply(self, cx: float, cy: float):
+        sx, sy = cx * self.scale_x, cy * self.scale_y
+        if self.rotation:
+            a = math.radians(self.rotation)
+            sx, sy = (sx * math.cos(a) - sy * math.sin(a),
+                      sx * math.sin(a) + sy * math.cos(a))
+        return (sx + self.x, sy + self.y)
+
+
+class _CanvasDevice(object):
+
+    def __init__(self, frame: LedFrame, pixels: array) -> None:
+        self.frame = frame
+        self.pixels = pixels
+        self.byte_indices = array('I', (4 * p + c for p in pixels
+                                        for c in range(4)))
+        self.np_pixels = None
+
+
+class LedCanvas(object):
+    """Shared RGBA image sampled into the LED frames of many devices.
+
+    Every device is registered once with its LED positions and placement;
+    this precomputes a table with the canvas pixel of each LED. ``render``
+    then gathers a whole ``width`` x ``height`` RGBA image (row-major, 4
+    bytes per pixel, or a NumPy ``(height, width, 4)`` uint8 array) into the
+    per-device ``LedFrame`` buffers, and ``submit`` sends all of them
+    followed by a single flush.
+    """
+
+    def __init__(self, width: int, height: int) -> None:
+        if width <= 0 or height <= 0:
+            raise ValueError("Canvas size must be positive")
+        self.width = width
+        self.height = height
+        self._devices: Dict[str, _CanvasDevice] = {}
+
+    @property
+    def device_ids(self):
+        return tuple(self._devices)
+
+    def frame(self, device_id: str) -> LedFrame:
+        return self._devices[device_id].frame
+
+    def add_device(
+        self,
+        device_id: str,
+        positions: Iterable[CorsairLedPosition],
+        placement: DevicePlacement = DevicePlacement()
+    ) -> LedFrame:
+        positions = list(positions)
+        w, h = self.width, self.height
+        pixels = array('I')
+        for p in positions:
+            x, y = placement.apply(p.cx, p.cy)
+            px = min(max(int(x), 0), w - 1)
+            py = min(max(int(y), 0), h - 1)
+            pixels.append(py * w + px)
+        frame = LedFrame.from_positions(positions)
+        self._devices[device_id] = _CanvasDevice(frame, pixels)
+        return frame
+
+    def add_sdk_device(
+        self,
+        sdk,
+        device_id: str,
+        placement: DevicePlacement = DevicePlacement()):
+        positions, err = sdk.get_led_positions(device_id)
+        if err != CorsairError.CE_Success:
+            return (None, err)
+        return (self.add_device(device_id, positions, placement), err)
+
+    def remove_device(self, device_id: str) -> None:
+        self._devices.pop(device_id, None)
+
+    def render(self, image) -> None:
+        if hasattr(image, '__array_interface__'):
+            self._render_array(image)
+            return
+
+        img = memoryview(image).cast('B')
+        if len(img) != self.width * self.height * 4:
+            raise ValueError("Expected a %dx%d RGBA image" %
+                             (self.width, self.height))
+        getter = img.__getitem__
+        for d in self._devices.values():
+            d.frame.set_rgba_bytes(bytes(map(getter, d.byte_indices)))
+
+    def _render_array(self, image) -> None:
+        from .arrays import import_numpy
+        np = import_numpy()
+        if image.shape[:2] != (self.height, self.width):
+            raise ValueError("Expected a %dx%d image" %
+                             (self.width, self.height))
+        pixels = image.reshape(self.width * self.height, image.shape[2])
+        for d in self._devices.values():
+            if d.np_pixels is None:
+                d.np_pixels = np.frombuffer(d.pixels, dtype=np.uint32)
+            rgba = d.frame.as_array()['rgba']
+            if pixels.shape[1] == 4:
+                np.take(pixels, d.np_pixels, axis=0, out=rgba)
+            else:
+                rgba[:, :3] = pixels[d.np_pixels]
+                rgba[:, 3] = 255
+
+    def submit(
+        self,
+        sdk,
+        callback: Optional[Callable[[CorsairError], None]] = None
+    ) -> CorsairError:
+        for device_id, d in self._devices.items():
+            err = sdk.set_led_colors_buffer(device_id, d.frame)
+            if err != CorsairError.CE_Success:
+                return err
+        return sdk.set_led_colors_flush_buffer_async(callback)
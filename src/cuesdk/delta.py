@@ -0,0 +1,111 @@
+from typing import Callable, Collection, Optional, Union
+
+from .enums import CorsairError
+from .frame import LedFrame
+from .structs import CorsairLedColor
+
+__all__ = ['DeltaEncoder']
+
+
+class DeltaEncoder(object):
+    """Sends only the LEDs whose color changed since the last commit.
+
+    Wraps a ``CueSdk`` and exposes the same ``set_led_colors``,
+    ``set_led_colors_buffer`` and ``set_led_colors_flush_buffer_async``
+    methods, so it can be used in place of the SDK, e.g. as the sink of a
+    ``RenderScheduler``. With ``full_refresh_interval`` set, every n-th
+    submission for a device resends all known LEDs of that device.
+    """
+
+    def __init__(self, sdk, full_refresh_interval: int = 0) -> None:
+        self._sdk = sdk
+        self._full_refresh_interval = full_refresh_interval
+        self._committed = {}
+        self._submissions = {}
+        self.submitted = 0
+        self.skipped = 0
+        self.full_refreshes = 0
+
+    def stats(self):
+        return {
+            'submitted': self.submitted,
+            'skipped': self.skipped,
+            'full_refreshes': self.full_refreshes
+        }
+
+    def reset_stats(self) -> None:
+        self.submitted = 0
+        self.skipped = 0
+        self.full_refreshes = 0
+
+    def invalidate(self, device_id: Optional[str] = None) -> None:
+        if device_id is None:
+            self._committed.clear()
+            self._submissions.clear()
+        else:
+            self._committed.pop(device_id, None)
+            self._submissions.pop(device_id, None)
+
+    def set_led_colors(
+            self, device_id: str,
+            led_colors: Union[Collection[CorsairLedColor], LedFrame]
+    ) -> CorsairError:
+        return self._submit(self._sdk.set_led_colors, device_id, led_colors)
+
+    def set_led_colors_buffer(
+            self, device_id: str,
+            led_colors: Union[Collection[CorsairLedColor], LedFrame]
+    ) -> CorsairError:
+        return self._submit(self._sdk.set_led_colors_buffer, device_id,
+                            led_colors)
+
+    def set_led_colors_flush_buffer_async(
+        self, callback: Optional[Callable[[CorsairError], None]]
+    ) -> CorsairError:
+        return self._sdk.set_led_colors_flush_buffer_async(callback)
+
+    @property
+    def flushes_in_flight(self) -> int:
+        return self._sdk.flushes_in_flight
+
+    @property
+    def oldest_flush_age(self) -> Optional[float]:
+        return self._sdk.oldest_flush_age
+
+    def _submit(self, fn, device_id, led_colors):
+        if isinstance(led_colors, LedFrame):
+            led_colors = led_colors.to_led_colors()
+
+        committed = self._committed.get(device_id, {})
+        n = self._submissions.get(device_id, 0) + 1
+        interval = self._full_refresh_interval
+        full = interval > 0 and n % interval == 0
+
+        changed = {}
+        unchanged = 0
+        for led in led_colors:
+            led_id = int(led.id)
+            color = (led.r, led.g, led.b, led.a)
+            if full or committed.get(led_id) != color:
+                changed[led_id] = color
+            else:
+                unchanged += 1
+        if full:
+            for led_id, color in committed.items():
+                changed.setdefault(led_id, color)
+
+        self._submissions[device_id] = n
+        self.skipped += unchanged
+        if not changed:
+            return CorsairError(CorsairError.CE_Success)
+
+        err = fn(device_id, [
+            CorsairLedColor(led_id, *color)
+            for led_id, color in changed.items()
+        ])
+        if err == CorsairError.CE_Success:
+            self._committed.setdefault(device_id, {}).update(changed)
+            self.submitted += len(changed)
+            if full:
+                self.full_refreshes += 1
+        return err
@@ -13,51 +13,53 @@ class EnumerationType(type):
         if "_members_" not in namespace:
             _members_ = {
                 k: v
-                for k, v in namespace.items() if not k.startswith("_")
+                for k, v in namespace.items()
+                if not k.startswith("_") and isinstance(v, int)
             }
             namespace["_members_"] = _members_
         else:
             _members_ = namespace["_members_"]
 
         namespace["_reverse_map_"] = {v: k for k, v in _members_.items()}
-        return super().__new__(metacls, name, bases, namespace)
+        cls = super().__new__(metacls, name, bases, namespace)
+
+        # members are preallocated singletons; calling the class looks them up
+        cls._value_map_ = {}
+        for k, v in _members_.items():
+            member = cls._value_map_.get(v)
+            if member is None:
+                member = int.__new__(cls, v)
+                cls._value_map_[v] = member
+            type.__setattr__(cls, k, member)
+        return cls
+
+    def __call__(cls, value):
+        try:
+            return cls._value_map_[value]
+        except (KeyError, TypeError):
+            raise ValueError("%d is not a valid value for %s" %
+                             (value, cls.__name__)) from None
 
     def __repr__(self):
         return "<Enumeration %s>" % self.__name__
 
 
-class Enumeration(metaclass=EnumerationType):
+class Enumeration(int, metaclass=EnumerationType):
+    __slots__ = ()
 
-    def __init__(self, value):
-        if value not in self._reverse_map_:
-            raise ValueError("%d is not a valid value for %s" %
-                             (value, type(self).__name__))
-        self.value = value
+    @property
+    def value(self):
+        return int(self)
 
     def __repr__(self):
-        return "<%s: %d>" % (self.__str__(), self.value)
+        return "<%s: %d>" % (self.__str__(), self)
 
     def __str__(self):
         return "%s.%s" % (type(self).__name__,
-                          self._reverse_map_.get(self.value, '(unknown)'))
-
-    def __hash__(self):
-        return self.value
-
-    def __int__(self):
-        return self.value
-
-    def __eq__(self, other):
-        if isinstance(other, int):
-            return self.value == other
-
-        return type(self) == type(other) and self.value == other.value
-
-    def __lt__(self, other):
-        if isinstance(other, int):
-            return self.value < other
+                          self._reverse_map_.get(self, '(unknown)'))
 
-        return type(self) == type(other) and self.value < other.value
+    def __reduce__(self):
+        return (type(self), (int(self), ))
 
 
 class CorsairError(Enumeration):
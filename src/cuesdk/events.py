@@ -0,0 +1,157 @@
+import threading
+import traceback
+from ctypes import Structure, Union, byref, c_uint, memmove, sizeof
+from typing import Callable
+
+from .enums import CorsairEventId
+from .structs import (CorsairEvent, CorsairKeyEvent,
+                      CorsairDeviceConnectionStatusChangedEvent)
+from .native import (
+    CorsairKeyEvent as CorsairKeyEventNative,
+    CorsairDeviceConnectionStatusChangedEvent as
+    CorsairDeviceConnectionStatusChangedEventNative)
+
+__all__ = ['EventQueue']
+
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+BLOCK = 'block'
+
+_KEY_EVENT = int(CorsairEventId.CEI_KeyEvent)
+_CONNECTION_EVENT = int(CorsairEventId.CEI_DeviceConnectionStatusChangedEvent)
+
+
+class _EventPayload(Union):
+    _fields_ = [('deviceConnectionStatusChangedEvent',
+                 CorsairDeviceConnectionStatusChangedEventNative),
+                ('keyEvent', CorsairKeyEventNative)]
+
+
+class _EventSlot(Structure):
+    _fields_ = [('id', c_uint), ('payload', _EventPayload)]
+
+
+class EventQueue(object):
+    """Bounded ring buffer between iCUE's event thread and user handlers.
+
+    Pass an instance to ``CueSdk.subscribe_for_events`` in place of a
+    handler. The native callback then only copies the raw event payload into
+    a preallocated slot and returns; ``workers`` consumer threads build the
+    ``CorsairEvent`` dataclasses and call ``on_event``. When the ring is
+    full, ``overflow`` decides whether the oldest event is overwritten
+    (``'drop_oldest'``), the new one is discarded (``'drop_newest'``) or the
+    native thread waits for room (``'block'``). With more than one worker,
+    handlers may observe events out of order.
+    """
+
+    def __init__(self,
+                 on_event: Callable[[CorsairEvent], None],
+                 capacity: int = 256,
+                 overflow: str = DROP_OLDEST,
+                 workers: int = 1) -> None:
+        if capacity <= 0 or workers <= 0:
+            raise ValueError("capacity and workers must be positive")
+        if overflow not in (DROP_OLDEST, DROP_NEWEST, BLOCK):
+            raise ValueError("Unknown overflow policy %r" % overflow)
+        self._on_event = on_event
+        self._capacity = capacity
+        self._overflow = overflow
+        self._workers = workers
+        self._slots = (_EventSlot * capacity)()
+        self._head = 0
+        self._count = 0
+        self._cond = threading.Condition(threading.Lock())
+        self._threads = []
+        self._running = False
+        self.received = 0
+        self.dropped = 0
+        self.processed = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def push(self, nevt) -> bool:
+        eid = nevt.id
+        if eid == _KEY_EVENT:
+            src, sz = nevt.keyEvent, sizeof(CorsairKeyEventNative)
+        elif eid == _CONNECTION_EVENT:
+            src = nevt.deviceConnectionStatusChangedEvent
+            sz = sizeof(CorsairDeviceConnectionStatusChangedEventNative)
+        else:
+            return False
+
+        cond = self._cond
+        with cond:
+            self.received += 1
+            if self._count == self._capacity:
+                if self._overflow == DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                if self._overflow == DROP_OLDEST:
+                    self._head = (self._head + 1) % self._capacity
+                    self._count -= 1
+                    self.dropped += 1
+                else:
+                    while self._count == self._capacity and self._running:
+                        cond.wait()
+                    if self._count == self._capacity:
+                        self.dropped += 1
+                        return False
+            slot = self._slots[(self._head + self._count) % self._capacity]
+            slot.id = eid
+            memmove(byref(slot.payload), src, sz)
+            self._count += 1
+            cond.notify_all()
+        return True
+
+    def start(self) -> None:
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._threads = [
+            threading.Thread(target=self._consume,
+                             name='cuesdk-event-queue-%d' % i,
+                             daemon=True) for i in range(self._workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        for t in self._threads:
+            if t is not threading.current_thread():
+                t.join()
+        self._threads = []
+
+    def _consume(self) -> None:
+        scratch = _EventSlot()
+        cond = self._cond
+        while True:
+            with cond:
+                while not self._count and self._running:
+                    cond.wait()
+                if not self._count:
+                    return
+                memmove(byref(scratch), byref(self._slots[self._head]),
+                        sizeof(_EventSlot))
+                self._head = (self._head + 1) % self._capacity
+                self._count -= 1
+                self.processed += 1
+                cond.notify_all()
+
+            if scratch.id == _KEY_EVENT:
+                data = CorsairKeyEvent.create(scratch.payload.keyEvent)
+            else:
+                data = CorsairDeviceConnectionStatusChangedEvent.create(
+                    scratch.payload.deviceConnectionStatusChangedEvent)
+            try:
+                self._on_event(CorsairEvent(CorsairEventId(scratch.id), data))
+            except Exception:
+                traceback.print_exc()
@@ -0,0 +1,96 @@
+from array import array
+from typing import Iterable, Optional, Tuple
+
+from .structs import CorsairLedColor, CorsairLedPosition
+from .native import CorsairLedColor as CorsairLedColorNative
+
+__all__ = ['LedFrame']
+
+_LED_COLOR_SIZE = 8
+_R_OFFSET = 4
+
+
+class LedFrame(object):
+    """Reusable native LED color buffer for a fixed set of LED ids.
+
+    The frame owns a single ``CorsairLedColor`` ctypes array that is passed
+    as-is to ``CueSdk.set_led_colors`` / ``set_led_colors_buffer``, so it can
+    be mutated in place and submitted every frame without allocating.
+    """
+
+    def __init__(self, led_ids: Iterable[int]) -> None:
+        ids = array('I', (int(led_id) for led_id in led_ids))
+        self._index = {led_id: i for i, led_id in enumerate(ids)}
+        if len(self._index) != len(ids):
+            raise ValueError("Duplicate LED ids")
+        self._data = (CorsairLedColorNative * len(ids))()
+        self._buffer = memoryview(self._data).cast('B')
+        self._buffer.cast('I')[0::2] = ids
+
+    @classmethod
+    def from_positions(cls, positions: Iterable[CorsairLedPosition]):
+        return cls(p.id for p in positions)
+
+    @property
+    def data(self):
+        return self._data
+
+    @property
+    def buffer(self) -> memoryview:
+        return self._buffer
+
+    @property
+    def ids(self) -> Tuple[int, ...]:
+        return tuple(self._index)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, led_id) -> bool:
+        return int(led_id) in self._index
+
+    def index_of(self, led_id: int) -> Optional[int]:
+        return self._index.get(int(led_id))
+
+    def set(self, led_id: int, r: int, g: int, b: int, a: int = 255) -> None:
+        self.set_at(self._index[int(led_id)], r, g, b, a)
+
+    def set_at(self, index: int, r: int, g: int, b: int, a: int = 255) -> None:
+        offset = index * _LED_COLOR_SIZE + _R_OFFSET
+        self._buffer[offset:offset + 4] = bytes((r, g, b, a))
+
+    def get(self, led_id: int) -> Tuple[int, int, int, int]:
+        return self.get_at(self._index[int(led_id)])
+
+    def get_at(self, index: int) -> Tuple[int, int, int, int]:
+        offset = index * _LED_COLOR_SIZE + _R_OFFSET
+        return tuple(self._buffer[offset:offset + 4])
+
+    def fill(self, r: int, g: int, b: int, a: int = 255) -> None:
+        n = len(self._data)
+        buf = self._buffer
+        for i, c in enumerate((r, g, b, a)):
+            buf[_R_OFFSET + i::_LED_COLOR_SIZE] = bytes((c, )) * n
+
+    def set_rgba_bytes(self, rgba) -> None:
+        """Copy packed ``r, g, b, a`` bytes (4 per LED, in frame order)."""
+        src = memoryview(rgba).cast('B')
+        if len(src) != len(self._data) * 4:
+            raise ValueError("Expected %d bytes, got %d" %
+                             (len(self._data) * 4, len(src)))
+        buf = self._buffer
+        for i in range(4):
+            buf[_R_OFFSET + i::_LED_COLOR_SIZE] = src[i::4]
+
+    def update(self, led_colors: Iterable[CorsairLedColor]) -> None:
+        index = self._index
+        for led in led_colors:
+            self.set_at(index[int(led.id)], led.r, led.g, led.b, led.a)
+
+    def as_array(self):
+        """Structured NumPy view (``id``, ``rgba``) over the native buffer."""
+        from .arrays import as_structured_array
+        return as_structured_array(self._data)
+
+    def to_led_colors(self):
+        return [CorsairLedColor.create(c) for c in self._data]
@@ -0,0 +1,198 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Optional
+
+from .enums import CorsairError
+
+__all__ = ['Instrumentation', 'InstrumentedApi', 'LATENCY_BUCKETS']
+
+# upper bounds in seconds, the last bucket is +Inf
+LATENCY_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+                   1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0)
+
+# native functions taking (device_id, size, led_colors)
+_LED_FUNCTIONS = frozenset(('CorsairSetLedColors', 'CorsairSetLedColorsBuffer',
+                            'CorsairGetLedColors'))
+
+
+class _Histogram(object):
+    __slots__ = ('counts', 'total')
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'count': sum(self.counts),
+            'sum_seconds': self.total,
+            'buckets': list(zip(LATENCY_BUCKETS + (float('inf'), ),
+                                self.counts)),
+        }
+
+
+class _CallStats(object):
+    __slots__ = ('latency', 'results', 'leds')
+
+    def __init__(self) -> None:
+        self.latency = _Histogram()
+        self.results = {}
+        self.leds = 0
+
+
+def _result_name(result) -> str:
+    if isinstance(result, bool):
+        return str(result).lower()
+    return CorsairError._reverse_map_.get(result, str(result))
+
+
+class Instrumentation(object):
+    """Counters and latency histograms for native SDK calls.
+
+    Pass an instance to ``CueSdk(instrumentation=...)``; every native
+    function is then timed, its results are counted per ``CorsairError`` and
+    the number of LEDs passed to the LED color functions is summed. Flushes
+    also record their round-trip time, from submission to the completion
+    callback. Without an instance ``CueSdk`` calls the native functions
+    directly and pays nothing.
+
+    Histogram buckets are per-bucket counts; the exporters turn them into
+    cumulative Prometheus buckets.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _CallStats] = {}
+        self._flush = _Histogram()
+
+    def record(self, name: str, seconds: float, result, leds: int = 0) -> None:
+        with self._lock:
+            stats = self._calls.get(name)
+            if stats is None:
+                stats = self._calls[name] = _CallStats()
+            stats.latency.observe(seconds)
+            stats.results[result] = stats.results.get(result, 0) + 1
+            stats.leds += leds
+
+    def time_flush(self, callback: Optional[Callable[[CorsairError], None]]):
+        start = time.perf_counter()
+
+        def on_flushed(err):
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._flush.observe(elapsed)
+            if callback:
+                callback(err)
+
+        return on_flushed
+
+    def reset(self) -> None:
+        with self._lock:
+            self._calls.clear()
+            self._flush = _Histogram()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = {}
+            for name, stats in self._calls.items():
+                entry = stats.latency.snapshot()
+                entry['results'] = {
+                    _result_name(r): n
+                    for r, n in stats.results.items()
+                }
+                entry['leds'] = stats.leds
+                calls[name] = entry
+            return {
+                'calls': calls,
+                'flush_round_trip': self._flush.snapshot()
+            }
+
+    def to_json(self, **kwargs) -> str:
+        snapshot = self.snapshot()
+        for entry in list(snapshot['calls'].values()) + [
+                snapshot['flush_round_trip']
+        ]:
+            entry['buckets'] = [[_le(b), n] for b, n in entry['buckets']]
+        return json.dumps(snapshot, **kwargs)
+
+    def to_prometheus(self, prefix: str = 'cuesdk') -> str:
+        snapshot = self.snapshot()
+        lines = []
+
+        def histogram(metric, entry, labels=''):
+            cumulative = 0
+            for bound, n in entry['buckets']:
+                cumulative += n
+                lines.append('%s_bucket{%sle="%s"} %d' %
+                             (metric, labels, _le(bound), cumulative))
+            suffix = '{%s}' % labels.rstrip(',') if labels else ''
+            lines.append('%s_sum%s %r' %
+                         (metric, suffix, entry['sum_seconds']))
+            lines.append('%s_count%s %d' % (metric, suffix, entry['count']))
+
+        metric = prefix + '_native_call_seconds'
+        lines.append('# TYPE %s histogram' % metric)
+        for name, entry in sorted(snapshot['calls'].items()):
+            histogram(metric, entry, 'function="%s",' % name)
+
+        metric = prefix + '_native_calls_total'
+        lines.append('# TYPE %s counter' % metric)
+        for name, entry in sorted(snapshot['calls'].items()):
+            for result, n in sorted(entry['results'].items()):
+                lines.append('%s{function="%s",result="%s"} %d' %
+                             (metric, name, result, n))
+
+        metric = prefix + '_native_leds_total'
+        lines.append('# TYPE %s counter' % metric)
+        for name, entry in sorted(snapshot['calls'].items()):
+            if name in _LED_FUNCTIONS:
+                lines.append('%s{function="%s"} %d' %
+                             (metric, name, entry['leds']))
+
+        metric = prefix + '_flush_round_trip_seconds'
+        lines.append('# TYPE %s histogram' % metric)
+        histogram(metric, snapshot['flush_round_trip'])
+        return '\n'.join(lines) + '\n'
+
+
+def _le(bound: float) -> str:
+    return '+Inf' if bound == float('inf') else repr(bound)
+
+
+class InstrumentedApi(object):
+    """Wraps a native API (or a backend) and times every ``Corsair*`` call."""
+
+    def __init__(self, napi, instrumentation: Instrumentation) -> None:
+        self._napi = napi
+        self._instrumentation = instrumentation
+
+    def __getattr__(self, name):
+        fn = getattr(self._napi, name)
+        if not name.startswith('Corsair') or not callable(fn):
+            return fn
+        record = self._instrumentation.record
+        counter = time.perf_counter
+
+        if name in _LED_FUNCTIONS:
+
+            def wrapper(*args):
+                start = counter()
+                result = fn(*args)
+                record(name, counter() - start, result, args[1])
+                return result
+        else:
+
+            def wrapper(*args):
+                start = counter()
+                result = fn(*args)
+                record(name, counter() - start, result)
+                return result
+
+        setattr(self, name, wrapper)
+        return wrapper
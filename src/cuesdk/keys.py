@@ -0,0 +1,194 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .enums import CorsairMacroKeyId
+
+__all__ = ['KeyStateTracker', 'KeyChordMatcher']
+
+KeyHandler = Callable[[str], None]
+
+
+def _device_key(device_id: str) -> bytes:
+    return device_id.encode('utf-8')
+
+
+def _mask(keys: Iterable[int]) -> int:
+    mask = 0
+    for key in keys:
+        mask |= 1 << int(key)
+    return mask
+
+
+class KeyStateTracker(object):
+    """Pressed macro keys of every device, one integer bitset per device.
+
+    ``update`` takes the raw native ``CorsairKeyEvent`` straight from the
+    event callback (``CueSdk`` does this for every key event before any
+    handler runs), so state is current without building ``CorsairEvent``
+    dataclasses. Bit ``n`` of a device's bitset is set while the key with
+    ``CorsairMacroKeyId`` ``n`` is held down. Registered matchers are fed
+    from the same call; a press reported again for a key that is already
+    held is ignored.
+    """
+
+    def __init__(self) -> None:
+        self._states: Dict[bytes, int] = {}
+        self._matchers: Tuple['KeyChordMatcher', ...] = ()
+
+    def update(self, nkey_event) -> None:
+        device, key = nkey_event.deviceId, nkey_event.keyId
+        pressed = nkey_event.isPressed
+        bits = self._states.get(device, 0)
+        if pressed:
+            if bits >> key & 1:
+                # a repeated report of a held key is not a new key press
+                return
+            bits |= 1 << key
+        else:
+            bits &= ~(1 << key)
+        self._states[device] = bits
+        for matcher in self._matchers:
+            matcher.feed(device, key, pressed, bits)
+
+    def add_matcher(self, matcher: 'KeyChordMatcher') -> None:
+        self._matchers += (matcher, )
+
+    def remove_matcher(self, matcher: 'KeyChordMatcher') -> None:
+        self._matchers = tuple(m for m in self._matchers if m is not matcher)
+
+    def bits(self, device_id: str) -> int:
+        return self._states.get(_device_key(device_id), 0)
+
+    def is_pressed(self, device_id: str, key_id: CorsairMacroKeyId) -> bool:
+        return bool(self.bits(device_id) >> int(key_id) & 1)
+
+    def pressed(self, device_id: str) -> Tuple[CorsairMacroKeyId, ...]:
+        bits = self.bits(device_id)
+        keys = []
+        while bits:
+            low = bits & -bits
+            keys.append(CorsairMacroKeyId(low.bit_length() - 1))
+            bits ^= low
+        return tuple(keys)
+
+    def clear(self, device_id: Optional[str] = None) -> None:
+        if device_id:
+            self._states.pop(_device_key(device_id), None)
+        else:
+            self._states.clear()
+
+
+class KeyChordMatcher(object):
+    """Chords and key sequences compiled into a small state machine.
+
+    A chord fires when its last key goes down while all its other keys are
+    held. Sequences fire when their keys are pressed in order, with at most
+    ``sequence_timeout`` seconds between two presses; all sequences share
+    one automaton (a trie with Aho-Corasick failure transitions, expanded
+    into a transition table), so each key press costs a single table lookup
+    per device. Handlers receive the device id and run on the thread that
+    delivered the event.
+    """
+
+    def __init__(self,
+                 sequence_timeout: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self._timeout = sequence_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._chords: Dict[int, List[Tuple[int, KeyHandler]]] = {}
+        self._sequences: List[Tuple[Tuple[int, ...], KeyHandler]] = []
+        self._delta: Dict[Tuple[int, int], int] = {}
+        self._accept: Dict[int, Tuple[KeyHandler, ...]] = {}
+        self._positions: Dict[bytes, Tuple[int, float]] = {}
+
+    def add_chord(self, keys: Iterable[CorsairMacroKeyId],
+                  handler: KeyHandler) -> None:
+        mask = _mask(keys)
+        if not mask:
+            raise ValueError("A chord needs at least one key")
+        key = 0
+        while mask >> key:
+            if mask >> key & 1:
+                self._chords.setdefault(key, []).append((mask, handler))
+            key += 1
+
+    def add_sequence(self, keys: Iterable[CorsairMacroKeyId],
+                     handler: KeyHandler) -> None:
+        keys = tuple(int(key) for key in keys)
+        if not keys:
+            raise ValueError("A sequence needs at least one key")
+        with self._lock:
+            self._sequences.append((keys, handler))
+            self._compile()
+            self._positions.clear()
+
+    def _compile(self) -> None:
+        goto: List[Dict[int, int]] = [{}]
+        outputs: List[List[KeyHandler]] = [[]]
+        for keys, handler in self._sequences:
+            state = 0
+            for key in keys:
+                nxt = goto[state].get(key)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][key] = nxt
+                    goto.append({})
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(handler)
+
+        alphabet = {key for keys, _ in self._sequences for key in keys}
+        fail = [0] * len(goto)
+        delta = {}
+        order = deque()
+        for key in alphabet:
+            nxt = goto[0].get(key, 0)
+            delta[(0, key)] = nxt
+            if nxt:
+                order.append(nxt)
+        while order:
+            state = order.popleft()
+            outputs[state] = outputs[state] + outputs[fail[state]]
+            for key in alphabet:
+                nxt = goto[state].get(key)
+                if nxt is None:
+                    delta[(state, key)] = delta[(fail[state], key)]
+                else:
+                    fail[nxt] = delta[(fail[state], key)]
+                    delta[(state, key)] = nxt
+                    order.append(nxt)
+
+        # transitions back to the root are implied by a missing entry
+        self._delta = {k: v for k, v in delta.items() if v}
+        self._accept = {
+            state: tuple(handlers)
+            for state, handlers in enumerate(outputs) if handlers
+        }
+
+    def feed(self, device: bytes, key: int, pressed: bool, bits: int) -> None:
+        if not pressed:
+            return
+        fired = []
+        for mask, handler in self._chords.get(key, ()):
+            if bits & mask == mask:
+                fired.append(handler)
+
+        if self._delta:
+            now = self._clock()
+            state, last = self._positions.get(device, (0, now))
+            if now - last > self._timeout:
+                state = 0
+            state = self._delta.get((state, key), 0)
+            self._positions[device] = (state, now)
+            fired.extend(self._accept.get(state, ()))
+
+        if fired:
+            device_id = device.decode('utf-8')
+            for handler in fired:
+                handler(device_id)
+
+    def reset(self) -> None:
+        self._positions.clear()
@@ -40,108 +40,78 @@ CorsairAsyncCallback = CFUNCTYPE(None, c_void_p, CorsairError)
 CorsairEventHandler = CFUNCTYPE(None, c_void_p, POINTER(CorsairEvent))
 
 
-class CorsairNativeApi():
-
-    def __init__(self, libpath):
-        lib = load_library(libpath)
-
-        def create_func(fn, restype, argtypes):
-            f = lib.__getattr__(fn)
-            f.restype = restype
-            f.argtypes = argtypes
-            return f
-
-        self.CorsairConnect = create_func(
-            'CorsairConnect', CorsairError,
-            [CorsairSessionStateChangedHandler, c_void_p])
-
-        self.CorsairGetSessionDetails = create_func(
-            'CorsairGetSessionDetails', CorsairError,
-            [POINTER(CorsairSessionDetails)])
-
-        self.CorsairDisconnect = create_func('CorsairDisconnect', CorsairError,
-                                             None)
-
-        self.CorsairGetDevices = create_func(
-            'CorsairGetDevices', CorsairError, [
-                POINTER(CorsairDeviceFilter), c_int32,
-                POINTER(CorsairDeviceInfo), c_int32_p
-            ])
-
-        self.CorsairGetDeviceInfo = create_func(
-            'CorsairGetDeviceInfo', CorsairError,
-            [CorsairDeviceId, POINTER(CorsairDeviceInfo)])
-
-        self.CorsairGetLedPositions = create_func(
-            'CorsairGetLedPositions', CorsairError,
-            [CorsairDeviceId, c_int32,
-             POINTER(CorsairLedPosition), c_int32_p])
-
-        self.CorsairSubscribeForEvents = create_func(
-            'CorsairSubscribeForEvents', CorsairError,
-            [CorsairEventHandler, c_void_p])
-
-        self.CorsairUnsubscribeFromEvents = create_func(
-            'CorsairUnsubscribeFromEvents', CorsairError, None)
+# name -> (restype, argtypes); functions are bound on first use
+_SIGNATURES = {
+    'CorsairConnect':
+    (CorsairError, [CorsairSessionStateChangedHandler, c_void_p]),
+    'CorsairGetSessionDetails':
+    (CorsairError, [POINTER(CorsairSessionDetails)]),
+    'CorsairDisconnect': (CorsairError, None),
+    'CorsairGetDevices': (CorsairError, [
+        POINTER(CorsairDeviceFilter), c_int32,
+        POINTER(CorsairDeviceInfo), c_int32_p
+    ]),
+    'CorsairGetDeviceInfo':
+    (CorsairError, [CorsairDeviceId, POINTER(CorsairDeviceInfo)]),
+    'CorsairGetLedPositions': (CorsairError, [
+        CorsairDeviceId, c_int32,
+        POINTER(CorsairLedPosition), c_int32_p
+    ]),
+    'CorsairSubscribeForEvents':
+    (CorsairError, [CorsairEventHandler, c_void_p]),
+    'CorsairUnsubscribeFromEvents': (CorsairError, None),
+    'CorsairConfigureKeyEvent':
+    (CorsairError, [CorsairDeviceId,
+                    POINTER(CorsairKeyEventConfiguration)]),
+    'CorsairGetDevicePropertyInfo': (CorsairError, [
+        CorsairDeviceId, CorsairDevicePropertyId, c_uint32,
+        POINTER(CorsairDataType), c_uint32_p
+    ]),
+    'CorsairReadDeviceProperty': (CorsairError, [
+        CorsairDeviceId, CorsairDevicePropertyId, c_uint32,
+        POINTER(CorsairProperty)
+    ]),
+    'CorsairWriteDeviceProperty': (CorsairError, [
+        CorsairDeviceId, CorsairDevicePropertyId, c_uint32,
+        POINTER(CorsairProperty)
+    ]),
+    'CorsairFreeProperty': (CorsairError, [POINTER(CorsairProperty)]),
+    'CorsairSetLedColors':
+    (CorsairError, [CorsairDeviceId, c_int32,
+                    POINTER(CorsairLedColor)]),
+    'CorsairSetLedColorsBuffer':
+    (CorsairError, [CorsairDeviceId, c_int32,
+                    POINTER(CorsairLedColor)]),
+    'CorsairSetLedColorsFlushBufferAsync':
+    (CorsairError, [CorsairAsyncCallback, c_void_p]),
+    'CorsairGetLedColors':
+    (c_bool, [CorsairDeviceId, c_int32,
+              POINTER(CorsairLedColor)]),
+    'CorsairSetLayerPriority': (CorsairError, [c_uint32]),
+    'CorsairGetLedLuidForKeyName':
+    (CorsairError, [CorsairDeviceId, c_char,
+                    POINTER(CorsairLedLuid)]),
+    'CorsairRequestControl':
+    (CorsairError, [CorsairDeviceId, CorsairAccessMode]),
+    'CorsairReleaseControl': (CorsairError, [CorsairDeviceId]),
+}
 
-        self.CorsairConfigureKeyEvent = create_func(
-            'CorsairConfigureKeyEvent', CorsairError,
-            [CorsairDeviceId,
-             POINTER(CorsairKeyEventConfiguration)])
 
-        self.CorsairGetDevicePropertyInfo = create_func(
-            'CorsairGetDevicePropertyInfo', CorsairError, [
-                CorsairDeviceId, CorsairDevicePropertyId, c_uint32,
-                POINTER(CorsairDataType), c_uint32_p
-            ])
-
-        self.CorsairReadDeviceProperty = create_func(
-            'CorsairReadDeviceProperty', CorsairError, [
-                CorsairDeviceId, CorsairDevicePropertyId, c_uint32,
-                POINTER(CorsairProperty)
-            ])
-
-        self.CorsairWriteDeviceProperty = create_func(
-            'CorsairWriteDeviceProperty', CorsairError, [
-                CorsairDeviceId, CorsairDevicePropertyId, c_uint32,
-                POINTER(CorsairProperty)
-            ])
-
-        self.CorsairFreeProperty = create_func('CorsairFreeProperty',
-                                               CorsairError,
-                                               [POINTER(CorsairProperty)])
-
-        self.CorsairSetLedColors = create_func(
-            'CorsairSetLedColors', CorsairError,
-            [CorsairDeviceId, c_int32,
-             POINTER(CorsairLedColor)])
-
-        self.CorsairSetLedColorsBuffer = create_func(
-            'CorsairSetLedColorsBuffer', CorsairError,
-            [CorsairDeviceId, c_int32,
-             POINTER(CorsairLedColor)])
-
-        self.CorsairSetLedColorsFlushBufferAsync = create_func(
-            'CorsairSetLedColorsFlushBufferAsync', CorsairError,
-            [CorsairAsyncCallback, c_void_p])
-
-        self.CorsairGetLedColors = create_func(
-            'CorsairGetLedColors', c_bool,
-            [CorsairDeviceId, c_int32,
-             POINTER(CorsairLedColor)])
-
-        self.CorsairSetLayerPriority = create_func('CorsairSetLayerPriority',
-                                                   CorsairError, [c_uint32])
-
-        self.CorsairGetLedLuidForKeyName = create_func(
-            'CorsairGetLedLuidForKeyName', CorsairError,
-            [CorsairDeviceId, c_char,
-             POINTER(CorsairLedLuid)])
-
-        self.CorsairRequestControl = create_func(
-            'CorsairRequestControl', CorsairError,
-            [CorsairDeviceId, CorsairAccessMode])
+class CorsairNativeApi():
 
-        self.CorsairReleaseControl = create_func('CorsairReleaseControl',
-                                                 CorsairError,
-                                                 [CorsairDeviceId])
+    def __init__(self, libpath):
+        self._lib = load_library(libpath)
+
+    def __getattr__(self, fn):
+        # only called for functions that have not been bound yet
+        signature = _SIGNATURES.get(fn)
+        if signature is None:
+            raise AttributeError(fn)
+        f = self._lib.__getattr__(fn)
+        f.restype, f.argtypes = signature
+        setattr(self, fn, f)
+        return f
+
+    def bind_all(self):
+        for fn in _SIGNATURES:
+            getattr(self, fn)
@@ -0,0 +1,175 @@
+from array import array
+from numbers import Integral
+from typing import Iterable, Sequence, Tuple
+
+from .frame import LedFrame, _LED_COLOR_SIZE, _R_OFFSET
+from .helpers import ColorRgb
+
+__all__ = ['Palette', 'gamma_table', 'brightness_table']
+
+
+def _to_rgba(color) -> Tuple[int, int, int, int]:
+    if isinstance(color, str):
+        color = ColorRgb.from_hexstr(color)
+    rgba = tuple(int(c) for c in color)
+    if len(rgba) == 3:
+        rgba += (255, )
+    if len(rgba) != 4 or not all(0 <= c <= 255 for c in rgba):
+        raise ValueError("Invalid color %r" % (color, ))
+    return rgba
+
+
+def gamma_table(gamma: float) -> bytes:
+    """256-entry table mapping a linear channel value to ``v ** gamma``."""
+    return bytes(round(255 * (v / 255)**gamma) for v in range(256))
+
+
+def brightness_table(brightness: float) -> bytes:
+    """256-entry table scaling a channel value by ``brightness``."""
+    return bytes(
+        min(max(round(v * brightness), 0), 255) for v in range(256))
+
+
+class Palette(object):
+    """Color lookup table packed as ``r, g, b, a`` bytes.
+
+    ``apply`` maps a field of per-LED intensities through the table into a
+    ``LedFrame``. Byte intensities (``bytes``, ``bytearray``, ``array('B')``)
+    are translated one channel at a time with ``bytes.translate`` and copied
+    into the frame buffer with strided slice assignments, so no Python code
+    runs per LED; NumPy intensity arrays (``uint8`` or floats in ``[0, 1]``)
+    go through ``numpy.take``. Gamma and brightness corrections are folded
+    into the table by ``corrected``, so they cost nothing per frame.
+    """
+
+    def __init__(self, rgba) -> None:
+        rgba = bytes(memoryview(rgba).cast('B'))
+        if not rgba or len(rgba) % 4:
+            raise ValueError("Expected packed RGBA bytes")
+        self._rgba = rgba
+        size = len(rgba) // 4
+        # channel planes resampled to 256 entries, for bytes.translate
+        lookup = [v * (size - 1) // 255 for v in range(256)]
+        self._planes = tuple(
+            rgba[c::4] if size == 256 else bytes(
+                map(rgba[c::4].__getitem__, lookup)) for c in range(4))
+        self._np_table = None
+
+    @classmethod
+    def gradient(cls, stops: Iterable[Tuple[float, object]], size: int = 256):
+        """Linear gradient through ``(position, color)`` stops in [0, 1].
+
+        Colors may be ``ColorRgb``, hex strings or ``(r, g, b[, a])``.
+        """
+        stops = sorted((float(p), _to_rgba(c)) for p, c in stops)
+        if not stops:
+            raise ValueError("A gradient needs at least one stop")
+        if size < 2:
+            raise ValueError("size must be at least 2")
+        out = bytearray(4 * size)
+        k = 0
+        for i in range(size):
+            t = i / (size - 1)
+            while k < len(stops) - 1 and stops[k + 1][0] <= t:
+                k += 1
+            p0, c0 = stops[k]
+            if k == len(stops) - 1 or t <= p0:
+                color = c0
+            else:
+                p1, c1 = stops[k + 1]
+                f = (t - p0) / (p1 - p0)
+                color = (round(a + (b - a) * f) for a, b in zip(c0, c1))
+            out[4 * i:4 * i + 4] = bytes(color)
+        return cls(out)
+
+    @classmethod
+    def from_colors(cls, colors: Sequence[object], size: int = 256):
+        """Gradient through evenly spaced ``colors``."""
+        n = len(colors)
+        if n == 1:
+            return cls.gradient([(0.0, colors[0])], size)
+        return cls.gradient(((i / (n - 1), c) for i, c in enumerate(colors)),
+                            size)
+
+    @property
+    def rgba(self) -> bytes:
+        return self._rgba
+
+    def __len__(self) -> int:
+        return len(self._rgba) // 4
+
+    def __getitem__(self, index: int) -> Tuple[int, int, int, int]:
+        offset = index * 4
+        return tuple(self._rgba[offset:offset + 4])
+
+    def corrected(self,
+                  gamma: float = 1.0,
+                  brightness: float = 1.0,
+                  alpha: bool = False):
+        """Palette with gamma, then brightness, applied to r, g and b.
+
+        The alpha channel is left alone unless ``alpha`` is true.
+        """
+        table = gamma_table(gamma).translate(brightness_table(brightness))
+        rgba = bytearray(self._rgba)
+        for c in range(4 if alpha else 3):
+            rgba[c::4] = rgba[c::4].translate(table)
+        return Palette(rgba)
+
+    def apply(self, frame: LedFrame, intensities) -> None:
+        """Writes ``palette[intensity]`` for every LED of ``frame``.
+
+        ``intensities`` is a byte buffer with one byte per LED, a NumPy array
+        or a sequence of floats in ``[0, 1]``; a sequence holding ints or
+        values out of range raises ``ValueError`` (pass bytes instead).
+        """
+        if hasattr(intensities, '__array_interface__'):
+            self._apply_array(frame, intensities)
+            return
+
+        n = len(frame)
+        if len(intensities) != n:
+            raise ValueError("Expected %d intensities, got %d" %
+                             (n, len(intensities)))
+        buf = frame.buffer
+        try:
+            src = memoryview(intensities).cast('B')
+        except TypeError:
+            src = None
+        if src is not None and src.nbytes == n:
+            src = src.tobytes()
+            for c, plane in enumerate(self._planes):
+                buf[_R_OFFSET + c::_LED_COLOR_SIZE] = src.translate(plane)
+            return
+
+        # float intensities in [0, 1]
+        top = len(self) - 1
+        idx = array('I')
+        for v in intensities:
+            if isinstance(v, Integral) or not 0.0 <= v <= 1.0:
+                raise ValueError(
+                    "Expected float intensities in [0, 1] or one byte per "
+                    "LED, got %r" % (v, ))
+            idx.append(int(v * top + 0.5))
+        rgba = self._rgba
+        for c in range(4):
+            plane = rgba[c::4]
+            buf[_R_OFFSET + c::_LED_COLOR_SIZE] = bytes(
+                map(plane.__getitem__, idx))
+
+    def _apply_array(self, frame: LedFrame, intensities) -> None:
+        from .arrays import import_numpy
+        np = import_numpy()
+        if self._np_table is None:
+            self._np_table = np.frombuffer(self._rgba, dtype=np.uint8).reshape(
+                len(self), 4)
+        x = intensities.reshape(-1)
+        if len(x) != len(frame):
+            raise ValueError("Expected %d intensities, got %d" %
+                             (len(frame), len(x)))
+        top = len(self) - 1
+        if x.dtype == np.uint8:
+            idx = x if top == 255 else x.astype(np.intp) * top // 255
+        else:
+            idx = np.clip(x * top + 0.5, 0, top).astype(np.intp)
+        np.take(self._np_table, idx, axis=0, out=frame.as_array()['rgba'])
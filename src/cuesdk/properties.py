@@ -0,0 +1,110 @@
+import sys
+from ctypes import c_bool, c_char_p, c_double, c_int32, sizeof
+from typing import Any
+
+from .enums import CorsairDataType
+from .native import CorsairProperty as CorsairPropertyNative
+
+__all__ = ['PropertyEncoder']
+
+_SCALARS = {
+    CorsairDataType.CT_Boolean: 'boolean',
+    CorsairDataType.CT_Int32: 'int32',
+    CorsairDataType.CT_Float64: 'float64',
+}
+
+_ARRAYS = {
+    CorsairDataType.CT_Boolean_Array: ('boolean_array', c_bool),
+    CorsairDataType.CT_Int32_Array: ('int32_array', c_int32),
+    CorsairDataType.CT_Float64_Array: ('float64_array', c_double),
+    CorsairDataType.CT_String_Array: ('string_array', c_char_p),
+}
+
+# buffer formats whose items can be copied bit for bit into each ctypes type
+# (as long as the item sizes match too)
+_BUFFER_FORMATS = {
+    c_bool: '?',
+    c_int32: 'bhilq',
+    c_double: 'efd',
+}
+
+_NATIVE_ORDER = '@=' + ('<' if sys.byteorder == 'little' else '>')
+
+
+def _is_compatible(view: memoryview, ctype) -> bool:
+    fmt = view.format
+    if fmt[:1] in _NATIVE_ORDER:
+        fmt = fmt[1:]
+    return (view.ndim == 1 and view.itemsize == sizeof(ctype)
+            and len(fmt) == 1 and fmt in _BUFFER_FORMATS[ctype])
+
+
+def _to_bytes(s) -> bytes:
+    return s.encode('utf-8') if isinstance(s, str) else bytes(s)
+
+
+class PropertyEncoder(object):
+    """Packs Python values into a native ``CorsairProperty``.
+
+    Array items are stored in one ctypes array per item type, which is kept
+    by the encoder (so it stays alive while the native call uses it) and
+    reused by later ``encode`` calls as long as it is large enough. Numeric
+    arrays may also be given as buffers (``array``, ``memoryview``, NumPy
+    arrays) whose item type matches the property's; they are copied in one
+    ``memoryview`` assignment. Other buffers (a different item size, type
+    code or byte order) are converted item by item, which raises
+    ``TypeError`` for items the property's type cannot hold.
+    """
+
+    def __init__(self) -> None:
+        self.nobj = CorsairPropertyNative()
+        self._arrays = {}
+
+    def encode(self, data_type: CorsairDataType, value: Any):
+        data_type = CorsairDataType(data_type)
+        nobj = self.nobj
+        nobj.type = data_type
+        if data_type in _SCALARS:
+            setattr(nobj.value, _SCALARS[data_type], value)
+        elif data_type == CorsairDataType.CT_String:
+            nobj.value.string = _to_bytes(value)
+        else:
+            name, ctype = _ARRAYS[data_type]
+            items, count = self._pack_array(ctype, value)
+            arr = getattr(nobj.value, name)
+            arr.items = items
+            arr.count = count
+        return nobj
+
+    def _storage(self, ctype, n: int):
+        storage = self._arrays.get(ctype)
+        if storage is None or len(storage) < n:
+            storage = (ctype * max(n, 1))()
+            self._arrays[ctype] = storage
+        return storage
+
+    def _pack_array(self, ctype, value):
+        if ctype is c_char_p:
+            value = [_to_bytes(v) for v in value]
+        elif not isinstance(value, (list, tuple)):
+            try:
+                view = memoryview(value)
+            except TypeError:
+                value = list(value)
+            else:
+                if _is_compatible(view, ctype):
+                    n = len(view)
+                    storage = self._storage(ctype, n)
+                    memoryview(storage).cast('B')[:view.nbytes] = view.cast(
+                        'B')
+                    return (storage, n)
+                try:
+                    value = view.tolist()
+                except NotImplementedError:
+                    # formats memoryview cannot unpack (non-native order)
+                    value = list(value)
+
+        n = len(value)
+        storage = self._storage(ctype, n)
+        storage[:n] = value
+        return (storage, n)
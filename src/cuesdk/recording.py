@@ -0,0 +1,578 @@
+import mmap
+import struct
+import threading
+import time
+from ctypes import (Array, Structure, byref, c_char, c_int32, c_uint32,
+                    create_string_buffer, sizeof)
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from .enums import CorsairDataType, CorsairEventId, CorsairSessionState
+from .properties import PropertyEncoder
+from .structs import CorsairProperty
+from .native import (CORSAIR_STRING_SIZE_M, CorsairAsyncCallback,
+                     CorsairEventHandler, CorsairSessionStateChangedHandler,
+                     CorsairDeviceConnectionStatusChangedEvent,
+                     CorsairKeyEvent, CorsairDeviceFilter, CorsairDeviceInfo,
+                     CorsairKeyEventConfiguration, CorsairLedColor,
+                     CorsairLedPosition, CorsairSessionDetails, CorsairProperty
+                     as CorsairPropertyNative)
+
+__all__ = ['Recorder', 'RecordingApi', 'Record', 'Recording', 'Replayer']
+
+_MAGIC = b'CUEREC\x00\x01'
+
+# kind, code, nanoseconds since the recorder was opened, result, payload size
+_HEADER = struct.Struct('<BBqiI')
+
+_OPEN, _CALL, _COMPLETION, _EVENT, _STATE = range(5)
+_KINDS = ('open', 'call', 'completion', 'event', 'state')
+
+# function codes are stored in the log; only ever append to this tuple
+_FUNCTIONS = ('CorsairConnect', 'CorsairGetSessionDetails',
+              'CorsairDisconnect', 'CorsairGetDevices', 'CorsairGetDeviceInfo',
+              'CorsairGetLedPositions', 'CorsairSubscribeForEvents',
+              'CorsairUnsubscribeFromEvents', 'CorsairConfigureKeyEvent',
+              'CorsairGetDevicePropertyInfo', 'CorsairReadDeviceProperty',
+              'CorsairWriteDeviceProperty', 'CorsairFreeProperty',
+              'CorsairSetLedColors', 'CorsairSetLedColorsBuffer',
+              'CorsairSetLedColorsFlushBufferAsync', 'CorsairGetLedColors',
+              'CorsairSetLayerPriority', 'CorsairGetLedLuidForKeyName',
+              'CorsairRequestControl', 'CorsairReleaseControl')
+_FUNCTION_CODES = {name: code for code, name in enumerate(_FUNCTIONS)}
+
+# argument tags
+(_NONE, _INT, _BYTES, _ID, _CALLBACK, _STRUCT, _ARRAY, _OUT, _OUT_ARRAY,
+ _OUT_REF, _PROPERTY, _PREVIOUS) = range(12)
+
+# native types of struct, array and output arguments; append only
+_TYPES = (CorsairLedColor, CorsairKeyEventConfiguration, CorsairDeviceFilter,
+          CorsairSessionDetails, CorsairDeviceInfo, CorsairLedPosition,
+          CorsairPropertyNative, c_int32, c_uint32)
+_TYPE_CODES = {t: code for code, t in enumerate(_TYPES)}
+
+# arguments the native function only writes to; their contents are not
+# logged, the replayer passes zeroed objects of the same type and size
+_OUTPUTS = frozenset((
+    ('CorsairGetSessionDetails', 0),
+    ('CorsairGetDevices', 2),
+    ('CorsairGetDeviceInfo', 1),
+    ('CorsairGetLedPositions', 2),
+    ('CorsairReadDeviceProperty', 3),
+))
+
+_CALLBACK_TYPES = (CorsairSessionStateChangedHandler, CorsairEventHandler,
+                   CorsairAsyncCallback)
+_CArgObject = type(byref(c_int32()))
+
+_PROPERTY_FORMATS = {
+    CorsairDataType.CT_Boolean: '?',
+    CorsairDataType.CT_Int32: 'i',
+    CorsairDataType.CT_Float64: 'd',
+    CorsairDataType.CT_Boolean_Array: '?',
+    CorsairDataType.CT_Int32_Array: 'i',
+    CorsairDataType.CT_Float64_Array: 'd',
+}
+
+# payload pointer field of each event id
+_EVENT_PAYLOADS = {
+    CorsairEventId.CEI_KeyEvent: 'keyEvent',
+    CorsairEventId.CEI_DeviceConnectionStatusChangedEvent:
+    'deviceConnectionStatusChangedEvent',
+}
+
+_pack_int = struct.Struct('<Bq').pack
+_pack_sized = struct.Struct('<BH').pack
+_pack_typed = struct.Struct('<BB').pack
+_pack_array = struct.Struct('<BBI').pack
+_pack_property_header = struct.Struct('<BIII').pack
+_pack_token = struct.Struct('<q').pack
+
+
+def _pack_property(nobj) -> bytes:
+    prop = CorsairProperty.create(nobj)
+    value = prop.value
+    if prop.type == CorsairDataType.CT_String:
+        count, data = 1, value or b''
+    elif prop.type == CorsairDataType.CT_String_Array:
+        count, data = len(value), b'\0'.join(value)
+    else:
+        values = value if isinstance(value, tuple) else (value, )
+        count = len(values)
+        data = struct.pack('<%d%s' % (count, _PROPERTY_FORMATS[prop.type]),
+                           *values)
+    return _pack_property_header(_PROPERTY, prop.type, count, len(data)) + data
+
+
+def _unpack_property(data_type: int, count: int, data) -> Any:
+    data_type = CorsairDataType(data_type)
+    if data_type == CorsairDataType.CT_String:
+        return bytes(data)
+    if data_type == CorsairDataType.CT_String_Array:
+        return tuple(bytes(data).split(b'\0')) if count else ()
+    values = struct.unpack('<%d%s' % (count, _PROPERTY_FORMATS[data_type]),
+                           data)
+    if data_type in (CorsairDataType.CT_Boolean, CorsairDataType.CT_Int32,
+                     CorsairDataType.CT_Float64):
+        return values[0]
+    return values
+
+
+def _encode_args(name: str, args, chunks: List) -> None:
+    for index, arg in enumerate(args):
+        if arg is None:
+            chunks.append(bytes((_NONE, )))
+        elif isinstance(arg, int):
+            chunks.append(_pack_int(_INT, arg))
+        elif isinstance(arg, bytes):
+            chunks.append(_pack_sized(_BYTES, len(arg)))
+            chunks.append(arg)
+        elif isinstance(arg, _CALLBACK_TYPES):
+            chunks.append(bytes((_CALLBACK, )))
+        elif isinstance(arg, Array):
+            if arg._type_ is c_char:
+                value = arg.value
+                chunks.append(_pack_sized(_ID, len(value)))
+                chunks.append(value)
+            elif (name, index) in _OUTPUTS:
+                chunks.append(
+                    _pack_array(_OUT_ARRAY, _TYPE_CODES[arg._type_], len(arg)))
+            else:
+                # LED colors: the raw bytes of the native buffer
+                chunks.append(
+                    _pack_array(_ARRAY, _TYPE_CODES[arg._type_], len(arg)))
+                chunks.append(memoryview(arg).cast('B'))
+        elif isinstance(arg, Structure):
+            code = _TYPE_CODES[type(arg)]
+            if name == 'CorsairFreeProperty':
+                chunks.append(_pack_typed(_PREVIOUS, code))
+            elif (name, index) in _OUTPUTS:
+                chunks.append(_pack_typed(_OUT, code))
+            elif isinstance(arg, CorsairPropertyNative):
+                chunks.append(_pack_property(arg))
+            else:
+                chunks.append(_pack_typed(_STRUCT, code))
+                chunks.append(bytes(arg))
+        elif isinstance(arg, _CArgObject):
+            chunks.append(_pack_typed(_OUT_REF, _TYPE_CODES[type(arg._obj)]))
+        else:
+            raise TypeError("Cannot record argument %r of %s" % (arg, name))
+
+
+class Recorder(object):
+    """Append-only binary log of native SDK traffic.
+
+    Pass an instance to ``CueSdk(recorder=...)``; every native call is then
+    logged with its arguments and result, as are flush completions, events
+    and session state changes delivered by iCUE. Each record is an 18 byte
+    header (kind, function or event code, nanoseconds since the recorder was
+    opened, result, payload size) followed by the tagged arguments; LED
+    buffers are written as their raw native bytes. Opening an existing file
+    appends a new session to it. Records are buffered; ``flush`` or
+    ``close`` to get them on disk.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(_MAGIC)
+        self._start = time.perf_counter_ns()
+        self.write(_OPEN, 0, 0, 0, (struct.pack('<d', time.time()), ))
+
+    def clock(self) -> int:
+        return time.perf_counter_ns() - self._start
+
+    def write(self, kind: int, code: int, t: int, result: int, chunks) -> None:
+        payload = b''.join(chunks)
+        record = _HEADER.pack(kind, code, t, result, len(payload)) + payload
+        with self._lock:
+            if self._file is not None:
+                self._file.write(record)
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            f, self._file = self._file, None
+        if f is not None:
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+
+class RecordingApi(object):
+    """Wraps a native API (or a backend) and logs every ``Corsair*`` call.
+
+    Callbacks passed to the native functions are wrapped too, so state
+    changes, events and flush completions are logged before they are
+    delivered.
+    """
+
+    def __init__(self, napi, recorder: Recorder) -> None:
+        self._napi = napi
+        self._recorder = recorder
+        # wrapped callbacks by id of the original, both kept alive as long
+        # as the native side may call them
+        self._callbacks = {}
+
+    def __getattr__(self, name):
+        fn = getattr(self._napi, name)
+        code = _FUNCTION_CODES.get(name)
+        if code is None or not callable(fn):
+            return fn
+        recorder = self._recorder
+
+        if name in ('CorsairConnect', 'CorsairSubscribeForEvents',
+                    'CorsairSetLedColorsFlushBufferAsync'):
+
+            def wrapper(*args):
+                t = recorder.clock()
+                chunks = []
+                _encode_args(name, args, chunks)
+                callback = self._wrap_callback(args[0])
+                result = fn(callback, *args[1:])
+                recorder.write(_CALL, code, t, int(result), chunks)
+                return result
+        else:
+
+            def wrapper(*args):
+                t = recorder.clock()
+                chunks = []
+                _encode_args(name, args, chunks)
+                result = fn(*args)
+                recorder.write(_CALL, code, t, int(result), chunks)
+                return result
+
+        setattr(self, name, wrapper)
+        return wrapper
+
+    def _wrap_callback(self, callback):
+        if callback is None:
+            return None
+        entry = self._callbacks.get(id(callback))
+        if entry is not None:
+            return entry[1]
+        recorder = self._recorder
+
+        if isinstance(callback, CorsairSessionStateChangedHandler):
+
+            def on_state_changed(ctx, e):
+                recorder.write(_STATE, e.contents.state, recorder.clock(), 0,
+                               ())
+                callback(ctx, e)
+
+            wrapped = CorsairSessionStateChangedHandler(on_state_changed)
+        elif isinstance(callback, CorsairEventHandler):
+
+            def on_event(ctx, e):
+                t = recorder.clock()
+                nevt = e.contents
+                payload = _EVENT_PAYLOADS.get(nevt.id)
+                chunks = ()
+                if payload is not None:
+                    chunks = (bytes(getattr(nevt, payload)[0]), )
+                recorder.write(_EVENT, nevt.id, t, 0, chunks)
+                callback(ctx, e)
+
+            wrapped = CorsairEventHandler(on_event)
+        else:
+            code = _FUNCTION_CODES['CorsairSetLedColorsFlushBufferAsync']
+
+            def on_completed(ctx, e):
+                recorder.write(_COMPLETION, code, recorder.clock(), e,
+                               (_pack_token(ctx or 0), ))
+                callback(ctx, e)
+
+            wrapped = CorsairAsyncCallback(on_completed)
+        self._callbacks[id(callback)] = (callback, wrapped)
+        return wrapped
+
+
+class Record(NamedTuple):
+    kind: str
+    code: int
+    time: float
+    result: int
+    payload: memoryview
+
+    @property
+    def name(self) -> str:
+        """Native function of a call or completion record."""
+        if self.kind in ('call', 'completion'):
+            return _FUNCTIONS[self.code]
+        return ''
+
+
+class Recording(object):
+    """Memory-mapped log written by a ``Recorder``.
+
+    Iterating yields ``Record`` tuples whose payloads are views into the
+    map. A record cut short at the end of the file (the recording process
+    died mid-write) ends the iteration.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, 'rb') as f:
+            magic = f.read(len(_MAGIC))
+            if magic != _MAGIC:
+                raise ValueError("%s is not a cuesdk recording" % path)
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+
+    def __iter__(self) -> Iterator[Record]:
+        view = self._view
+        end = len(view)
+        offset = len(_MAGIC)
+        unpack = _HEADER.unpack_from
+        size = _HEADER.size
+        while offset + size <= end:
+            kind, code, t, result, length = unpack(view, offset)
+            offset += size
+            if offset + length > end:
+                break
+            yield Record(_KINDS[kind], code, t / 1e9, result,
+                         view[offset:offset + length])
+            offset += length
+
+    def summary(self) -> Dict[str, int]:
+        """Number of records per function, event and session state."""
+        counts = {}
+        for record in self:
+            if record.kind in ('call', 'completion'):
+                key = '%s %s' % (record.kind, record.name)
+            elif record.kind == 'event':
+                key = str(CorsairEventId(record.code))
+            elif record.kind == 'state':
+                key = str(CorsairSessionState(record.code))
+            else:
+                key = record.kind
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def close(self) -> None:
+        self._view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            # payloads of records still referenced; the map is unmapped
+            # once they are gone
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+
+class Replayer(object):
+    """Drives a backend with the calls of a ``Recording``.
+
+    Calls are issued at their recorded times divided by ``speed``; with
+    ``speed=None`` they are issued back to back. Each session of the log
+    (a ``Recorder`` opened on the file) starts right after the previous
+    one. Recorded events, connection losses and timeouts are injected
+    through the ``simulate_*`` methods when the backend has them (as
+    ``SimulatedBackend`` does). Other state changes are the backend's own
+    response to the replayed calls, so the replay waits (up to
+    ``state_timeout`` seconds) until the backend reports them too; that keeps
+    accelerated replays from running ahead of an asynchronous connect.
+    Results that differ from the recorded ones are collected in
+    ``mismatches``.
+    """
+
+    def __init__(self,
+                 recording: Recording,
+                 backend: Any,
+                 speed: Optional[float] = 1.0,
+                 state_timeout: float = 5.0) -> None:
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be positive")
+        self._recording = recording
+        self._backend = backend
+        self._speed = speed
+        self._state_timeout = state_timeout
+        self._encoder = PropertyEncoder()
+        self._ids = {}
+        self._previous = {}
+        self._devices = {}
+        self._callbacks = {
+            'CorsairConnect':
+            CorsairSessionStateChangedHandler(self._on_state_changed),
+            'CorsairSubscribeForEvents':
+            CorsairEventHandler(self._on_event),
+            'CorsairSetLedColorsFlushBufferAsync':
+            CorsairAsyncCallback(self._on_completed),
+        }
+        self._cond = threading.Condition()
+        self._seen_states = 0
+        self.mismatches: List[Tuple[float, str, int, int]] = []
+        self.states: List[CorsairSessionState] = []
+        self.events = 0
+        self.completions = 0
+
+    def _on_state_changed(self, ctx, e):
+        with self._cond:
+            self.states.append(CorsairSessionState(e.contents.state))
+            self._cond.notify_all()
+
+    def _on_event(self, ctx, e):
+        with self._cond:
+            self.events += 1
+
+    def _on_completed(self, ctx, e):
+        with self._cond:
+            self.completions += 1
+
+    def run(self) -> Dict[str, Any]:
+        backend = self._backend
+        speed = self._speed
+        calls = injected = 0
+        origin = start = time.perf_counter()
+        recorded = 0.0
+        session = 0.0
+        for record in self._recording:
+            kind = record.kind
+            if kind == 'open':
+                origin = time.perf_counter()
+                session = recorded
+                continue
+            recorded = session + record.time
+            if speed is not None:
+                delay = origin + record.time / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            if kind == 'call':
+                name = record.name
+                fn = getattr(backend, name)
+                result = int(fn(*self._decode(name, record.payload)))
+                calls += 1
+                if result != record.result:
+                    self.mismatches.append(
+                        (recorded, name, record.result, result))
+            elif kind == 'event':
+                injected += self._inject_event(record)
+            elif kind == 'state':
+                injected += self._inject_state(record)
+        return {
+            'calls': calls,
+            'injected': injected,
+            'mismatches': len(self.mismatches),
+            'recorded_seconds': recorded,
+            'elapsed_seconds': time.perf_counter() - start,
+        }
+
+    def _decode(self, name: str, payload) -> list:
+        args = []
+        offset = 0
+        while offset < len(payload):
+            tag = payload[offset]
+            offset += 1
+            if tag == _NONE:
+                args.append(None)
+            elif tag == _INT:
+                args.append(struct.unpack_from('<q', payload, offset)[0])
+                offset += 8
+            elif tag in (_BYTES, _ID):
+                n = struct.unpack_from('<H', payload, offset)[0]
+                value = bytes(payload[offset + 2:offset + 2 + n])
+                offset += 2 + n
+                if tag == _ID:
+                    nid = self._ids.get(value)
+                    if nid is None:
+                        nid = create_string_buffer(value,
+                                                   CORSAIR_STRING_SIZE_M)
+                        self._ids[value] = nid
+                    value = nid
+                args.append(value)
+            elif tag == _CALLBACK:
+                args.append(self._callbacks[name])
+            elif tag in (_STRUCT, _OUT, _OUT_REF, _PREVIOUS):
+                code = payload[offset]
+                offset += 1
+                ctype = _TYPES[code]
+                if tag == _STRUCT:
+                    obj = ctype.from_buffer_copy(payload, offset)
+                    offset += sizeof(ctype)
+                elif tag == _PREVIOUS:
+                    obj = self._previous.get(code)
+                    if obj is None:
+                        obj = ctype()
+                else:
+                    obj = self._previous[code] = ctype()
+                    if tag == _OUT_REF:
+                        obj = byref(obj)
+                args.append(obj)
+            elif tag in (_ARRAY, _OUT_ARRAY):
+                code, n = struct.unpack_from('<BI', payload, offset)
+                offset += 5
+                atype = _TYPES[code] * n
+                if tag == _ARRAY:
+                    args.append(atype.from_buffer_copy(payload, offset))
+                    offset += sizeof(atype)
+                else:
+                    args.append(atype())
+            elif tag == _PROPERTY:
+                data_type, count, n = struct.unpack_from(
+                    '<III', payload, offset)
+                offset += 12
+                value = _unpack_property(data_type, count,
+                                         payload[offset:offset + n])
+                offset += n
+                args.append(self._encoder.encode(data_type, value))
+            else:
+                raise ValueError("Corrupt recording: argument tag %d" % tag)
+        return args
+
+    def _inject_event(self, record: Record) -> int:
+        backend = self._backend
+        if record.code == CorsairEventId.CEI_KeyEvent:
+            if not hasattr(backend, 'simulate_key_event'):
+                return 0
+            evt = CorsairKeyEvent.from_buffer_copy(record.payload)
+            backend.simulate_key_event(evt.deviceId.decode('utf-8'), evt.keyId,
+                                       evt.isPressed)
+            return 1
+        if record.code == \
+                CorsairEventId.CEI_DeviceConnectionStatusChangedEvent:
+            if not hasattr(backend, 'simulate_device_connection'):
+                return 0
+            evt = CorsairDeviceConnectionStatusChangedEvent.from_buffer_copy(
+                record.payload)
+            device_id = evt.deviceId.decode('utf-8')
+            device = backend.devices.get(device_id) or \
+                self._devices.get(device_id)
+            if device is None:
+                return 0
+            # the backend forgets disconnected devices, the replayer does not
+            self._devices[device_id] = device
+            backend.simulate_device_connection(device, evt.isConnected)
+            return 1
+        return 0
+
+    def _inject_state(self, record: Record) -> int:
+        if record.code in (CorsairSessionState.CSS_ConnectionLost,
+                           CorsairSessionState.CSS_Timeout):
+            if not hasattr(self._backend, 'simulate_state'):
+                return 0
+            self._backend.simulate_state(CorsairSessionState(record.code))
+            return 1
+
+        def reported():
+            states = self.states
+            while self._seen_states < len(states):
+                self._seen_states += 1
+                if states[self._seen_states - 1] == record.code:
+                    return True
+            return False
+
+        with self._cond:
+            self._cond.wait_for(reported, self._state_timeout)
+        return 0
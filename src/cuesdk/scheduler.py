@@ -0,0 +1,129 @@
+import threading
+import time
+from typing import Iterable, Optional, Union
+
+from .enums import CorsairError
+from .frame import LedFrame
+from .structs import CorsairLedColor
+
+__all__ = ['RenderScheduler']
+
+
+class RenderScheduler(object):
+    """Coalesces LED writes from many producers into one flush per tick.
+
+    Producers call ``submit`` from any thread. Writes are merged per device
+    (the last write per LED wins) and, once per tick, every dirty device is
+    sent with ``set_led_colors_buffer`` followed by a single
+    ``set_led_colors_flush_buffer_async``. A tick is skipped while the
+    previous flush has not reported completion yet, so pending writes keep
+    merging instead of queueing up. The check uses the SDK's count of flushes
+    in flight, so flushes submitted by other producers on the same session
+    count as well; ``max_in_flight`` allows more than one. Ticks go ahead
+    anyway once the oldest flush in flight is ``flush_timeout`` seconds old.
+    """
+
+    def __init__(self,
+                 sdk,
+                 fps: float = 60.0,
+                 flush_timeout: float = 1.0,
+                 max_in_flight: int = 1) -> None:
+        if fps <= 0:
+            raise ValueError("fps must be positive")
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self._sdk = sdk
+        self._interval = 1.0 / fps
+        self._flush_timeout = flush_timeout
+        self._max_in_flight = max_in_flight
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._flush_done = threading.Event()
+        self._flush_done.set()
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_error = CorsairError(CorsairError.CE_Success)
+        self.frames = 0
+        self.skipped_ticks = 0
+
+    def submit(self, device_id: str,
+               led_colors: Union[Iterable[CorsairLedColor], LedFrame]) -> None:
+        if isinstance(led_colors, LedFrame):
+            led_colors = led_colors.to_led_colors()
+        with self._lock:
+            leds = self._pending.setdefault(device_id, {})
+            for led in led_colors:
+                leds[int(led.id)] = led
+
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def tick(self) -> bool:
+        sdk = self._sdk
+        if sdk.flushes_in_flight >= self._max_in_flight:
+            # a flush that never completes, whoever submitted it, stops
+            # holding back ticks after flush_timeout
+            age = sdk.oldest_flush_age
+            if age is not None and age < self._flush_timeout:
+                self.skipped_ticks += 1
+                return False
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return False
+
+        for device_id, leds in pending.items():
+            err = sdk.set_led_colors_buffer(device_id, list(leds.values()))
+            if err != CorsairError.CE_Success:
+                self.last_error = err
+
+        self._flush_done.clear()
+        err = sdk.set_led_colors_flush_buffer_async(self._on_flushed)
+        if err != CorsairError.CE_Success:
+            self.last_error = err
+            self._flush_done.set()
+        self.frames += 1
+        return True
+
+    def _on_flushed(self, err: CorsairError) -> None:
+        if err != CorsairError.CE_Success:
+            self.last_error = err
+        self._flush_done.set()
+
+    def wait_flushed(self, timeout: Optional[float] = None) -> bool:
+        return self._flush_done.wait(timeout)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run,
+                                        name='cuesdk-render-scheduler',
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.stop()
+
+    def _run(self) -> None:
+        next_tick = time.monotonic()
+        while not self._stop.is_set():
+            self.tick()
+            next_tick += self._interval
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                next_tick = time.monotonic()
@@ -0,0 +1,495 @@
+import heapq
+import itertools
+import threading
+import time
+from ctypes import addressof, c_bool, c_char_p, c_double, c_int32, pointer
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from .enums import (CorsairAccessLevel, CorsairDataType, CorsairDeviceType,
+                    CorsairDevicePropertyId, CorsairError, CorsairEventId,
+                    CorsairLedGroup, CorsairLedId_Keyboard,
+                    CorsairPropertyFlag, CorsairSessionState)
+from .native import (CorsairDeviceConnectionStatusChangedEvent,
+                     CorsairEvent, CorsairKeyEvent, CorsairSessionStateChanged)
+
+__all__ = ['SimulatedDevice', 'SimulatedBackend']
+
+_LED_GROUPS = {
+    CorsairDeviceType.CDT_Keyboard: CorsairLedGroup.CLG_Keyboard,
+    CorsairDeviceType.CDT_Mouse: CorsairLedGroup.CLG_Mouse,
+    CorsairDeviceType.CDT_Mousemat: CorsairLedGroup.CLG_Mousemat,
+    CorsairDeviceType.CDT_Headset: CorsairLedGroup.CLG_Headset,
+    CorsairDeviceType.CDT_HeadsetStand: CorsairLedGroup.CLG_HeadsetStand,
+    CorsairDeviceType.CDT_MemoryModule: CorsairLedGroup.CLG_MemoryModule,
+    CorsairDeviceType.CDT_Motherboard: CorsairLedGroup.CLG_Motherboard,
+    CorsairDeviceType.CDT_GraphicsCard: CorsairLedGroup.CLG_GraphicsCard,
+    CorsairDeviceType.CDT_Touchbar: CorsairLedGroup.CLG_Touchbar,
+    CorsairDeviceType.CDT_GameController:
+    CorsairLedGroup.CLG_GameController,
+}
+
+_ARRAY_TYPES = {
+    CorsairDataType.CT_Boolean_Array: ('boolean_array', c_bool),
+    CorsairDataType.CT_Int32_Array: ('int32_array', c_int32),
+    CorsairDataType.CT_Float64_Array: ('float64_array', c_double),
+    CorsairDataType.CT_String_Array: ('string_array', c_char_p),
+}
+
+_SCALAR_FIELDS = {
+    CorsairDataType.CT_Boolean: 'boolean',
+    CorsairDataType.CT_Int32: 'int32',
+    CorsairDataType.CT_Float64: 'float64',
+    CorsairDataType.CT_String: 'string',
+}
+
+
+def _led_id(group, index):
+    return (int(group) << 16) | index
+
+
+def _grid_positions(device_type, led_count, columns=22, pitch=19.0):
+    group = _LED_GROUPS.get(device_type, CorsairLedGroup.CLG_DIY_Channel1)
+    return tuple((_led_id(group, i + 1), pitch / 2 + (i % columns) * pitch,
+                  pitch / 2 + (i // columns) * pitch)
+                 for i in range(led_count))
+
+
+@dataclass
+class SimulatedDevice():
+    device_id: str
+    type: CorsairDeviceType = CorsairDeviceType.CDT_Keyboard
+    model: str = 'Simulated Device'
+    serial: str = ''
+    led_count: int = 0
+    channel_count: int = 0
+    led_positions: Optional[Sequence[Tuple[int, float, float]]] = None
+    properties: Dict[Tuple[int, int], Tuple[int, Any, int]] = field(
+        default_factory=dict)
+
+    def __post_init__(self):
+        if self.led_positions is None:
+            self.led_positions = _grid_positions(self.type, self.led_count)
+        self.led_positions = tuple(self.led_positions)
+        self.led_count = len(self.led_positions)
+
+    def set_property(self,
+                     property_id: CorsairDevicePropertyId,
+                     data_type: CorsairDataType,
+                     value,
+                     index: int = 0,
+                     flags: int = CorsairPropertyFlag.CPF_CanRead) -> None:
+        self.properties[(int(property_id), index)] = (int(data_type), value,
+                                                      int(flags))
+
+
+class _NativeThread(object):
+    """Single callback thread standing in for iCUE's own thread."""
+
+    def __init__(self) -> None:
+        self._queue = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._busy = False
+
+    def call_later(self, delay: float, fn, *args) -> None:
+        with self._cond:
+            heapq.heappush(self._queue, (time.monotonic() + delay,
+                                         next(self._seq), fn, args))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run,
+                                                name='cuesdk-simulator',
+                                                daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._queue:
+                        delay = self._queue[0][0] - time.monotonic()
+                        if delay <= 0:
+                            break
+                        self._cond.wait(delay)
+                    else:
+                        self._cond.wait()
+                _, _, fn, args = heapq.heappop(self._queue)
+                self._busy = True
+            try:
+                fn(*args)
+            finally:
+                with self._cond:
+                    self._busy = False
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                if not self._queue and not self._busy:
+                    return True
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.001)
+
+
+def _device_id(nid) -> Optional[str]:
+    if nid is None:
+        return None
+    value = getattr(nid, 'value', nid)
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def _set_out(ref, value) -> None:
+    getattr(ref, '_obj', ref).value = value
+
+
+class SimulatedBackend(object):
+    """In-process stand-in for ``CorsairNativeApi``.
+
+    Exposes the same native functions with the same ctypes-level arguments,
+    so ``CueSdk(backend=SimulatedBackend(...))`` runs without iCUE or the
+    SDK library. Session state changes, events and async flush completions
+    are delivered from a dedicated thread after the configured latencies.
+    """
+
+    def __init__(self,
+                 devices: Sequence[SimulatedDevice] = (),
+                 connect_latency: float = 0.0,
+                 flush_latency: float = 0.0,
+                 refuse_connection: bool = False,
+                 write_latency: float = 0.0) -> None:
+        self.devices = {d.device_id: d for d in devices}
+        self.connect_latency = connect_latency
+        self.flush_latency = flush_latency
+        self.write_latency = write_latency
+        self.refuse_connection = refuse_connection
+        self.state = CorsairSessionState(CorsairSessionState.CSS_Closed)
+        self.layer_priority = 0
+        self.access_levels = {}
+        self.key_event_configurations = {}
+        self.led_colors = {d: {} for d in self.devices}
+        self.led_colors_buffer = {}
+        self.flush_count = 0
+        self._colors_lock = threading.Lock()
+        self._allocations = {}
+        self._session_handler = None
+        self._session_context = None
+        self._event_handler = None
+        self._event_context = None
+        self._thread = _NativeThread()
+
+    @property
+    def live_properties(self) -> int:
+        return len(self._allocations)
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        return self._thread.drain(timeout)
+
+    # simulation controls
+
+    def simulate_state(self, state: CorsairSessionState,
+                       delay: float = 0.0) -> None:
+        self._thread.call_later(delay, self._set_state,
+                                CorsairSessionState(int(state)))
+
+    def simulate_key_event(self,
+                           device_id: str,
+                           key_id: int,
+                           is_pressed: bool,
+                           delay: float = 0.0) -> None:
+        payload = CorsairKeyEvent(deviceId=device_id.encode('utf-8'),
+                                  keyId=int(key_id),
+                                  isPressed=is_pressed)
+        evt = CorsairEvent(id=int(CorsairEventId.CEI_KeyEvent))
+        evt.keyEvent = pointer(payload)
+        self._thread.call_later(delay, self._emit, evt, payload)
+
+    def simulate_device_connection(self,
+                                   device: SimulatedDevice,
+                                   is_connected: bool,
+                                   delay: float = 0.0) -> None:
+        if is_connected:
+            self.devices[device.device_id] = device
+            self.led_colors.setdefault(device.device_id, {})
+        else:
+            self.devices.pop(device.device_id, None)
+        payload = CorsairDeviceConnectionStatusChangedEvent(
+            deviceId=device.device_id.encode('utf-8'),
+            isConnected=is_connected)
+        evt = CorsairEvent(
+            id=int(CorsairEventId.CEI_DeviceConnectionStatusChangedEvent))
+        evt.deviceConnectionStatusChangedEvent = pointer(payload)
+        self._thread.call_later(delay, self._emit, evt, payload)
+
+    def _set_state(self, state: CorsairSessionState) -> None:
+        self.state = state
+        if state in (CorsairSessionState.CSS_ConnectionLost,
+                     CorsairSessionState.CSS_Timeout):
+            # the server forgets everything the client had set up
+            self.layer_priority = 0
+            self.access_levels.clear()
+            self.key_event_configurations.clear()
+            with self._colors_lock:
+                self.led_colors = {d: {} for d in self.devices}
+                self.led_colors_buffer = {}
+        handler = self._session_handler
+        if handler is not None:
+            nobj = CorsairSessionStateChanged(state=int(state))
+            self._fill_session_details(nobj.details)
+            handler(self._session_context, pointer(nobj))
+
+    def _emit(self, evt, payload) -> None:
+        handler = self._event_handler
+        if handler is not None:
+            handler(self._event_context, pointer(evt))
+
+    def _connected(self) -> bool:
+        return self.state == CorsairSessionState.CSS_Connected
+
+    def _find_device(self, nid):
+        device_id = _device_id(nid)
+        if not self._connected():
+            return (None, CorsairError.CE_NotConnected)
+        device = self.devices.get(device_id)
+        if device is None:
+            return (None, CorsairError.CE_DeviceNotFound)
+        return (device, CorsairError.CE_Success)
+
+    @staticmethod
+    def _fill_session_details(nobj) -> None:
+        for v in (nobj.clientVersion, nobj.serverVersion,
+                  nobj.serverHostVersion):
+            v.major, v.minor, v.patch = 4, 0, 0
+
+    @staticmethod
+    def _fill_device_info(device: SimulatedDevice, nobj) -> None:
+        nobj.type = int(device.type)
+        nobj.deviceId = device.device_id.encode('utf-8')
+        nobj.serial = device.serial.encode('utf-8')
+        nobj.model = device.model.encode('utf-8')
+        nobj.ledCount = device.led_count
+        nobj.channelCount = device.channel_count
+
+    # native api
+
+    def CorsairConnect(self, handler, context):
+        self._session_handler = handler
+        self._session_context = context
+        self.state = CorsairSessionState(CorsairSessionState.CSS_Connecting)
+        self.simulate_state(CorsairSessionState.CSS_Connecting)
+        final = (CorsairSessionState.CSS_ConnectionRefused
+                 if self.refuse_connection else
+                 CorsairSessionState.CSS_Connected)
+        self.simulate_state(final, self.connect_latency)
+        return CorsairError.CE_Success
+
+    def CorsairGetSessionDetails(self, nobj):
+        if not self._connected():
+            return CorsairError.CE_NotConnected
+        self._fill_session_details(nobj)
+        return CorsairError.CE_Success
+
+    def CorsairDisconnect(self):
+        self._session_handler = None
+        self._event_handler = None
+        self.state = CorsairSessionState(CorsairSessionState.CSS_Closed)
+        return CorsairError.CE_Success
+
+    def CorsairGetDevices(self, device_filter, size_max, infos, size):
+        if not self._connected():
+            return CorsairError.CE_NotConnected
+        mask = device_filter.deviceTypeMask & 0xFFFFFFFF
+        matching = [d for d in self.devices.values() if int(d.type) & mask]
+        matching = matching[:size_max]
+        for i, d in enumerate(matching):
+            self._fill_device_info(d, infos[i])
+        _set_out(size, len(matching))
+        return CorsairError.CE_Success
+
+    def CorsairGetDeviceInfo(self, device_id, nobj):
+        device, err = self._find_device(device_id)
+        if device is not None:
+            self._fill_device_info(device, nobj)
+        return err
+
+    def CorsairGetLedPositions(self, device_id, size_max, leds, size):
+        device, err = self._find_device(device_id)
+        if device is None:
+            return err
+        positions = device.led_positions[:size_max]
+        for i, (led_id, cx, cy) in enumerate(positions):
+            leds[i].id, leds[i].cx, leds[i].cy = led_id, cx, cy
+        _set_out(size, len(positions))
+        return CorsairError.CE_Success
+
+    def CorsairSubscribeForEvents(self, handler, context):
+        if not self._connected():
+            return CorsairError.CE_NotConnected
+        self._event_handler = handler
+        self._event_context = context
+        return CorsairError.CE_Success
+
+    def CorsairUnsubscribeFromEvents(self):
+        if not self._connected():
+            return CorsairError.CE_NotConnected
+        self._event_handler = None
+        return CorsairError.CE_Success
+
+    def CorsairConfigureKeyEvent(self, device_id, configuration):
+        device, err = self._find_device(device_id)
+        if device is not None:
+            self.key_event_configurations[(device.device_id,
+                                           configuration.keyId)] = bool(
+                                               configuration.isIntercepted)
+        return err
+
+    def CorsairGetDevicePropertyInfo(self, device_id, property_id, index,
+                                     data_type, flags):
+        device, err = self._find_device(device_id)
+        if device is None:
+            return err
+        prop = device.properties.get((int(property_id), index))
+        if prop is None:
+            return CorsairError.CE_InvalidArguments
+        _set_out(data_type, prop[0])
+        _set_out(flags, prop[2])
+        return CorsairError.CE_Success
+
+    def CorsairReadDeviceProperty(self, device_id, property_id, index, nobj):
+        device, err = self._find_device(device_id)
+        if device is None:
+            return err
+        prop = device.properties.get((int(property_id), index))
+        if prop is None or not prop[2] & CorsairPropertyFlag.CPF_CanRead:
+            return CorsairError.CE_InvalidArguments
+        data_type, value, _ = prop
+        nobj.type = data_type
+        if data_type in _SCALAR_FIELDS:
+            if data_type == CorsairDataType.CT_String:
+                value = value.encode('utf-8')
+            setattr(nobj.value, _SCALAR_FIELDS[data_type], value)
+            if data_type == CorsairDataType.CT_String:
+                self._allocations[addressof(nobj)] = value
+            return CorsairError.CE_Success
+
+        name, ctype = _ARRAY_TYPES[data_type]
+        if ctype is c_char_p:
+            value = [v.encode('utf-8') for v in value]
+        items = (ctype * len(value))(*value)
+        arr = getattr(nobj.value, name)
+        arr.items = items
+        arr.count = len(value)
+        self._allocations[addressof(nobj)] = items
+        return CorsairError.CE_Success
+
+    def CorsairWriteDeviceProperty(self, device_id, property_id, index, nobj):
+        device, err = self._find_device(device_id)
+        if device is None:
+            return err
+        key = (int(property_id), index)
+        prop = device.properties.get(key)
+        if prop is None or not prop[2] & CorsairPropertyFlag.CPF_CanWrite:
+            return CorsairError.CE_InvalidArguments
+        if nobj.type != prop[0]:
+            return CorsairError.CE_InvalidArguments
+        data_type = prop[0]
+        if data_type in _SCALAR_FIELDS:
+            value = getattr(nobj.value, _SCALAR_FIELDS[data_type])
+            if data_type == CorsairDataType.CT_String:
+                value = value.decode('utf-8')
+        else:
+            name, ctype = _ARRAY_TYPES[data_type]
+            arr = getattr(nobj.value, name)
+            value = tuple(arr.items[i] for i in range(arr.count))
+            if ctype is c_char_p:
+                value = tuple(v.decode('utf-8') for v in value)
+        device.properties[key] = (data_type, value, prop[2])
+        return CorsairError.CE_Success
+
+    def CorsairFreeProperty(self, nobj):
+        self._allocations.pop(addressof(nobj), None)
+        return CorsairError.CE_Success
+
+    def _store_led_colors(self, buffered, device_id, size, led_colors):
+        device, err = self._find_device(device_id)
+        if device is None:
+            return err
+        if self.write_latency:
+            # blocks without holding the GIL, like the native IPC call
+            time.sleep(self.write_latency)
+        update = {}
+        for i in range(size):
+            c = led_colors[i]
+            update[c.id] = (c.r, c.g, c.b, c.a)
+        with self._colors_lock:
+            target = self.led_colors_buffer if buffered else self.led_colors
+            target.setdefault(device.device_id, {}).update(update)
+        return CorsairError.CE_Success
+
+    def CorsairSetLedColors(self, device_id, size, led_colors):
+        return self._store_led_colors(False, device_id, size, led_colors)
+
+    def CorsairSetLedColorsBuffer(self, device_id, size, led_colors):
+        return self._store_led_colors(True, device_id, size, led_colors)
+
+    def CorsairSetLedColorsFlushBufferAsync(self, callback, context):
+        if not self._connected():
+            return CorsairError.CE_NotConnected
+        with self._colors_lock:
+            buffered, self.led_colors_buffer = self.led_colors_buffer, {}
+            for device_id, colors in buffered.items():
+                self.led_colors.setdefault(device_id, {}).update(colors)
+            self.flush_count += 1
+        if callback:
+            self._thread.call_later(self.flush_latency, callback, context,
+                                    CorsairError.CE_Success)
+        return CorsairError.CE_Success
+
+    def CorsairGetLedColors(self, device_id, size, led_colors):
+        device, err = self._find_device(device_id)
+        if device is None:
+            return err
+        colors = self.led_colors.get(device.device_id, {})
+        for i in range(size):
+            c = led_colors[i]
+            c.r, c.g, c.b, c.a = colors.get(c.id, (0, 0, 0, 0))
+        return CorsairError.CE_Success
+
+    def CorsairSetLayerPriority(self, priority):
+        if not self._connected():
+            return CorsairError.CE_NotConnected
+        self.layer_priority = priority
+        return CorsairError.CE_Success
+
+    def CorsairGetLedLuidForKeyName(self, device_id, key_name, led_id):
+        device, err = self._find_device(device_id)
+        if device is None:
+            return err
+        if device.type != CorsairDeviceType.CDT_Keyboard:
+            return CorsairError.CE_InvalidArguments
+        name = 'CLK_' + key_name.decode('ascii')
+        luid = CorsairLedId_Keyboard._members_.get(name)
+        if luid is None:
+            return CorsairError.CE_InvalidArguments
+        _set_out(led_id, _led_id(CorsairLedGroup.CLG_Keyboard, luid))
+        return CorsairError.CE_Success
+
+    def CorsairRequestControl(self, device_id, access_level):
+        if not self._connected():
+            return CorsairError.CE_NotConnected
+        if device_id is not None and _device_id(device_id) not in self.devices:
+            return CorsairError.CE_DeviceNotFound
+        self.access_levels[_device_id(device_id)] = CorsairAccessLevel(
+            int(access_level))
+        return CorsairError.CE_Success
+
+    def CorsairReleaseControl(self, device_id):
+        if not self._connected():
+            return CorsairError.CE_NotConnected
+        if device_id is None:
+            self.access_levels.clear()
+        else:
+            self.access_levels.pop(_device_id(device_id), None)
+        return CorsairError.CE_Success
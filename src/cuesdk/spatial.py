@@ -0,0 +1,157 @@
+import heapq
+import math
+from array import array
+from bisect import bisect_left
+from typing import Iterable, List, Optional
+
+from .structs import CorsairLedPosition
+
+__all__ = ['LedSpatialIndex']
+
+
+class LedSpatialIndex(object):
+    """Uniform grid over the LED positions of one device.
+
+    Positions are kept in compact ``array`` columns and bucketed into grid
+    cells in CSR form (``cell_start`` / ``cell_items``). Queries return LED
+    indices in the order of the positions the index was built from, which
+    is also the order of ``LedFrame.from_positions``; use ``ids`` to map
+    them to LED ids.
+    """
+
+    def __init__(self,
+                 positions: Iterable[CorsairLedPosition],
+                 cell_size: Optional[float] = None) -> None:
+        positions = list(positions)
+        n = len(positions)
+        self.ids = array('I', (p.id for p in positions))
+        self.xs = array('d', (p.cx for p in positions))
+        self.ys = array('d', (p.cy for p in positions))
+
+        if n:
+            self.min_x, self.max_x = min(self.xs), max(self.xs)
+            self.min_y, self.max_y = min(self.ys), max(self.ys)
+        else:
+            self.min_x = self.max_x = self.min_y = self.max_y = 0.0
+        width = self.max_x - self.min_x
+        height = self.max_y - self.min_y
+        if cell_size is None:
+            area = max(width, 1.0) * max(height, 1.0)
+            cell_size = math.sqrt(area / max(n, 1))
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = cell_size
+        self.columns = int(width / cell_size) + 1
+        self.rows = int(height / cell_size) + 1
+
+        cells = array('I',
+                      (self._cell(x, y) for x, y in zip(self.xs, self.ys)))
+        counts = array('I', bytes(4 * (self.columns * self.rows + 1)))
+        for c in cells:
+            counts[c + 1] += 1
+        for i in range(1, len(counts)):
+            counts[i] += counts[i - 1]
+        self.cell_start = counts
+        self.cell_items = array('I', sorted(range(n), key=cells.__getitem__))
+
+        self._by_x = array('I', sorted(range(n), key=self.xs.__getitem__))
+        self._by_y = array('I', sorted(range(n), key=self.ys.__getitem__))
+        self._sorted_xs = array('d', (self.xs[i] for i in self._by_x))
+        self._sorted_ys = array('d', (self.ys[i] for i in self._by_y))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _column(self, x: float) -> int:
+        c = int((x - self.min_x) // self.cell_size)
+        return min(max(c, 0), self.columns - 1)
+
+    def _row(self, y: float) -> int:
+        r = int((y - self.min_y) // self.cell_size)
+        return min(max(r, 0), self.rows - 1)
+
+    def _cell(self, x: float, y: float) -> int:
+        return self._row(y) * self.columns + self._column(x)
+
+    def _cells_in(self, x0, y0, x1, y1):
+        start, items = self.cell_start, self.cell_items
+        for row in range(self._row(y0), self._row(y1) + 1):
+            base = row * self.columns
+            first, last = self._column(x0), self._column(x1)
+            for c in range(base + first, base + last + 1):
+                for k in range(start[c], start[c + 1]):
+                    yield items[k]
+
+    def within_radius(self, x: float, y: float, radius: float) -> List[int]:
+        xs, ys = self.xs, self.ys
+        r2 = radius * radius
+        return [
+            i for i in self._cells_in(x - radius, y - radius, x + radius,
+                                      y + radius)
+            if (xs[i] - x)**2 + (ys[i] - y)**2 <= r2
+        ]
+
+    def within_rect(self, x0: float, y0: float, x1: float,
+                    y1: float) -> List[int]:
+        xs, ys = self.xs, self.ys
+        return [
+            i for i in self._cells_in(x0, y0, x1, y1)
+            if x0 <= xs[i] <= x1 and y0 <= ys[i] <= y1
+        ]
+
+    def nearest(self, x: float, y: float, k: int = 1) -> List[int]:
+        n = len(self.ids)
+        if n == 0 or k <= 0:
+            return []
+        k = min(k, n)
+        xs, ys = self.xs, self.ys
+        start, items = self.cell_start, self.cell_items
+        cx, cy = self._column(x), self._row(y)
+        best = []  # max-heap of (-distance², index)
+        for ring in range(max(self.columns, self.rows)):
+            for row in range(cy - ring, cy + ring + 1):
+                if not 0 <= row < self.rows:
+                    continue
+                edge = row in (cy - ring, cy + ring)
+                step = 1 if edge else 2 * ring
+                for col in range(cx - ring, cx + ring + 1, max(step, 1)):
+                    if not 0 <= col < self.columns:
+                        continue
+                    c = row * self.columns + col
+                    for j in range(start[c], start[c + 1]):
+                        i = items[j]
+                        d2 = (xs[i] - x)**2 + (ys[i] - y)**2
+                        if len(best) < k:
+                            heapq.heappush(best, (-d2, i))
+                        elif d2 < -best[0][0]:
+                            heapq.heapreplace(best, (-d2, i))
+            if len(best) == k:
+                cell = self.cell_size
+                reach = min(x - (self.min_x + (cx - ring) * cell),
+                            self.min_x + (cx + ring + 1) * cell - x,
+                            y - (self.min_y + (cy - ring) * cell),
+                            self.min_y + (cy + ring + 1) * cell - y)
+                if reach > 0 and -best[0][0] <= reach * reach:
+                    break
+        return [i for _, i in sorted(best, key=lambda b: -b[0])]
+
+    def sorted_by_x(self) -> array:
+        return self._by_x
+
+    def sorted_by_y(self) -> array:
+        return self._by_y
+
+    def sorted_by_distance(self, x: float, y: float) -> List[int]:
+        xs, ys = self.xs, self.ys
+        return sorted(range(len(self.ids)),
+                      key=lambda i: (xs[i] - x)**2 + (ys[i] - y)**2)
+
+    def sweep_x(self, x0: float, x1: float) -> array:
+        """Indices with ``x0 <= cx < x1``, ordered by ``cx``."""
+        xs = self._sorted_xs
+        return self._by_x[bisect_left(xs, x0):bisect_left(xs, x1)]
+
+    def sweep_y(self, y0: float, y1: float) -> array:
+        """Indices with ``y0 <= cy < y1``, ordered by ``cy``."""
+        ys = self._sorted_ys
+        return self._by_y[bisect_left(ys, y0):bisect_left(ys, y1)]
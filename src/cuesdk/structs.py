@@ -174,19 +174,15 @@ class CorsairProperty():
         if t == CorsairDataType.CT_String:
             return CorsairProperty(t, nobj.value.string)
         if t == CorsairDataType.CT_Boolean_Array:
-            items = tuple(nobj.value.boolean_array.items[i]
-                          for i in range(nobj.value.boolean_array.count))
-            return CorsairProperty(t, items)
+            arr = nobj.value.boolean_array
+            return CorsairProperty(t, tuple(arr.items[:arr.count]))
         if t == CorsairDataType.CT_Int32_Array:
-            items = tuple(nobj.value.int32_array.items[i]
-                          for i in range(nobj.value.int32_array.count))
-            return CorsairProperty(t, items)
+            arr = nobj.value.int32_array
+            return CorsairProperty(t, tuple(arr.items[:arr.count]))
         if t == CorsairDataType.CT_Float64_Array:
-            items = tuple(nobj.value.float64_array.items[i]
-                          for i in range(nobj.value.float64_array.count))
-            return CorsairProperty(t, items)
+            arr = nobj.value.float64_array
+            return CorsairProperty(t, tuple(arr.items[:arr.count]))
         if t == CorsairDataType.CT_String_Array:
-            items = tuple(nobj.value.string_array.items[i]
-                          for i in range(nobj.value.string_array.count))
-            return CorsairProperty(t, items)
+            arr = nobj.value.string_array
+            return CorsairProperty(t, tuple(arr.items[:arr.count]))
         raise ValueError(f"Unknown data type={t}")
@@ -0,0 +1,200 @@
+import random
+import threading
+import time
+from ctypes import memmove, sizeof
+from typing import Callable, Dict, Optional, Tuple
+
+from .enums import CorsairAccessLevel, CorsairError
+from .structs import CorsairKeyEventConfiguration
+from .native import CorsairLedColor as CorsairLedColorNative
+
+__all__ = ['SessionRecord', 'ReconnectSupervisor']
+
+
+class _LedColors(object):
+    """Latest color of every LED written to one device.
+
+    Colors live in one native array with a slot per LED id, so it can be
+    sent back as is. Writes with the same LED ids in the same order as the
+    stored array (whole ``LedFrame`` writes) are copied in one ``memmove``;
+    other writes are merged LED by LED.
+    """
+
+    def __init__(self) -> None:
+        self.data = (CorsairLedColorNative * 0)()
+        self._ids = b''
+        self._index: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def replace(self, sz: int, data) -> None:
+        ids = _led_ids(sz, data)
+        if ids != self._ids:
+            self.data = (CorsairLedColorNative * sz)()
+            self._ids = ids
+            self._index = {data[i].id: i for i in range(sz)}
+        memmove(self.data, data, sz * sizeof(CorsairLedColorNative))
+
+    def merge(self, sz: int, data) -> None:
+        if not self._index or _led_ids(sz, data) == self._ids:
+            self.replace(sz, data)
+            return
+        index = self._index
+        grow = False
+        for i in range(sz):
+            led_id = data[i].id
+            if led_id not in index:
+                index[led_id] = len(index)
+                grow = True
+        if grow:
+            old = self.data
+            self.data = (CorsairLedColorNative * len(index))()
+            memmove(self.data, old, sizeof(old))
+        target = self.data
+        for i in range(sz):
+            target[index[data[i].id]] = data[i]
+        if grow:
+            self._ids = _led_ids(len(target), target)
+
+
+def _led_ids(sz: int, data) -> bytes:
+    ids = memoryview(data).cast('B')[:sz * sizeof(CorsairLedColorNative)]
+    return ids.cast('I')[0::2].tobytes()
+
+
+class SessionRecord(object):
+    """Session-affecting calls and committed LED colors per device.
+
+    Only the latest value of each setting is kept, so the record stays the
+    same size however long the session runs. LED color writes, whole frames
+    and partial updates alike, are merged per LED into per-device native
+    arrays that are reused from frame to frame; buffered writes become
+    committed when a flush succeeds.
+    """
+
+    def __init__(self) -> None:
+        self.access_levels: Dict[Optional[str], CorsairAccessLevel] = {}
+        self.layer_priority: Optional[int] = None
+        self.key_events: Dict[Tuple[str, int],
+                              CorsairKeyEventConfiguration] = {}
+        self.frames: Dict[str, _LedColors] = {}
+        self._pending: Dict[str, _LedColors] = {}
+        self._spare: Dict[str, _LedColors] = {}
+        self._lock = threading.Lock()
+
+    def release_control(self, device_id: Optional[str]) -> None:
+        if device_id:
+            self.access_levels.pop(device_id, None)
+        else:
+            self.access_levels.clear()
+
+    def configure_key_event(
+            self, device_id: str,
+            configuration: CorsairKeyEventConfiguration) -> None:
+        self.key_events[(device_id, int(configuration.key_id))] = configuration
+
+    def write_led_colors(self, device_id: str, sz: int, data,
+                         buffered: bool) -> None:
+        with self._lock:
+            target = self._pending if buffered else self.frames
+            colors = target.get(device_id)
+            if colors is None:
+                colors = target[device_id] = _LedColors()
+                if buffered:
+                    spare = self._spare.pop(device_id, None)
+                    if spare is not None:
+                        colors = target[device_id] = spare
+                        colors.replace(sz, data)
+                        return
+            colors.merge(sz, data)
+
+    def flushed(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            for device_id, colors in pending.items():
+                committed = self.frames.get(device_id)
+                if committed is None:
+                    self.frames[device_id] = colors
+                    continue
+                committed.merge(len(colors), colors.data)
+                self._spare[device_id] = colors
+
+
+class ReconnectSupervisor(object):
+    """Schedules reconnect attempts with jittered exponential backoff.
+
+    The n-th consecutive attempt waits ``min(max_delay, initial_delay *
+    2**n)`` seconds, shortened by a random fraction of up to ``jitter``.
+    ``time_to_restore`` is the time from the first loss notification to the
+    end of the last state restoration. A restoration that fails counts as a
+    failed attempt; its error is kept in ``last_error``.
+    """
+
+    def __init__(self,
+                 reconnect: Callable[[], None],
+                 initial_delay: float = 0.05,
+                 max_delay: float = 5.0,
+                 jitter: float = 0.5,
+                 rng: Callable[[], float] = random.random) -> None:
+        if initial_delay < 0 or max_delay < initial_delay:
+            raise ValueError("Invalid reconnect delays")
+        if not 0 <= jitter <= 1:
+            raise ValueError("jitter must be between 0 and 1")
+        self._reconnect = reconnect
+        self._initial_delay = initial_delay
+        self._max_delay = max_delay
+        self._jitter = jitter
+        self._rng = rng
+        self._lock = threading.Lock()
+        self._timer = None
+        self._lost_at = None
+        self._attempt = 0
+        self.attempts = 0
+        self.restores = 0
+        self.time_to_restore: Optional[float] = None
+        self.last_error: Optional[CorsairError] = None
+
+    @property
+    def restoring(self) -> bool:
+        return self._lost_at is not None
+
+    def next_delay(self) -> float:
+        # 2**32 times any sensible initial delay is past max_delay; a larger
+        # exponent would overflow during a long outage
+        delay = min(self._max_delay,
+                    self._initial_delay * 2**min(self._attempt, 32))
+        return delay * (1.0 - self._jitter * self._rng())
+
+    def on_lost(self) -> None:
+        with self._lock:
+            if self._lost_at is None:
+                self._lost_at = time.monotonic()
+            if self._timer is not None:
+                self._timer.cancel()
+            delay = self.next_delay()
+            self._attempt += 1
+            self.attempts += 1
+            self._timer = threading.Timer(delay, self._reconnect)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def on_restored(self) -> None:
+        with self._lock:
+            if self._lost_at is not None:
+                self.time_to_restore = time.monotonic() - self._lost_at
+            self._lost_at = None
+            self._attempt = 0
+            self.restores += 1
+
+    def on_restore_failed(self, err: CorsairError) -> None:
+        self.last_error = err
+        self.on_lost()
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._lost_at = None
+            self._attempt = 0
@@ -0,0 +1,126 @@
+import asyncio
+
+from cuesdk import (AsyncCueSdk, CorsairError, CorsairEventId,
+                    CorsairSessionState, CueSdk, SimulatedBackend,
+                    SimulatedDevice)
+
+DEVICE_ID = 'test-device'
+
+
+def make_sdk(**backend_options):
+    backend = SimulatedBackend([SimulatedDevice(DEVICE_ID, led_count=4)],
+                               **backend_options)
+    return AsyncCueSdk(CueSdk(backend=backend)), backend
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 5))
+
+
+def test_connect():
+
+    async def main():
+        sdk, _ = make_sdk(connect_latency=0.01)
+        states = []
+        assert await sdk.connect(lambda evt: states.append(evt.state)) == \
+            CorsairError.CE_Success
+        assert sdk.state == CorsairSessionState.CSS_Connected
+        assert states[-1] == CorsairSessionState.CSS_Connected
+        assert await sdk.disconnect() == CorsairError.CE_Success
+
+    run(main())
+
+
+def test_connect_refused():
+
+    async def main():
+        sdk, _ = make_sdk(refuse_connection=True)
+        assert await sdk.connect() == CorsairError.CE_NotConnected
+
+    run(main())
+
+
+def test_flush():
+
+    async def main():
+        sdk, backend = make_sdk(flush_latency=0.01)
+        await sdk.connect()
+        frame, err = await sdk.create_led_frame(DEVICE_ID)
+        frame.fill(1, 2, 3)
+        await sdk.set_led_colors_buffer(DEVICE_ID, frame)
+        assert await sdk.flush() == CorsairError.CE_Success
+        assert backend.flush_count == 1
+        assert set(backend.led_colors[DEVICE_ID].values()) == {(1, 2, 3, 255)}
+        await sdk.disconnect()
+
+    run(main())
+
+
+def test_flush_pending_at_disconnect():
+
+    async def main():
+        sdk, _ = make_sdk(flush_latency=10)
+        await sdk.connect()
+        flush = asyncio.ensure_future(sdk.flush())
+        await asyncio.sleep(0.05)
+        await sdk.disconnect()
+        assert await flush == CorsairError.CE_NotConnected
+
+    run(main())
+
+
+def test_events():
+
+    async def main():
+        sdk, backend = make_sdk()
+        await sdk.connect()
+        assert await sdk.subscribe_for_events() == CorsairError.CE_Success
+        backend.simulate_key_event(DEVICE_ID, 1, True)
+        backend.simulate_key_event(DEVICE_ID, 1, False)
+        received = []
+        async for evt in sdk.events():
+            received.append(evt)
+            if len(received) == 2:
+                await sdk.unsubscribe_from_events()
+        assert [e.id for e in received] == [CorsairEventId.CEI_KeyEvent] * 2
+        assert [e.data.is_pressed for e in received] == [True, False]
+        await sdk.disconnect()
+
+    run(main())
+
+
+def test_unsubscribe_with_full_queue():
+
+    async def main():
+        sdk, backend = make_sdk()
+        async with sdk:
+            await sdk.connect()
+            await sdk.subscribe_for_events(maxsize=2)
+            gate = asyncio.Event()
+            received = []
+
+            async def consume():
+                async for evt in sdk.events():
+                    received.append(evt.data.is_pressed)
+                    await gate.wait()
+
+            consumer = asyncio.ensure_future(consume())
+            backend.simulate_key_event(DEVICE_ID, 1, True)
+            backend.wait_idle(1)
+            await asyncio.sleep(0.05)
+            assert received == [True]
+            for i in range(3):
+                backend.simulate_key_event(DEVICE_ID, 1, i % 2 == 1)
+            backend.wait_idle(1)
+            await asyncio.sleep(0.05)
+            # one event taken by the stalled consumer, two queued, one lost
+            assert sdk.dropped_events == 1
+            assert await sdk.unsubscribe_from_events() == \
+                CorsairError.CE_Success
+            gate.set()
+            await consumer
+            # the end marker took the place of the oldest queued event
+            assert received == [True, True]
+            assert sdk.dropped_events == 2
+
+    run(main())
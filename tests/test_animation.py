@@ -0,0 +1,43 @@
+from cuesdk import Timeline
+
+
+def channel(animation, index, led=0):
+    color = animation.frame(index)[led]
+    return (color.r, color.g, color.b, color.a)
+
+
+def test_fade_ends_on_last_keyframe():
+    timeline = Timeline(duration=1.0, fps=10)
+    timeline.add(1, [(0.0, (0, 0, 0, 255)), (1.0, (255, 255, 255, 255))])
+    animation = timeline.compile([1])
+    assert len(animation) == 11
+    assert channel(animation, 0) == (0, 0, 0, 255)
+    assert channel(animation, len(animation) - 1) == (255, 255, 255, 255)
+
+
+def test_last_keyframe_with_fractional_frame_count():
+    timeline = Timeline(duration=1.04, fps=10)
+    timeline.add(1, [(0.0, (0, 0, 0, 255)), (1.04, (200, 100, 50, 255))])
+    animation = timeline.compile([1])
+    assert channel(animation, len(animation) - 1) == (200, 100, 50, 255)
+
+
+def test_loop_does_not_repeat_first_frame():
+    timeline = Timeline(duration=1.0, fps=10, loop=True)
+    timeline.add(1, [(0.0, (0, 0, 0, 255)), (1.0, (255, 255, 255, 255))])
+    animation = timeline.compile([1])
+    assert len(animation) == 10
+    assert animation.index_at(1.0) == 0
+
+
+def test_cached_animation_matches(tmp_path):
+    timeline = Timeline(duration=0.5, fps=20)
+    timeline.add([1, 2], [(0.0, '#000000'), (0.5, '#ff8000')])
+    path = str(tmp_path / 'fade.anim')
+    compiled = timeline.compile([1, 2])
+    for _ in range(2):
+        cached = timeline.compile([1, 2], cache_path=path)
+        assert len(cached) == len(compiled)
+        for i in range(len(compiled)):
+            assert bytes(cached.frame(i)) == bytes(compiled.frame(i))
+        cached.close()
@@ -0,0 +1,118 @@
+import threading
+import time
+
+from cuesdk import (CorsairAccessLevel, CorsairError, CorsairSessionState,
+                    CueSdk, EventQueue, SimulatedBackend, SimulatedDevice)
+
+DEVICE_ID = 'test-device'
+
+
+def make_sdk(**backend_options):
+    backend = SimulatedBackend([SimulatedDevice(DEVICE_ID, led_count=4)],
+                               **backend_options)
+    return CueSdk(backend=backend), backend
+
+
+def connect(sdk):
+    connected = threading.Event()
+
+    def on_state_changed(evt):
+        if evt.state == CorsairSessionState.CSS_Connected:
+            connected.set()
+
+    assert sdk.connect(on_state_changed) == CorsairError.CE_Success
+    assert connected.wait(5)
+
+
+def test_unsubscribe_while_handler_waits_for_session_lock():
+    sdk, backend = make_sdk()
+    connect(sdk)
+    unsubscribing = threading.Event()
+    native_unsubscribe = backend.CorsairUnsubscribeFromEvents
+
+    def unsubscribe():
+        unsubscribing.set()
+        return native_unsubscribe()
+
+    backend.CorsairUnsubscribeFromEvents = unsubscribe
+    flushed = []
+
+    def on_event(evt):
+        unsubscribing.wait(5)
+        flushed.append(sdk.set_led_colors_flush_buffer_async(None))
+
+    assert sdk.subscribe_for_events(EventQueue(on_event)) == \
+        CorsairError.CE_Success
+    backend.simulate_key_event(DEVICE_ID, 1, True)
+    backend.wait_idle(1)
+    t = threading.Thread(target=sdk.unsubscribe_from_events, daemon=True)
+    t.start()
+    t.join(3)
+    assert not t.is_alive()
+    assert flushed == [CorsairError.CE_Success]
+    sdk.disconnect()
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.001)
+    return True
+
+
+def test_reconnect_retries_after_refused_attempt():
+    sdk, backend = make_sdk()
+    supervisor = sdk.enable_auto_reconnect(initial_delay=0.001, jitter=0)
+    connect(sdk)
+    backend.refuse_connection = True
+    backend.simulate_state(CorsairSessionState.CSS_ConnectionLost)
+    assert wait_for(lambda: supervisor.attempts >= 3)
+    assert supervisor.restoring
+    backend.refuse_connection = False
+    assert wait_for(lambda: supervisor.restores == 1)
+    assert not supervisor.restoring
+    sdk.disconnect()
+
+
+def test_reconnect_retries_after_failed_restore():
+    sdk, backend = make_sdk()
+    supervisor = sdk.enable_auto_reconnect(initial_delay=0.001, jitter=0)
+    connect(sdk)
+    assert sdk.request_control(
+        DEVICE_ID, CorsairAccessLevel.CAL_ExclusiveLightingControl) == \
+        CorsairError.CE_Success
+    native_request_control = backend.CorsairRequestControl
+    failures = [CorsairError.CE_NoControl]
+
+    def request_control(device_id, level):
+        if failures:
+            return failures.pop()
+        return native_request_control(device_id, level)
+
+    backend.CorsairRequestControl = request_control
+    backend.simulate_state(CorsairSessionState.CSS_ConnectionLost)
+    assert wait_for(lambda: supervisor.restores == 1)
+    assert supervisor.attempts == 2
+    assert supervisor.last_error == CorsairError.CE_NoControl
+    sdk.disconnect()
+
+
+def test_failed_subscribe_does_not_start_queue():
+    sdk, backend = make_sdk()
+    queue = EventQueue(lambda evt: None)
+    assert sdk.subscribe_for_events(queue) == CorsairError.CE_NotConnected
+    assert not queue._threads
+    assert sdk.unsubscribe_from_events() == CorsairError.CE_NotConnected
+
+
+def test_disconnect_stops_event_queue():
+    sdk, backend = make_sdk()
+    connect(sdk)
+    queue = EventQueue(lambda evt: None, workers=2)
+    assert sdk.subscribe_for_events(queue) == CorsairError.CE_Success
+    threads = list(queue._threads)
+    assert all(t.is_alive() for t in threads)
+    assert sdk.disconnect() == CorsairError.CE_Success
+    assert not any(t.is_alive() for t in threads)
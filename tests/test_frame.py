@@ -0,0 +1,22 @@
+import pytest
+
+from cuesdk import CorsairLedColor, LedFrame
+
+
+def test_ids_and_colors():
+    frame = LedFrame([3, 1, 2])
+    assert frame.ids == (3, 1, 2)
+    assert len(frame) == 3
+    assert 1 in frame and 4 not in frame
+    frame.fill(1, 2, 3)
+    frame.set(1, 10, 20, 30, 40)
+    frame.update([CorsairLedColor(2, 50, 60, 70, 80)])
+    assert [frame.get(led_id) for led_id in frame.ids] == [
+        (1, 2, 3, 255), (10, 20, 30, 40), (50, 60, 70, 80)
+    ]
+    assert [c.id for c in frame.data] == [3, 1, 2]
+
+
+def test_duplicate_ids_rejected():
+    with pytest.raises(ValueError):
+        LedFrame([1, 2, 1])
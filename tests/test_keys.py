@@ -0,0 +1,182 @@
+import pytest
+
+from cuesdk import CorsairMacroKeyId, KeyChordMatcher, KeyStateTracker
+from cuesdk.native import CorsairKeyEvent
+
+DEVICE_ID = 'test-device'
+OTHER_ID = 'other-device'
+K1, K2, K3, K4 = (CorsairMacroKeyId.CMKI_1, CorsairMacroKeyId.CMKI_2,
+                  CorsairMacroKeyId.CMKI_3, CorsairMacroKeyId.CMKI_4)
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_tracker(sequence_timeout=1.0):
+    clock = Clock()
+    matcher = KeyChordMatcher(sequence_timeout, clock)
+    tracker = KeyStateTracker()
+    tracker.add_matcher(matcher)
+    return tracker, matcher, clock
+
+
+def press(tracker, key, device_id=DEVICE_ID):
+    tracker.update(CorsairKeyEvent(device_id.encode(), int(key), True))
+
+
+def release(tracker, key, device_id=DEVICE_ID):
+    tracker.update(CorsairKeyEvent(device_id.encode(), int(key), False))
+
+
+def recorder(fired, name):
+    return lambda device_id: fired.append((name, device_id))
+
+
+def test_tracker_bits():
+    tracker, _, _ = make_tracker()
+    press(tracker, K1)
+    press(tracker, K3)
+    assert tracker.is_pressed(DEVICE_ID, K1)
+    assert not tracker.is_pressed(DEVICE_ID, K2)
+    assert tracker.pressed(DEVICE_ID) == (K1, K3)
+    release(tracker, K1)
+    assert tracker.pressed(DEVICE_ID) == (K3, )
+    assert tracker.pressed(OTHER_ID) == ()
+    tracker.clear(DEVICE_ID)
+    assert tracker.bits(DEVICE_ID) == 0
+
+
+def test_chord_in_any_order():
+    tracker, matcher, _ = make_tracker()
+    fired = []
+    matcher.add_chord([K1, K2], recorder(fired, 'a'))
+    press(tracker, K2)
+    assert fired == []
+    press(tracker, K1)
+    assert fired == [('a', DEVICE_ID)]
+
+
+def test_overlapping_chords():
+    tracker, matcher, _ = make_tracker()
+    fired = []
+    matcher.add_chord([K1, K2], recorder(fired, 'a'))
+    matcher.add_chord([K2, K3], recorder(fired, 'b'))
+    matcher.add_chord([K1, K2, K3], recorder(fired, 'c'))
+    press(tracker, K2)
+    press(tracker, K1)
+    assert fired == [('a', DEVICE_ID)]
+    press(tracker, K3)
+    assert fired == [('a', DEVICE_ID), ('b', DEVICE_ID), ('c', DEVICE_ID)]
+
+
+def test_chord_released_before_complete():
+    tracker, matcher, _ = make_tracker()
+    fired = []
+    matcher.add_chord([K1, K2], recorder(fired, 'a'))
+    press(tracker, K1)
+    release(tracker, K1)
+    press(tracker, K2)
+    assert fired == []
+    release(tracker, K2)
+    assert fired == []
+
+
+def test_chord_per_device():
+    tracker, matcher, _ = make_tracker()
+    fired = []
+    matcher.add_chord([K1, K2], recorder(fired, 'a'))
+    press(tracker, K1)
+    press(tracker, K2, OTHER_ID)
+    assert fired == []
+    press(tracker, K1, OTHER_ID)
+    assert fired == [('a', OTHER_ID)]
+
+
+def test_repeated_press_of_held_key():
+    tracker, matcher, _ = make_tracker()
+    fired = []
+    matcher.add_chord([K1, K2], recorder(fired, 'chord'))
+    matcher.add_sequence([K3, K3], recorder(fired, 'double'))
+    press(tracker, K1)
+    press(tracker, K2)
+    press(tracker, K2)
+    assert fired == [('chord', DEVICE_ID)]
+    # a held key is pressed once, however often the press is reported
+    press(tracker, K3)
+    press(tracker, K3)
+    assert fired == [('chord', DEVICE_ID)]
+    release(tracker, K3)
+    press(tracker, K3)
+    assert fired == [('chord', DEVICE_ID), ('double', DEVICE_ID)]
+
+
+def test_sequence_with_repeated_keys():
+    tracker, matcher, _ = make_tracker()
+    fired = []
+    matcher.add_sequence([K1, K1, K2], recorder(fired, 'seq'))
+    for key in (K1, K1, K1, K2):
+        press(tracker, key)
+        release(tracker, key)
+    assert fired == [('seq', DEVICE_ID)]
+
+
+def test_overlapping_sequences():
+    tracker, matcher, _ = make_tracker()
+    fired = []
+    matcher.add_sequence([K1, K2, K3], recorder(fired, 'long'))
+    matcher.add_sequence([K2, K3], recorder(fired, 'short'))
+    matcher.add_sequence([K3, K4], recorder(fired, 'other'))
+    for key in (K1, K2, K3, K4):
+        press(tracker, key)
+        release(tracker, key)
+    assert sorted(fired) == [('long', DEVICE_ID), ('other', DEVICE_ID),
+                             ('short', DEVICE_ID)]
+
+
+def test_sequence_timeout():
+    tracker, matcher, clock = make_tracker(sequence_timeout=0.5)
+    fired = []
+    matcher.add_sequence([K1, K2], recorder(fired, 'seq'))
+    press(tracker, K1)
+    release(tracker, K1)
+    clock.now = 0.6
+    press(tracker, K2)
+    release(tracker, K2)
+    assert fired == []
+    clock.now = 0.7
+    press(tracker, K1)
+    release(tracker, K1)
+    clock.now = 1.1
+    press(tracker, K2)
+    assert fired == [('seq', DEVICE_ID)]
+
+
+def test_remove_matcher_and_reset():
+    tracker, matcher, _ = make_tracker()
+    fired = []
+    matcher.add_sequence([K1, K2], recorder(fired, 'seq'))
+    press(tracker, K1)
+    release(tracker, K1)
+    matcher.reset()
+    press(tracker, K2)
+    release(tracker, K2)
+    assert fired == []
+    tracker.remove_matcher(matcher)
+    press(tracker, K1)
+    release(tracker, K1)
+    press(tracker, K2)
+    assert fired == []
+
+
+def test_empty_chord_and_sequence_rejected():
+    matcher = KeyChordMatcher()
+    with pytest.raises(ValueError):
+        matcher.add_chord([], lambda device_id: None)
+    with pytest.raises(ValueError):
+        matcher.add_sequence([], lambda device_id: None)
@@ -0,0 +1,59 @@
+from array import array
+
+import pytest
+
+from cuesdk import LedFrame, Palette
+
+GRAY = Palette(bytes(c for v in range(256) for c in (v, v, v, 255)))
+
+
+def colors(frame):
+    return [(c.r, c.g, c.b, c.a) for c in frame.data]
+
+
+@pytest.mark.parametrize('intensities', [
+    bytes([0, 128, 255]),
+    bytearray([0, 128, 255]),
+    array('B', [0, 128, 255]),
+])
+def test_apply_bytes(intensities):
+    frame = LedFrame([1, 2, 3])
+    GRAY.apply(frame, intensities)
+    assert colors(frame) == [(0, 0, 0, 255), (128, 128, 128, 255),
+                             (255, 255, 255, 255)]
+
+
+def test_apply_floats():
+    frame = LedFrame([1, 2, 3])
+    GRAY.apply(frame, [0.0, 0.5, 1.0])
+    assert colors(frame) == [(0, 0, 0, 255), (128, 128, 128, 255),
+                             (255, 255, 255, 255)]
+
+
+@pytest.mark.parametrize('intensities', [
+    [0, 255],
+    [0.0, 1],
+    [True, False],
+    [0.5, 1.5],
+    [-0.1, 0.5],
+    [float('nan'), 0.5],
+    array('H', [0, 255]),
+])
+def test_apply_rejects_ints_and_out_of_range(intensities):
+    frame = LedFrame([1, 2])
+    with pytest.raises(ValueError):
+        GRAY.apply(frame, intensities)
+
+
+def test_apply_rejects_wrong_length():
+    with pytest.raises(ValueError):
+        GRAY.apply(LedFrame([1, 2]), [0.5])
+
+
+def test_apply_numpy():
+    np = pytest.importorskip('numpy')
+    frame = LedFrame([1, 2])
+    GRAY.apply(frame, np.array([0, 255], dtype=np.uint8))
+    assert colors(frame) == [(0, 0, 0, 255), (255, 255, 255, 255)]
+    GRAY.apply(frame, np.array([1.0, 0.0]))
+    assert colors(frame) == [(255, 255, 255, 255), (0, 0, 0, 255)]
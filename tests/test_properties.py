@@ -0,0 +1,164 @@
+import sys
+import threading
+from array import array
+from collections import Counter
+from ctypes import addressof
+
+import pytest
+
+from cuesdk import (CorsairDataType, CorsairDevicePropertyId, CorsairError,
+                    CorsairProperty, CorsairPropertyFlag, CorsairSessionState,
+                    CueSdk, SimulatedBackend, SimulatedDevice)
+from cuesdk.properties import PropertyEncoder
+
+DEVICE_ID = 'test-device'
+PROPERTY = CorsairDevicePropertyId.CDPI_PropertyArray
+READ_WRITE = CorsairPropertyFlag.CPF_CanRead | CorsairPropertyFlag.CPF_CanWrite
+
+VALUES = [
+    (CorsairDataType.CT_Boolean, True, True),
+    (CorsairDataType.CT_Int32, -42, -42),
+    (CorsairDataType.CT_Float64, 0.25, 0.25),
+    (CorsairDataType.CT_String, 'simulé', 'simulé'.encode()),
+    (CorsairDataType.CT_String, '', b''),
+    (CorsairDataType.CT_Boolean_Array, [True, False], (True, False)),
+    (CorsairDataType.CT_Int32_Array, [1, -2, 3], (1, -2, 3)),
+    (CorsairDataType.CT_Float64_Array, [0.5, -1.5], (0.5, -1.5)),
+    (CorsairDataType.CT_Int32_Array, [], ()),
+    (CorsairDataType.CT_String_Array, ['a', 'bé', ''],
+     (b'a', 'bé'.encode(), b'')),
+]
+
+
+@pytest.fixture
+def session():
+    backend = SimulatedBackend([SimulatedDevice(DEVICE_ID, led_count=1)])
+    sdk = CueSdk(backend=backend)
+    connected = threading.Event()
+    sdk.connect(lambda evt: evt.state == CorsairSessionState.CSS_Connected
+                and connected.set())
+    assert connected.wait(5)
+    frees = Counter()
+    native_free = backend.CorsairFreeProperty
+
+    def free(nobj):
+        frees[addressof(nobj)] += 1
+        return native_free(nobj)
+
+    backend.CorsairFreeProperty = free
+    yield sdk, backend.devices[DEVICE_ID], backend, frees
+    sdk.disconnect()
+
+
+@pytest.mark.parametrize('data_type,value,expected', VALUES)
+def test_read_frees_property_once(session, data_type, value, expected):
+    sdk, device, backend, frees = session
+    device.set_property(PROPERTY, data_type, value)
+    for _ in range(3):
+        prop, err = sdk.read_device_property(DEVICE_ID, PROPERTY)
+        assert err == CorsairError.CE_Success
+        assert prop == CorsairProperty(data_type, expected)
+    assert sum(frees.values()) == 3
+    assert backend.live_properties == 0
+
+
+def test_failed_read_frees_nothing(session):
+    sdk, _, _, frees = session
+    prop, err = sdk.read_device_property(DEVICE_ID, PROPERTY)
+    assert (prop, err) == (None, CorsairError.CE_InvalidArguments)
+    prop, err = sdk.read_device_property('missing', PROPERTY)
+    assert prop is None and err != CorsairError.CE_Success
+    assert not frees
+
+
+def test_undecodable_read_frees_property(session, monkeypatch):
+    sdk, device, backend, frees = session
+    device.set_property(PROPERTY, CorsairDataType.CT_Int32_Array, [1])
+
+    def create(nobj):
+        raise ValueError("undecodable")
+
+    monkeypatch.setattr(CorsairProperty, 'create', staticmethod(create))
+    with pytest.raises(ValueError):
+        sdk.read_device_property(DEVICE_ID, PROPERTY)
+    assert list(frees.values()) == [1]
+    assert backend.live_properties == 0
+
+
+@pytest.mark.parametrize('data_type,value,expected', VALUES)
+def test_write_round_trip(session, data_type, value, expected):
+    sdk, device, _, _ = session
+    device.set_property(PROPERTY, data_type, value, flags=READ_WRITE)
+    err = sdk.write_device_property(DEVICE_ID, PROPERTY, 0,
+                                    CorsairProperty(data_type, value))
+    assert err == CorsairError.CE_Success
+    prop, err = sdk.read_device_property(DEVICE_ID, PROPERTY)
+    assert prop == CorsairProperty(data_type, expected)
+
+
+def test_write_properties_reuses_encoder(session):
+    sdk, device, backend, _ = session
+    writes = []
+    for index, (data_type, value, _) in enumerate(VALUES):
+        device.set_property(PROPERTY, data_type, value, index,
+                                 READ_WRITE)
+        writes.append((DEVICE_ID, PROPERTY, index,
+                       CorsairProperty(data_type, value)))
+    assert sdk.write_device_properties(writes) == \
+        [CorsairError.CE_Success] * len(VALUES)
+    results = sdk.read_device_properties(
+        [(DEVICE_ID, PROPERTY, index) for index in range(len(VALUES))])
+    for index, (data_type, _, expected) in enumerate(VALUES):
+        assert results[(DEVICE_ID, PROPERTY, index)] == \
+            (CorsairProperty(data_type, expected), CorsairError.CE_Success)
+    assert backend.live_properties == 0
+
+
+def encoded_items(data_type, value):
+    nobj = PropertyEncoder().encode(data_type, value)
+    arr = getattr(nobj.value, {
+        CorsairDataType.CT_Boolean_Array: 'boolean_array',
+        CorsairDataType.CT_Int32_Array: 'int32_array',
+        CorsairDataType.CT_Float64_Array: 'float64_array',
+    }[data_type])
+    return arr.items[:arr.count]
+
+
+@pytest.mark.parametrize('data_type,value,expected', [
+    (CorsairDataType.CT_Int32_Array, array('i', [5, -6]), [5, -6]),
+    (CorsairDataType.CT_Int32_Array, memoryview(array('i', [7])), [7]),
+    (CorsairDataType.CT_Float64_Array, array('d', [0.5, -1.5]), [0.5, -1.5]),
+    (CorsairDataType.CT_Boolean_Array, array('b', [1, 0]), [True, False]),
+])
+def test_encode_matching_buffer(data_type, value, expected):
+    assert encoded_items(data_type, value) == expected
+
+
+@pytest.mark.parametrize('data_type,value,expected', [
+    # wider items than c_int32: copying them bit for bit would interleave
+    # the high words
+    (CorsairDataType.CT_Int32_Array, array('q', [1, -2, 3]), [1, -2, 3]),
+    (CorsairDataType.CT_Float64_Array, array('f', [0.5, 1.5]), [0.5, 1.5]),
+    (CorsairDataType.CT_Float64_Array, array('i', [1, 2]), [1.0, 2.0]),
+    # same item size, different type code
+    (CorsairDataType.CT_Int32_Array, memoryview(bytes(8)).cast('I'), [0, 0]),
+    # a byte view is a buffer of bytes, not of the cast items
+    (CorsairDataType.CT_Int32_Array, memoryview(array('i', [1, 2])).cast('B'),
+     [1, 0, 0, 0, 2, 0, 0, 0] if sys.byteorder == 'little' else
+     [0, 0, 0, 1, 0, 0, 0, 2]),
+])
+def test_encode_mismatched_buffer_falls_back(data_type, value, expected):
+    assert encoded_items(data_type, value) == expected
+
+
+def test_encode_mismatched_buffer_raises():
+    with pytest.raises(TypeError):
+        PropertyEncoder().encode(CorsairDataType.CT_Int32_Array,
+                                 array('d', [1.0, 2.5]))
+
+
+def test_encode_non_native_byte_order():
+    np = pytest.importorskip('numpy')
+    value = np.array([1, -2], dtype='>i4' if sys.byteorder == 'little' else
+                     '<i4')
+    assert encoded_items(CorsairDataType.CT_Int32_Array, value) == [1, -2]